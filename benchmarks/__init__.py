@@ -0,0 +1,6 @@
+"""
+Benchmark-Werkzeuge für den ADIF Location Splitter.
+
+Aufruf aus dem Programmverzeichnis:
+    python -m benchmarks.run_benchmarks --sizes 10000,100000,1000000
+"""
@@ -0,0 +1,110 @@
+"""
+Erzeugt synthetische ADIF-Logs mit einstellbarer QSO-Anzahl und Standort-Kardinalität.
+
+Beispiel:
+    python -m benchmarks.adif_generator 100000 bench.adi --locations 200
+"""
+import argparse
+import random
+
+BANDS = ["160m", "80m", "40m", "30m", "20m", "17m", "15m", "12m", "10m", "6m", "2m", "70cm"]
+MODES = ["SSB", "CW", "FT8", "FT4", "RTTY", "FM"]
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# (DXCC, CQ-Zone, ITU-Zone, Rufzeichen-Präfix) für eigene Stationen
+HOME_ENTITIES = [
+    (230, 14, 28, "DL"), (230, 14, 28, "DG"), (230, 14, 28, "DA"),
+    (227, 14, 27, "F"), (209, 14, 27, "ON"), (263, 14, 27, "PA"),
+    (287, 14, 28, "HB9"), (206, 15, 28, "OE")
+]
+
+
+def _field(name, value):
+    return f"<{name}:{len(value)}>{value}"
+
+
+def _random_locator(rng, precision):
+    locator = rng.choice(LETTERS[:18]) + rng.choice(LETTERS[:18]) + str(rng.randrange(10)) + str(rng.randrange(10))
+    if precision >= 6:
+        locator += rng.choice(LETTERS[:24]).lower() + rng.choice(LETTERS[:24]).lower()
+    return locator
+
+
+def build_locations(location_count, seed=1):
+    """
+    Erzeugt location_count eindeutige eigene Standorte.
+    Gibt eine Liste von Dicts (call, locator, dxcc, cqz, ituz) zurück.
+    """
+    rng = random.Random(seed)
+    locations = []
+    seen = set()
+    while len(locations) < location_count:
+        dxcc, cqz, ituz, prefix = rng.choice(HOME_ENTITIES)
+        call = f"{prefix}{rng.randrange(10)}{rng.choice(LETTERS)}{rng.choice(LETTERS)}{rng.choice(LETTERS)}"
+        if rng.random() < 0.3:
+            call += "/P"
+        locator = _random_locator(rng, rng.choice((4, 6)))
+        if (call, locator) in seen:
+            continue
+        seen.add((call, locator))
+        locations.append({'call': call, 'locator': locator, 'dxcc': dxcc, 'cqz': cqz, 'ituz': ituz})
+    return locations
+
+
+def generate_adif(path, qso_count, location_count=100, seed=1, missing_ratio=0.001):
+    """
+    Schreibt ein synthetisches ADIF-Log nach path.
+    missing_ratio: Anteil QSOs ohne STATION_CALLSIGN (landen in UNZUGEOORDNET).
+    Gibt die verwendeten Standorte zurück.
+    """
+    rng = random.Random(seed)
+    locations = build_locations(location_count, seed)
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("Synthetisches Benchmark-Log\r\n<ADIF_VER:5>3.1.4 <PROGRAMID:14>ADIF-BENCHMARK <EOH>\r\n")
+
+        buffer = []
+        for i in range(qso_count):
+            location = locations[rng.randrange(location_count)]
+            dx_call = f"{rng.choice(LETTERS)}{rng.choice(LETTERS)}{rng.randrange(10)}{rng.choice(LETTERS)}{rng.choice(LETTERS)}"
+            fields = [
+                _field("CALL", dx_call),
+                _field("QSO_DATE", f"20{rng.randrange(15, 25)}{rng.randrange(1, 13):02d}{rng.randrange(1, 29):02d}"),
+                _field("TIME_ON", f"{rng.randrange(24):02d}{rng.randrange(60):02d}{rng.randrange(60):02d}"),
+                _field("BAND", rng.choice(BANDS)),
+                _field("MODE", rng.choice(MODES)),
+                _field("RST_SENT", "59"),
+                _field("RST_RCVD", "59")
+            ]
+            if rng.random() >= missing_ratio:
+                fields.append(_field("STATION_CALLSIGN", location['call']))
+                fields.append(_field("MY_GRIDSQUARE", location['locator']))
+            fields.append(_field("MY_DXCC", str(location['dxcc'])))
+            fields.append(_field("MY_CQ_ZONE", str(location['cqz'])))
+            fields.append(_field("MY_ITU_ZONE", str(location['ituz'])))
+            if i % 5 == 0:
+                fields.append(_field("COMMENT", "Benchmark QSO äöü"))
+            buffer.append(" ".join(fields) + " <EOR>\r\n")
+
+            if len(buffer) >= 10000:
+                f.write("".join(buffer))
+                buffer = []
+
+        f.write("".join(buffer))
+
+    return locations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetisches ADIF-Log erzeugen.")
+    parser.add_argument('qsos', type=int, help="Anzahl QSOs")
+    parser.add_argument('output', help="Zieldatei (.adi)")
+    parser.add_argument('--locations', type=int, default=100, help="Anzahl eindeutiger Standorte (Standard: 100)")
+    parser.add_argument('--seed', type=int, default=1, help="Startwert des Zufallsgenerators")
+    args = parser.parse_args(argv)
+
+    generate_adif(args.output, args.qsos, args.locations, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Lokaler Mock-Server für die Wavelog-API (station_info und create_station) mit einstellbarer Latenz.
+
+Beispiel:
+    python -m benchmarks.mock_wavelog --port 8080 --latency-ms 50
+    python splitter_cli.py log.adi -o export --url http://127.0.0.1:8080/api --token test
+"""
+import argparse
+import random
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# ----------------------------------------
+# KLASSE: MockWavelogServer
+# ----------------------------------------
+class MockWavelogServer:
+    """
+    Startet einen HTTP-Server im Hintergrund-Thread. Jede Anfrage wird um latency Sekunden verzögert.
+    Angelegte Stationen werden im Speicher gehalten und von station_info mit ausgeliefert.
+    error_rate: Anteil der Anfragen, die (vor der Verarbeitung) mit 503 und Retry-After abgelehnt werden.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, stations=None, return_ids=False, error_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(1)
+        self.return_ids = return_ids
+        self.stations = list(stations or [])
+        self.request_counts = {'station_info': 0, 'create_station': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, data, headers=None):
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _reject(self):
+                """Lehnt die Anfrage mit der eingestellten Fehlerquote ab (503, Retry-After: 0)."""
+                with server._lock:
+                    rejected = server._random.random() < server.error_rate
+                    if rejected:
+                        server.request_counts['rejected'] += 1
+                if rejected:
+                    self._send_json(503, {'status': 'failed', 'message': 'service unavailable'}, {'Retry-After': '0'})
+                return rejected
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                if self._reject():
+                    return
+                if '/api/station_info/' not in self.path:
+                    self._send_json(404, {'status': 'failed', 'message': 'unknown endpoint'})
+                    return
+                with server._lock:
+                    server.request_counts['station_info'] += 1
+                    stations = list(server.stations)
+                self._send_json(200, stations)
+
+            def do_POST(self):
+                time.sleep(server.latency)
+                if self._reject():
+                    return
+                if '/api/create_station/' not in self.path:
+                    self._send_json(404, {'status': 'failed', 'message': 'unknown endpoint'})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    payload = json.loads(self.rfile.read(length))
+                except ValueError:
+                    self._send_json(400, {'status': 'failed', 'message': 'invalid json'})
+                    return
+                if isinstance(payload, dict):
+                    payload = [payload]
+
+                with server._lock:
+                    server.request_counts['create_station'] += 1
+                    new_ids = [server.add_station(station) for station in payload]
+
+                response = {'status': 'success', 'message': f"{len(new_ids)} station(s) imported"}
+                if server.return_ids:
+                    response['station_ids'] = new_ids
+                self._send_json(200, response)
+
+        return Handler
+
+
+    def add_station(self, station):
+        """Legt eine Station an und vergibt die nächste freie ID."""
+        station = dict(station)
+        station['station_id'] = str(len(self.stations) + 1)
+        self.stations.append(station)
+        return station['station_id']
+
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+# ----------------------------------------
+# ENDE KLASSE MockWavelogServer
+# ----------------------------------------
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock-Server für die Wavelog-API starten.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Verzögerung pro Anfrage in Millisekunden")
+    parser.add_argument('--return-ids', action='store_true', help="create_station liefert die neuen IDs mit")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Anteil der Anfragen, die mit 503 abgelehnt werden")
+    args = parser.parse_args(argv)
+
+    server = MockWavelogServer(args.host, args.port, args.latency_ms / 1000.0, return_ids=args.return_ids,
+                               error_rate=args.error_rate)
+    print(f"Mock-Wavelog läuft unter {server.url} (Strg+C zum Beenden)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark der Verarbeitungsschritte Einlesen/Gruppieren, Abgleich, Anlegen und Export.
+
+Für jede Größe wird ein synthetisches Log erzeugt und gegen einen lokalen Mock-Wavelog
+verarbeitet. Die Zeiten (Wall- und CPU-Zeit) werden als JSON geschrieben, damit Läufe
+verschiedener Versionen verglichen werden können.
+
+Beispiel:
+    python -m benchmarks.run_benchmarks --sizes 10000,100000,1000000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from splitter_engine import (
+    STATUS_NEW, DEFAULT_MAX_WORKERS, DEFAULT_BATCH_SIZE, iter_adif_file, group_qsos,
+    build_location_data, WavelogClient, fetch_station_info, WavelogStationIndex,
+    collect_items_to_create, create_stations, reconcile_created_ids, apply_created_id,
+    build_export_keys, export_adif_parallel, PipelineStats
+)
+from benchmarks.adif_generator import generate_adif
+from benchmarks.mock_wavelog import MockWavelogServer
+
+MOCK_TOKEN = "benchmark"
+
+
+def timed(stages, name, func, *args, **kwargs):
+    """Führt func aus und legt Wall- und CPU-Zeit unter stages[name] ab."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = func(*args, **kwargs)
+    stages[name] = {
+        'wall_s': round(time.perf_counter() - wall_start, 4),
+        'cpu_s': round(time.process_time() - cpu_start, 4)
+    }
+    return result
+
+
+def match_locations(grouped_qsos, station_index):
+    """Abgleich aller Standorte gegen den lokalen Stationsindex (wie check_wavelog_api_local)."""
+    return build_location_data(grouped_qsos, station_index)
+
+
+def create_new_locations(client, location_data, station_index, args):
+    """Anlegen aller neuen Standorte und anschließende ID-Suche (wie create_new_wavelog_locations)."""
+    for data in location_data.values():
+        if data['status'] == STATUS_NEW:
+            data['profile_name'] = f"{data['call']}-{data['locator']}"
+
+    items_to_create = collect_items_to_create(location_data)
+    created_items = create_stations(client, items_to_create,
+                                    max_workers=args.workers, batch_size=args.batch_size)
+    if created_items:
+        stations = fetch_station_info(client)
+        found_ids, ambiguous = reconcile_created_ids(created_items, station_index.stations, stations)
+        for location_key, found_id in found_ids.items():
+            apply_created_id(location_data[location_key], found_id)
+        for location_key, candidates in ambiguous.items():
+            apply_created_id(location_data[location_key], "KONFLIKT", candidates)
+    return len(items_to_create)
+
+
+def run_size(qso_count, work_dir, args):
+    """Führt alle Schritte für eine Loggröße aus und gibt das Ergebnis als Dict zurück."""
+    adif_path = os.path.join(work_dir, f"bench_{qso_count}.adi")
+    export_dir = os.path.join(work_dir, f"export_{qso_count}")
+
+    locations = generate_adif(adif_path, qso_count, args.locations, args.seed)
+
+    # Ein Teil der Standorte existiert bereits in Wavelog, der Rest wird angelegt
+    existing_count = int(len(locations) * args.existing_ratio)
+    existing_stations = [{
+        'station_id': str(index + 1),
+        'station_callsign': location['call'],
+        'station_gridsquare': location['locator'],
+        'station_profile_name': f"{location['call']}-{location['locator']}"
+    } for index, location in enumerate(locations[:existing_count])]
+
+    stages = {}
+    result = {
+        'qsos': qso_count,
+        'locations': len(locations),
+        'existing_stations': existing_count,
+        'file_bytes': os.path.getsize(adif_path),
+        'stages': stages
+    }
+
+    with MockWavelogServer(latency=args.latency_ms / 1000.0, stations=existing_stations,
+                           error_rate=args.error_rate) as server:
+        http_stats = PipelineStats()
+        client = WavelogClient(server.url, MOCK_TOKEN, args.workers, rate_limit=args.rate_limit, stats=http_stats)
+
+        stations = timed(stages, 'fetch_station_info', fetch_station_info, client)
+        station_index = WavelogStationIndex(stations)
+
+        grouped_qsos = timed(stages, 'group_and_process_qsos', group_qsos, iter_adif_file(adif_path))
+        location_data = timed(stages, 'check_wavelog_api_local', match_locations, grouped_qsos, station_index)
+        result['created_stations'] = timed(stages, 'create_new_wavelog_locations', create_new_locations,
+                                           client, location_data, station_index, args)
+        result['http_requests'] = dict(server.request_counts)
+        result['http_retries'] = client.retry_count
+        result['http_latency'] = http_stats.to_dict()['http_latency']
+
+    os.makedirs(export_dir, exist_ok=True)
+    export_key_by_location = build_export_keys(location_data)
+    timed(stages, 'export_adif_files', export_adif_parallel,
+          adif_path, export_dir, export_key_by_location, args.export_workers)
+    result['export_files'] = len(os.listdir(export_dir))
+
+    stages['total'] = {
+        'wall_s': round(sum(stage['wall_s'] for stage in stages.values()), 4),
+        'cpu_s': round(sum(stage['cpu_s'] for stage in stages.values()), 4)
+    }
+
+    if not args.keep_files:
+        os.remove(adif_path)
+        shutil.rmtree(export_dir)
+
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des ADIF Location Splitters.")
+    parser.add_argument('--sizes', default="10000,100000,1000000",
+                        help="Kommagetrennte QSO-Anzahlen (Standard: 10000,100000,1000000)")
+    parser.add_argument('--locations', type=int, default=200, help="Eindeutige Standorte pro Log (Standard: 200)")
+    parser.add_argument('--existing-ratio', type=float, default=0.5,
+                        help="Anteil der Standorte, die bereits in Wavelog existieren (Standard: 0.5)")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Latenz des Mock-Servers pro Anfrage (Standard: 20)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Anteil der Anfragen, die der Mock-Server mit 503 ablehnt (Standard: 0)")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Max. API-Anfragen pro Sekunde (0 = unbegrenzt)")
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_MAX_WORKERS, help="Parallele Anlege-Requests")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Stationen pro create_station-Request")
+    parser.add_argument('--export-workers', type=int, default=1, help="Prozesse für den ADIF-Export")
+    parser.add_argument('--seed', type=int, default=1, help="Startwert des Zufallsgenerators")
+    parser.add_argument('--work-dir', help="Verzeichnis für Logs und Exporte (Standard: temporär)")
+    parser.add_argument('--keep-files', action='store_true', help="Erzeugte Logs und Exporte nicht löschen")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="JSON-Ergebnisdatei")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='adif_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {
+            'locations': args.locations,
+            'existing_ratio': args.existing_ratio,
+            'latency_ms': args.latency_ms,
+            'error_rate': args.error_rate,
+            'rate_limit': args.rate_limit,
+            'workers': args.workers,
+            'batch_size': args.batch_size,
+            'export_workers': args.export_workers,
+            'seed': args.seed
+        },
+        'runs': []
+    }
+
+    try:
+        for qso_count in sizes:
+            print(f"Benchmark mit {qso_count} QSOs...", file=sys.stderr)
+            run = run_size(qso_count, work_dir, args)
+            report['runs'].append(run)
+            for name, stage in run['stages'].items():
+                print(f"  {name:<30} {stage['wall_s']:>9.3f} s  (CPU {stage['cpu_s']:.3f} s)", file=sys.stderr)
+    finally:
+        if not args.work_dir and not args.keep_files:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Ergebnisse gespeichert in: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
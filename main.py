@@ -1,11 +1,24 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
-import adif_io
-import requests
 import os
 import io
 import configparser
-from collections import defaultdict
+import queue
+import threading
+import sqlite3
+
+from splitter_engine import (
+    JobCancelled, WavelogStationIndex, STATUS_INCOMPLETE, STATUS_AMBIGUOUS, STATUS_NEW,
+    DEFAULT_MAX_WORKERS, DEFAULT_BATCH_SIZE, DEFAULT_EXPORT_WORKERS, DEFAULT_CACHE_TTL_MINUTES,
+    StationCache, station_cache_source, QSOStore, ProcessedFile, load_config, iter_adif_file, iter_adif_spans, group_qsos, merge_grouped_qsos, build_location_data,
+    merge_location_data, WavelogClient, DEFAULT_MAX_RETRIES, DEFAULT_RATE_LIMIT,
+    fetch_station_info, collect_items_to_create, create_stations, created_items_as_stations, reconcile_created_ids,
+    apply_created_id, apply_resolution, build_export_keys, export_adif_parallel, export_adif_store, export_adif_raw,
+    DEFAULT_IMPORT_WORKERS, collect_adif_files, group_adif_files, merge_file_groups, export_adif_batch,
+    get_compression, export_target, PipelineStats, snapshot_directory, count_written_bytes,
+    ProjectWorkspace, CreationJournal, DXCCCatalog, LocationResolver, CTY_FILE_NAME, GRID_ZONES_FILE_NAME,
+    cluster_location_groups, split_sessions
+)
 
 # ----------------------------------------
 # KLASSE: RESOLUTIONSDIALOG
@@ -60,18 +73,19 @@ class ResolutionDialog(simpledialog.Dialog):
 
 
 # ----------------------------------------
-# KLASSE: DXCCSelectionComboboxDialog
+# KLASSE: DXCCSelectionDialog
 # ----------------------------------------
-class DXCCSelectionComboboxDialog(simpledialog.Dialog):
+class DXCCSelectionDialog(simpledialog.Dialog):
     """
-    Ein Dialog mit einer scrollbaren Combobox zur Auswahl der DXCC-Region.
+    Ein Dialog zur Auswahl der DXCC-Region mit Suchfeld (Filter beim Tippen) über den DXCC-Katalog.
     """
-    def __init__(self, parent, callsign_locator, dxcc_data, current_dxcc_id):
-        # dxcc_data: Liste der Namen (sorted_names)
+    def __init__(self, parent, callsign_locator, dxcc_catalog, current_dxcc_id):
         self.callsign_locator = callsign_locator
-        self.dxcc_data = dxcc_data # Liste der DXCC-Namen + ID
+        self.dxcc_catalog = dxcc_catalog
         self.current_dxcc_id = current_dxcc_id
-        self.selected_dxcc_name = tk.StringVar(parent)
+        self.search_text = tk.StringVar(parent)
+        self.visible_ids = [] # IDs der Listeneinträge (gleiche Reihenfolge wie die Listbox)
+        self.last_query = ""
         self.result_id = None
         
         super().__init__(parent, title=f"DXCC-Auswahl für {callsign_locator}")
@@ -80,45 +94,313 @@ class DXCCSelectionComboboxDialog(simpledialog.Dialog):
     def body(self, master):
         tk.Label(master, text=f"Wählen Sie die DXCC-Region für {self.callsign_locator}:").pack(pady=5)
         
-        # 1. Combobox erstellen
-        self.combo = ttk.Combobox(master, 
-                                  textvariable=self.selected_dxcc_name, 
-                                  values=self.dxcc_data, 
-                                  state='readonly', 
-                                  width=50)
-        self.combo.pack(pady=10, fill='x', padx=20)
-        
-        # 2. Aktuellen Wert setzen
-        # Wir müssen den Namen des aktuellen DXCC-ID finden, um ihn vorzuselektieren
-        current_name = ""
-        for name_id_str in self.dxcc_data:
-            # Format: 'Deutschland (ID: 230)'
-            if f"(ID: {self.current_dxcc_id})" in name_id_str:
-                current_name = name_id_str
-                break
-        
-        self.combo.set(current_name)
-        self.combo.focus_set()
-
-        return master
+        # 1. Suchfeld (Name, Wortanfang oder ID)
+        self.entry = ttk.Entry(master, textvariable=self.search_text, width=50)
+        self.entry.pack(fill='x', padx=20)
+
+        # 2. Trefferliste
+        list_frame = tk.Frame(master)
+        list_frame.pack(pady=10, fill='both', expand=True, padx=20)
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical')
+        self.listbox = tk.Listbox(list_frame, height=15, width=50, exportselection=False,
+                                  yscrollcommand=scrollbar.set)
+        scrollbar.config(command=self.listbox.yview)
+        scrollbar.pack(side='right', fill='y')
+        self.listbox.pack(side='left', fill='both', expand=True)
+
+        self.search_text.trace_add('write', self.on_search_changed)
+        self.entry.bind('<Down>', lambda event: self.move_selection(1))
+        self.entry.bind('<Up>', lambda event: self.move_selection(-1))
+        self.listbox.bind('<Double-1>', self.ok)
+
+        # 3. Alle Einträge anzeigen und den aktuellen Wert vorselektieren
+        self.show_results(self.dxcc_catalog.search(""))
+        if self.current_dxcc_id in self.visible_ids:
+            self.select_index(self.visible_ids.index(self.current_dxcc_id))
+
+        return self.entry
+
+
+    def on_search_changed(self, *args):
+        query = self.search_text.get()
+        # Beim Weitertippen genügt die Suche in den bisherigen Treffern
+        results = []
+        if self.last_query and query.startswith(self.last_query) and self.visible_ids:
+            results = self.dxcc_catalog.search(query, candidates=self.visible_ids)
+        if not results:
+            results = self.dxcc_catalog.search(query)
+        self.last_query = query
+        self.show_results(results)
+
+
+    def show_results(self, dxcc_ids):
+        self.visible_ids = dxcc_ids
+        self.listbox.delete(0, tk.END)
+        for dxcc_id in dxcc_ids:
+            self.listbox.insert(tk.END, self.dxcc_catalog.display_name(dxcc_id))
+        if dxcc_ids:
+            self.select_index(0)
+
+
+    def select_index(self, index):
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(index)
+        self.listbox.activate(index)
+        self.listbox.see(index)
+
+
+    def move_selection(self, step):
+        if not self.visible_ids:
+            return "break"
+        selection = self.listbox.curselection()
+        index = selection[0] + step if selection else 0
+        self.select_index(max(0, min(len(self.visible_ids) - 1, index)))
+        return "break"
+
+
+    def validate(self):
+        if not self.listbox.curselection():
+            self.bell()
+            return False
+        return True
 
 
     def apply(self):
-        # 1. Ausgewählten String (z.B. 'Germany (ID: 230)') auslesen
-        selected_string = self.selected_dxcc_name.get()
-        
-        # 2. DXCC ID extrahieren: Suche nach der Zahl in den Klammern
-        import re
-        match = re.search(r'\(ID:\s*(\d+)\)', selected_string)
-        
-        if match:
-            self.result_id = match.group(1)
+        self.result_id = self.visible_ids[self.listbox.curselection()[0]]
+
+# ----------------------------------------
+# ENDE KLASSE DXCCSelectionDialog
+# ----------------------------------------
+
+
+# ----------------------------------------
+# KLASSE: BackgroundJobRunner
+# ----------------------------------------
+class BackgroundJobRunner:
+    """
+    Führt lange Arbeitsschritte (Netzwerk, Parsen, Export) in einem Worker-Thread aus.
+    Tk-Zugriffe des Workers werden über eine Queue in den Haupt-Thread verlagert,
+    die regelmäßig per master.after abgearbeitet wird. Es läuft immer nur ein Job gleichzeitig.
+    """
+    POLL_INTERVAL_MS = 50
+    MAX_CALLBACKS_PER_POLL = 500
+
+    def __init__(self, master, on_progress=None, on_state_change=None):
+        self.master = master
+        self.on_progress = on_progress          # on_progress(value, maximum, text)
+        self.on_state_change = on_state_change  # on_state_change(busy, text)
+        self.queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.job_name = None
+
+        self.master.after(self.POLL_INTERVAL_MS, self._drain)
+
+
+    def is_busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+
+    def check_cancelled(self):
+        """Wird vom Worker an geeigneten Stellen aufgerufen und bricht den Job bei Bedarf ab."""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+
+    def start(self, name, func, *args, on_done=None):
+        """Startet func(*args) im Hintergrund. on_done(result) wird danach im Haupt-Thread aufgerufen."""
+        if self.is_busy():
+            return False
+
+        self.cancel_event.clear()
+        self.job_name = name
+
+        def run():
+            result = None
+            outcome = "abgeschlossen"
+            try:
+                result = func(*args)
+            except JobCancelled:
+                outcome = "abgebrochen"
+            except Exception as e:
+                outcome = "fehlgeschlagen"
+                self.post(self._report_error, e)
+            finally:
+                self.post(self._finish, threading.current_thread(), name, on_done, result, outcome)
+
+        if self.on_state_change:
+            self.on_state_change(True, f"{name}...")
+
+        self.thread = threading.Thread(target=run, name=f"job-{name}", daemon=True)
+        self.thread.start()
+        return True
+
+
+    def cancel(self):
+        if self.is_busy():
+            self.cancel_event.set()
+
+
+    def post(self, callback, *args):
+        """Reiht einen Aufruf zur Ausführung im Tk-Haupt-Thread ein (threadsicher)."""
+        self.queue.put((callback, args))
+
+
+    def report_progress(self, value, maximum=0, text=None):
+        """Meldet den Fortschritt (maximum=0: unbestimmter Fortschritt)."""
+        if self.on_progress:
+            self.post(self.on_progress, value, maximum, text)
+
+
+    def _report_error(self, error):
+        messagebox.showerror("Fehler", f"Unerwarteter Fehler in '{self.job_name}': {error}")
+
+
+    def _finish(self, thread, name, on_done, result, outcome):
+        # Läuft bereits ein neuerer Job (Start vor dem Abarbeiten dieses Aufrufs), bleibt dessen Zustand erhalten
+        if on_done and outcome == "abgeschlossen":
+            on_done(result)
+        if thread is not self.thread:
+            return
+        self.thread = None
+        if self.on_state_change:
+            self.on_state_change(False, f"{name} {outcome}.")
+
+
+    def _drain(self):
+        try:
+            for _ in range(self.MAX_CALLBACKS_PER_POLL):
+                callback, args = self.queue.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        finally:
+            self.master.after(self.POLL_INTERVAL_MS, self._drain)
+
+# ----------------------------------------
+# ENDE KLASSE BackgroundJobRunner
+# ----------------------------------------
+
+
+# ----------------------------------------
+# KLASSE: VirtualResultsTable
+# ----------------------------------------
+class VirtualResultsTable:
+    """
+    Virtualisierte Ergebnistabelle: Die Daten bleiben im Python-Modell (Liste der Standortschlüssel),
+    im Treeview existieren nur so viele Zeilen, wie gerade sichtbar sind. Beim Scrollen werden
+    diese Zeilen mit den Werten des neuen Ausschnitts überschrieben.
+    """
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, tree, scrollbar, row_values):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values   # Funktion: Schlüssel -> Tupel der Spaltenwerte
+        self.keys = []
+        self.offset = 0
+        self.item_ids = []             # wiederverwendete Treeview-Zeilen (sichtbares Fenster)
+        self.item_to_key = {}
+        self.key_to_item = {}
+
+        self.scrollbar.configure(command=self.on_scrollbar)
+        self.tree.bind('<Configure>', lambda event: self.render())
+        self.tree.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_by(3))
+
+
+    def set_keys(self, keys, keep_position=False):
+        """Übernimmt die Reihenfolge der Zeilen und zeigt den Anfang der Tabelle (oder bleibt an der Position)."""
+        self.keys = list(keys)
+        if not keep_position:
+            self.offset = 0
+        self.render()
+
+
+    def visible_row_count(self):
+        row_height = ttk.Style().lookup('Treeview', 'rowheight')
+        try:
+            row_height = int(row_height)
+        except (TypeError, ValueError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+        # Eine Zeilenhöhe für die Spaltenüberschriften abziehen
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+
+    def render(self):
+        """Befüllt die sichtbaren Treeview-Zeilen mit dem aktuellen Ausschnitt des Modells."""
+        window = self.visible_row_count()
+        self.offset = max(0, min(self.offset, len(self.keys) - window))
+        visible_keys = self.keys[self.offset:self.offset + window]
+
+        # Zeilenanzahl an das Fenster anpassen (Zeilen werden wiederverwendet)
+        while len(self.item_ids) < len(visible_keys):
+            self.item_ids.append(self.tree.insert('', tk.END))
+        if len(self.item_ids) > len(visible_keys):
+            self.tree.delete(*self.item_ids[len(visible_keys):])
+            del self.item_ids[len(visible_keys):]
+
+        self.item_to_key = {}
+        self.key_to_item = {}
+        for item_id, key in zip(self.item_ids, visible_keys):
+            self.tree.item(item_id, values=self.row_values(key))
+            self.item_to_key[item_id] = key
+            self.key_to_item[key] = item_id
+
+        if self.keys:
+            self.scrollbar.set(self.offset / len(self.keys), (self.offset + len(visible_keys)) / len(self.keys))
         else:
-            # Fallback, z.B. wenn "N/A (nicht definiert)" gewählt wird
-            self.result_id = '0' 
+            self.scrollbar.set(0.0, 1.0)
+
+
+    def refresh(self, key):
+        """Aktualisiert eine Zeile, falls sie gerade sichtbar ist."""
+        item_id = self.key_to_item.get(key)
+        if item_id is not None:
+            self.tree.item(item_id, values=self.row_values(key))
+
+
+    def key_for_item(self, item_id):
+        return self.item_to_key.get(item_id)
+
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.keys) - 1))
+        if offset != self.offset:
+            self.offset = offset
+            # Die Auswahl gehört zur Treeview-Zeile, nicht zum Standort -> beim Scrollen aufheben
+            self.tree.selection_remove(*self.tree.selection())
+            self.render()
+
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+
+    def on_scrollbar(self, action, *args):
+        """Verarbeitet die Befehle der Scrollbar (moveto / scroll units|pages)."""
+        if action == 'moveto':
+            self.scroll_to(float(args[0]) * len(self.keys))
+        elif action == 'scroll':
+            step = int(args[0])
+            if args[1] == 'pages':
+                step *= max(1, self.visible_row_count() - 1)
+            self.scroll_by(step)
+
+
+    def on_mouse_wheel(self, event):
+        # Windows liefert Vielfache von 120, macOS kleine Werte
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll_by(-3 * delta)
 
 # ----------------------------------------
-# ENDE KLASSE DXCCSelectionComboboxDialog
+# ENDE KLASSE VirtualResultsTable
 # ----------------------------------------
 
 
@@ -136,23 +418,77 @@ class ADIFSplitterApp:
         self.wavelog_url = ""
         self.wavelog_token = ""
         self.dxcc_csv_path = ""
+
+        # Fehlende DXCC-/Zonen-Angaben offline aus Rufzeichen und Locator ergänzen ([DXCC] infer, cty_path, grid_zones_path)
+        self.infer_dxcc = True
+        self.cty_path = CTY_FILE_NAME
+        self.grid_zones_path = GRID_ZONES_FILE_NAME
+        self.location_resolver = None
         
-        self.loaded_qso_list = []
+        self.adif_file_path = None
+        # Mehrere Dateien / Verzeichnis: Liste der Dateien und Gruppierung pro Datei
+        self.adif_file_paths = []
+        self.grouped_by_file = None
         self.location_data = {}
-        self.checkbox_status = {}
         self.wavelog_locations = None
+        self.station_index = WavelogStationIndex()
+        self.wavelog_client = None
+        
+        # Parallelität beim Anlegen von Stationen (config.ini, Abschnitt [Wavelog])
+        self.max_workers = DEFAULT_MAX_WORKERS
+        self.create_batch_size = DEFAULT_BATCH_SIZE
+
+        # Wiederholungen und clientseitige Ratenbegrenzung der API-Anfragen (config.ini, Abschnitt [Wavelog])
+        self.max_retries = DEFAULT_MAX_RETRIES
+        self.rate_limit = DEFAULT_RATE_LIMIT
+        
+        # Anzahl Prozesse für den ADIF-Export (config.ini, Abschnitt [Export])
+        self.export_workers = DEFAULT_EXPORT_WORKERS
+
+        # QSOs kompakt im Speicher halten, damit der Export die Datei nicht erneut liest ([Export] in_memory)
+        self.keep_qsos_in_memory = False
+        self.qso_store = None
+        self.grouped_qsos = None
+
+        # Prozesse zum Einlesen mehrerer Dateien (config.ini, Abschnitt [Import]) und getrennter Export pro Quelldatei
+        self.import_workers = DEFAULT_IMPORT_WORKERS
+        self.separate_files = False
+
+        # Gruppierung nach gekürztem Locator (0 = vollständig) und Zusammenfassen naher Standorte in km ([Import])
+        self.grid_precision = 0
+        self.cluster_km = 0.0
+        # Standorte bei Lücken von mehr als n Stunden in Aktivierungen aufteilen (0 = aus, [Import])
+        self.session_gap_hours = 0.0
+
+        # Kompression der Exportdateien: none, gz, bz2, xz oder zip (ein Archiv) ([Export] compression)
+        self.export_compression = 'none'
+
+        # Nur Bytebereiche der Datensätze merken und beim Export unverändert kopieren ([Export] raw_copy)
+        self.raw_copy_export = False
+
+        # Stand der zuletzt verarbeiteten Datei (für das inkrementelle Neuladen angehängter QSOs)
+        self.processed_file = None
+
+        # Gültigkeit des lokalen Stations-Caches in Minuten (config.ini, Abschnitt [Cache])
+        self.cache_ttl_minutes = DEFAULT_CACHE_TTL_MINUTES
+
+        # Laufzeiten, Zähler und HTTP-Latenzen; cProfile/tracemalloc und JSON-Bericht über [Diagnostics]
+        self.stats = PipelineStats()
+        self.stats_report_path = ""
+        self.stats_window = None
+
+        # Persistenter Arbeitsbereich (SQLite) der Sitzung ([Workspace] enabled/path)
+        self.workspace = None
+        self.workspace_enabled = True
+        self.workspace_path = ""
 
         # Zuerst Konfiguration laden, um den gespeicherten DXCC-Pfad zu bekommen
         self.load_config() 
+        self.station_cache = StationCache.for_config(self.CONFIG_FILE, self.cache_ttl_minutes)
 
         # --- DXCC / Zonen LOOKUP DATA (aus CSV geladen) ---
-        self.dxcc_id_to_name = {}
-        self.dxcc_name_to_id = {}
-        self.dxcc_combo_list = []
-        
-        # Sicherstellen, dass der Default-Wert existiert
-        self.dxcc_id_to_name['0'] = 'N/A (nicht definiert)'
-        self.dxcc_name_to_id['N/A (nicht definiert)'] = '0'
+        # Der Katalog enthält immer den Default-Wert '0' (N/A)
+        self.dxcc_catalog = DXCCCatalog()
         
 
 
@@ -165,6 +501,18 @@ class ADIFSplitterApp:
         
         # 2. UI-Elemente
         
+        # Fortschrittsanzeige für Hintergrund-Jobs (unten im Fenster)
+        progress_frame = tk.Frame(master)
+        progress_frame.pack(side='bottom', fill='x', padx=10, pady=(0, 10))
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', length=300)
+        self.progress_bar.pack(side='left')
+        self.progress_label = tk.Label(progress_frame, text="Bereit.", anchor='w')
+        self.progress_label.pack(side='left', fill='x', expand=True, padx=10)
+        self.cancel_button = tk.Button(progress_frame, text="Abbrechen", state=tk.DISABLED, command=self.cancel_job)
+        self.cancel_button.pack(side='right')
+        
+        self.jobs = BackgroundJobRunner(master, on_progress=self.update_progress, on_state_change=self.on_job_state_change)
+        
         # Frame für die Hauptinhalte
         main_frame = tk.Frame(master)
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -190,26 +538,44 @@ class ADIFSplitterApp:
         # Initialmeldung
         self.log_message("Programm gestartet. Konfiguration geladen.")
 
+        # Letzte Sitzung aus dem Arbeitsbereich fortsetzen (ohne erneutes Einlesen)
+        if self.workspace_enabled:
+            self.open_workspace(ProjectWorkspace.default_path(self.CONFIG_FILE, self.workspace_path))
+
 
     # ----------------------------------------
-    # Abschnitt: Konfigurations-Methoden (Unverändert)
+    # Abschnitt: Konfigurations-Methoden
     # ----------------------------------------
     def load_config(self):
         """Läd die Konfiguration aus der Datei."""
-        config = configparser.ConfigParser()
-        # Versuche, die Datei zu lesen (Unterdrücken von Fehlern, falls Datei fehlt)
-        config.read(self.CONFIG_FILE) 
-
-        if config.has_section('Wavelog'):
-            self.wavelog_url = config.get('Wavelog', 'url', fallback="")
-            self.wavelog_token = config.get('Wavelog', 'token', fallback="")
+        settings = load_config(self.CONFIG_FILE)
         
-        if config.has_section('DXCC'):
-            self.dxcc_csv_path = config.get('DXCC', 'csv_path', fallback="")
-
-        # Prüfe, ob Wavelog URL am Ende ein Slash hat
-        if self.wavelog_url and not self.wavelog_url.endswith('/'):
-            self.wavelog_url += '/'
+        self.wavelog_url = settings['wavelog_url']
+        self.wavelog_token = settings['wavelog_token']
+        self.max_workers = settings['max_workers']
+        self.create_batch_size = settings['batch_size']
+        self.max_retries = settings['max_retries']
+        self.rate_limit = settings['rate_limit']
+        self.export_workers = settings['export_workers']
+        self.cache_ttl_minutes = settings['cache_ttl_minutes']
+        self.keep_qsos_in_memory = settings['in_memory']
+        self.raw_copy_export = settings['raw_copy']
+        self.separate_files = settings['separate_files']
+        self.export_compression = settings['compression']
+        self.import_workers = settings['import_workers']
+        self.grid_precision = settings['grid_precision']
+        self.cluster_km = settings['cluster_km']
+        self.session_gap_hours = settings['session_gap_hours']
+        self.dxcc_csv_path = settings['dxcc_csv_path']
+        self.infer_dxcc = settings['infer_dxcc']
+        self.cty_path = settings['cty_path']
+        self.grid_zones_path = settings['grid_zones_path']
+        self.location_resolver = None
+        self.stats.profile = settings['profile']
+        self.stats.trace_memory = settings['tracemalloc']
+        self.stats_report_path = settings['stats_report']
+        self.workspace_enabled = settings['workspace_enabled']
+        self.workspace_path = settings['workspace_path']
 
 
     def save_config(self):
@@ -218,12 +584,49 @@ class ADIFSplitterApp:
         
         config['Wavelog'] = {
             'url': self.wavelog_url,
-            'token': self.wavelog_token
+            'token': self.wavelog_token,
+            'max_workers': str(self.max_workers),
+            'batch_size': str(self.create_batch_size),
+            'max_retries': str(self.max_retries),
+            'rate_limit': str(self.rate_limit)
         }
         
         # NEU: Speichere DXCC CSV Pfad
         config['DXCC'] = {
-            'csv_path': self.dxcc_csv_path
+            'csv_path': self.dxcc_csv_path,
+            'infer': str(self.infer_dxcc).lower(),
+            'cty_path': self.cty_path,
+            'grid_zones_path': self.grid_zones_path
+        }
+        
+        config['Export'] = {
+            'workers': str(self.export_workers),
+            'in_memory': str(self.keep_qsos_in_memory).lower(),
+            'raw_copy': str(self.raw_copy_export).lower(),
+            'separate_files': str(self.separate_files).lower(),
+            'compression': self.export_compression
+        }
+
+        config['Import'] = {
+            'workers': str(self.import_workers),
+            'grid_precision': str(self.grid_precision),
+            'cluster_km': str(self.cluster_km),
+            'session_gap_hours': str(self.session_gap_hours)
+        }
+
+        config['Cache'] = {
+            'ttl_minutes': str(self.cache_ttl_minutes)
+        }
+
+        config['Workspace'] = {
+            'enabled': str(self.workspace_enabled).lower(),
+            'path': self.workspace_path
+        }
+
+        config['Diagnostics'] = {
+            'profile': str(self.stats.profile).lower(),
+            'tracemalloc': str(self.stats.trace_memory).lower(),
+            'report_path': self.stats_report_path
         }
 
         try:
@@ -257,6 +660,7 @@ class ADIFSplitterApp:
             if token is not None:
                 self.wavelog_url = url
                 self.wavelog_token = token
+                self.wavelog_client = None
                 self.save_config()
                 messagebox.showinfo("Erfolg", "API-Daten gespeichert und URL korrigiert zu:\n" + self.wavelog_url)
 
@@ -297,53 +701,8 @@ class ADIFSplitterApp:
             return
 
         try:
-            # Leere die bestehenden Listen, behalte aber den Default-Wert '0'
-            self.dxcc_id_to_name = {'0': 'N/A (nicht definiert)'}
-            self.dxcc_name_to_id = {'N/A (nicht definiert)': '0'}
-            self.dxcc_combo_list = []
-            
-            loaded_count = 0
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                # Wir gehen davon aus, dass die erste Zeile der Header ist
-                next(f)
-                
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    # Versuch, mit Komma zu trennen. Wenn das fehlschlägt, versuchen wir Semikolon
-                    if ',' in line:
-                        separator = ','
-                    elif ';' in line:
-                        separator = ';'
-                    else:
-                        self.log_message(f"WARNUNG: Zeile ohne gültiges Trennzeichen übersprungen: {line[:20]}...")
-                        continue
-                        
-                    parts = [p.strip() for p in line.split(separator, 1)]
-
-                    if len(parts) == 2 and parts[0].isdigit():
-                        dxcc_id = parts[0]
-                        name = parts[1].replace('"', '').strip() # Entferne Anführungszeichen, falls vorhanden
-                        
-                        if dxcc_id in self.dxcc_id_to_name:
-                             # Überspringen von Duplikaten, um '0' (N/A) nicht zu überschreiben
-                             continue
-                             
-                        self.dxcc_id_to_name[dxcc_id] = name
-                        self.dxcc_name_to_id[name] = dxcc_id
-                        loaded_count += 1
-                    else:
-                        self.log_message(f"WARNUNG: Ungültiges Datenformat in Zeile: {line[:20]}...")
-
-            # 3. Aktualisiere die Combobox-Liste aus den neu geladenen Daten
-            self.dxcc_combo_list = sorted([
-                f"{name} (ID: {dxcc_id})" 
-                for dxcc_id, name in self.dxcc_id_to_name.items()
-            ], key=lambda x: (x != "N/A (ID: 0)", x)) 
-            # Sortiert N/A an den Anfang
+            self.dxcc_catalog = DXCCCatalog.from_csv(file_path, self.log_message)
+            loaded_count = len(self.dxcc_catalog) - 1
             
             self.log_message(f"DXCC-Daten erfolgreich geladen. {loaded_count} Einträge verarbeitet.")
             if not initial_load:
@@ -360,25 +719,83 @@ class ADIFSplitterApp:
     # Abschnitt: GUI-Methoden
     # ----------------------------------------
     def log_message(self, message):
-        """Hilfsfunktion zur Anzeige von Statusmeldungen im Textfeld."""
+        """Hilfsfunktion zur Anzeige von Statusmeldungen im Textfeld. Darf auch aus Worker-Threads aufgerufen werden."""
+        if threading.current_thread() is not threading.main_thread():
+            self.jobs.post(self.log_message, message)
+            return
+        
         self.status_text.config(state=tk.NORMAL)
         self.status_text.insert(tk.END, f"{message}\n")
         self.status_text.see(tk.END)
         self.status_text.config(state=tk.DISABLED)
 
 
+    def run_in_ui(self, callback, *args):
+        """Führt callback im Tk-Haupt-Thread aus (direkt oder über die Job-Queue)."""
+        if threading.current_thread() is threading.main_thread():
+            callback(*args)
+        else:
+            self.jobs.post(callback, *args)
+
+
+    def update_progress(self, value, maximum, text=None):
+        """Aktualisiert Fortschrittsbalken und -text (maximum=0: unbestimmter Fortschritt)."""
+        if maximum:
+            if str(self.progress_bar['mode']) != 'determinate':
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate')
+            self.progress_bar.config(maximum=maximum, value=value)
+        elif str(self.progress_bar['mode']) != 'indeterminate':
+            self.progress_bar.config(mode='indeterminate')
+            self.progress_bar.start(15)
+        
+        if text:
+            self.progress_label.config(text=text)
+
+
+    def on_job_state_change(self, busy, text):
+        """Wird beim Start und Ende eines Hintergrund-Jobs aufgerufen."""
+        self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+        
+        if busy:
+            self.update_progress(0, 0, text)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate', value=0)
+            self.progress_label.config(text=text)
+
+
+    def cancel_job(self):
+        if self.jobs.is_busy():
+            self.log_message("Abbruch angefordert...")
+            self.jobs.cancel()
+
+
+    def is_job_running(self):
+        """Prüft, ob bereits ein Hintergrund-Job läuft, und weist den Benutzer ggf. darauf hin."""
+        if self.jobs.is_busy():
+            messagebox.showwarning("Achtung", "Es läuft bereits ein Vorgang. Bitte warten oder abbrechen.")
+            return True
+        return False
+
+
     def create_menu(self):
-        """Erstellt die Menüleiste. (Unverändert)"""
+        """Erstellt die Menüleiste."""
         menubar = tk.Menu(self.master)
         
         # Datei-Menü
         filemenu = tk.Menu(menubar, tearoff=0)
-        filemenu.add_command(label="ADIF-Datei auswählen...", command=self.load_adif_file)
+        filemenu.add_command(label="ADIF-Datei(en) auswählen...", command=self.load_adif_file)
+        filemenu.add_command(label="ADIF-Verzeichnis auswählen...", command=self.load_adif_directory)
         filemenu.add_command(label="Verarbeitung starten (Checken)", command=self.start_processing)
+        filemenu.add_command(label="Verarbeitung komplett neu starten", command=lambda: self.start_processing(full=True))
         filemenu.add_command(label="Markierte Stationen in Wavelog anlegen", command=self.create_new_wavelog_locations)
         filemenu.add_separator()
         filemenu.add_command(label="ADIF-Dateien exportieren (nach ID)", command=self.export_adif_files)
         filemenu.add_separator()
+        filemenu.add_command(label="Projekt öffnen...", command=self.choose_workspace)
+        filemenu.add_command(label="Projekt speichern unter...", command=self.save_workspace_as)
+        filemenu.add_separator()
         filemenu.add_command(label="Beenden", command=self.master.quit)
         menubar.add_cascade(label="Datei", menu=filemenu)
         
@@ -386,21 +803,36 @@ class ADIFSplitterApp:
         configmenu = tk.Menu(menubar, tearoff=0)
         configmenu.add_command(label="Wavelog API konfigurieren", command=self.configure_wavelog)
         configmenu.add_command(label="DXCC-Liste importieren...", command=lambda: self.load_dxcc_data(initial_load=False))
+        configmenu.add_separator()
+        configmenu.add_command(label="Stations-Cache leeren", command=self.clear_station_cache)
+        configmenu.add_command(label="Anlege-Journal leeren", command=self.clear_creation_journal)
         menubar.add_cascade(label="Konfiguration", menu=configmenu)
+
+        # Diagnose-Menü (Laufzeiten, Zähler, Profiling)
+        self.profile_var = tk.BooleanVar(value=self.stats.profile)
+        self.tracemalloc_var = tk.BooleanVar(value=self.stats.trace_memory)
+        diagmenu = tk.Menu(menubar, tearoff=0)
+        diagmenu.add_command(label="Statistik anzeigen...", command=self.show_stats_window)
+        diagmenu.add_command(label="Statistik als JSON speichern...", command=self.save_stats_report)
+        diagmenu.add_command(label="Statistik zurücksetzen", command=self.reset_stats)
+        diagmenu.add_separator()
+        diagmenu.add_checkbutton(label="cProfile aktivieren", variable=self.profile_var, command=self.toggle_profiling)
+        diagmenu.add_checkbutton(label="tracemalloc aktivieren", variable=self.tracemalloc_var, command=self.toggle_profiling)
+        menubar.add_cascade(label="Diagnose", menu=diagmenu)
         
         self.master.config(menu=menubar)
 
 
     def create_results_table(self, parent_frame):
-        """Erstellt das Treeview-Widget mit zusätzlichen Spalten für DXCC, CQ, ITU. (Unverändert)"""
+        """Erstellt das Treeview-Widget mit zusätzlichen Spalten für DXCC, CQ, ITU."""
         
-        columns = ("#", "Call", "Locator", "QSOs", "Profilname", "DXCC", "CQ", "ITU", "Status", "Wavelog ID")
+        columns = ("#", "Call", "Locator", "QSOs", "Profilname", "DXCC", "CQ", "ITU", "Status", "Wavelog ID", "Zeitraum")
         self.tree = ttk.Treeview(parent_frame, columns=columns, show='headings', height=10)
         
         for col in columns:
             self.tree.heading(col, text=col)
         
-        # Spaltenbreiten setzen (angepasst)
+        # Spaltenbreiten setzen
         self.tree.column("#", width=40, anchor='center')
         self.tree.heading("#", text="Neu?")
         self.tree.column("Call", width=80, anchor='center')
@@ -412,20 +844,68 @@ class ADIFSplitterApp:
         self.tree.column("ITU", width=40, anchor='center')
         self.tree.column("Status", width=120, anchor='w')
         self.tree.column("Wavelog ID", width=80, anchor='center')
+        self.tree.column("Zeitraum", width=140, anchor='center')
         
-        vsb = ttk.Scrollbar(parent_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
+        vsb = ttk.Scrollbar(parent_frame, orient="vertical")
         
         vsb.pack(side='right', fill='y')
         self.tree.pack(side="left", fill="both", expand=True)
 
+        # Nur die sichtbaren Zeilen werden im Treeview angelegt, die Scrollbar steuert den Ausschnitt
+        self.results_table = VirtualResultsTable(
+            self.tree, vsb, lambda location_key: self.location_row_values(self.location_data[location_key])
+        )
+
         # Bindungen hinzufügen
         self.tree.bind('<Button-1>', self.on_item_click)
         self.tree.bind('<Double-1>', self.on_item_double_click)
 
 
+    def location_row_values(self, data):
+        """Erzeugt die Tabellenwerte (Indexe 0-10) für einen Standort."""
+        # Felder mit abweichenden Werten in den QSOs werden mit '*' markiert (Details im Log)
+        disagreement = data.get('disagreement') or ()
+        def station_value(field):
+            return f"{data[field]} *" if field in disagreement else data[field]
+
+        return (
+            "X" if data['selected'] else "",  # 0
+            data['call'],                     # 1
+            data['locator'],                  # 2
+            data['qso_count'],                # 3
+            data['profile_name'],             # 4 (Profilname/Konfliktliste)
+            station_value('dxcc'),            # 5 (DXCC)
+            station_value('cqz'),             # 6 (CQ)
+            station_value('ituz'),            # 7 (ITU)
+            data['status'],                   # 8 (Status)
+            data['wavelog_id'],               # 9 (Wavelog ID)
+            self.format_date_range(data)      # 10 (Zeitraum der QSOs)
+        )
+
+
+    @staticmethod
+    def format_date_range(data):
+        """Zeitraum der QSOs eines Standorts (TT.MM.JJJJ), bei Aktivierungen mit deren Nummer."""
+        def format_date(qso_date):
+            return f"{qso_date[6:8]}.{qso_date[4:6]}.{qso_date[:4]}" if len(qso_date) == 8 else qso_date
+
+        first_date, last_date = data.get('first_date', ''), data.get('last_date', '')
+        text = format_date(first_date)
+        if last_date and last_date != first_date:
+            text += f" - {format_date(last_date)}"
+        if data.get('session'):
+            text = f"A{data['session']}: {text}"
+        return text
+
+
+    def refresh_row(self, location_key):
+        """Schreibt die Standortdaten erneut in die zugehörige Tabellenzeile (falls sichtbar) und in den Arbeitsbereich."""
+        self.results_table.refresh(location_key)
+        self.save_workspace_location(location_key)
+
+
     def on_item_click(self, event):
-        """Behandelt Klicks (Checkbox und Mehrdeutigkeits-Auflösung). (Indexe angepasst)"""
+        """Behandelt Klicks (Checkbox und Mehrdeutigkeits-Auflösung)."""
         region = self.tree.identify_region(event.x, event.y)
         if region == "heading":
             return
@@ -433,110 +913,92 @@ class ADIFSplitterApp:
         item_id = self.tree.identify_row(event.y)
         column_id = self.tree.identify_column(event.x)
         
-        if not item_id:
+        location_key = self.results_table.key_for_item(item_id)
+        if location_key is None:
              return
              
-        current_values = list(self.tree.item(item_id, 'values'))
+        data = self.location_data[location_key]
         
         if column_id == '#1': # Index 0
             
             # Checkbox nur toggeln, wenn es keine UNZUGEOORDNETEN Daten oder unaufgelöste Konflikte sind
-            if current_values[8] in ["Unvollständige Daten", "MEHRDEUTIG (Klick zur Auflösung)"]: # Status Index 8
+            if data['status'] in [STATUS_INCOMPLETE, STATUS_AMBIGUOUS]:
                  self.log_message("HINWEIS: Dieser Eintrag kann nicht zur Neuanlage markiert werden.")
                  return "break"
                  
-            current_value = current_values[0]
-            new_value = "" if current_value == "X" else "X"
-            
-            current_values[0] = new_value
-            
-            self.tree.item(item_id, values=tuple(current_values))
-            self.checkbox_status[item_id] = (new_value == "X")
+            data['selected'] = not data['selected']
+            self.refresh_row(location_key)
             
             return "break" 
         
         # NEUE LOGIK: Wenn der Nutzer auf die Status-Spalte klickt und diese 'MEHRDEUTIG' ist (Index 8)
-        elif column_id == '#9' and current_values[8].startswith("MEHRDEUTIG"):
-             self.resolve_ambiguity(item_id, current_values)
+        elif column_id == '#9' and data['status'].startswith("MEHRDEUTIG"):
+             self.resolve_ambiguity(location_key)
              return "break"
 
 
-    def resolve_ambiguity(self, item_id, current_values):
-        """Öffnet den Dialog zur Auflösung der Mehrdeutigkeit und aktualisiert die Tabelle. (Indexe angepasst)"""
-        
-        call = current_values[1]
-        locator = current_values[2]
-        location_key = f"{call}|{locator}"
-        
-        conflicting_stations = self.location_data[location_key].get('conflicting_stations', {})
+    def resolve_ambiguity(self, location_key):
+        """Öffnet den Dialog zur Auflösung der Mehrdeutigkeit und aktualisiert die Tabelle."""
+        data = self.location_data[location_key]
+        conflicting_stations = data.get('conflicting_stations') or {}
 
         dialog = ResolutionDialog(self.master, location_key, conflicting_stations)
         
         if dialog.result_id:
             resolved_id = dialog.result_id
             
-            new_values = list(current_values)
-            
             if resolved_id == "NEU":
-                new_values[9] = "NEU" # Wavelog ID (Index 9)
-                new_values[8] = "NEU (Anlegen)" # Status (Index 8)
-                new_values[0] = "X" # Checkbox setzen (Index 0)
+                data['wavelog_id'] = "NEU"
+                data['status'] = STATUS_NEW
+                data['selected'] = True
                 self.log_message(f"Mehrdeutigkeit für {location_key} als NEUE Station markiert.")
             else:
                 new_id = resolved_id.split('_')[1]
+                new_profile_name = conflicting_stations.get(new_id, data['profile_name'])
                 
-                new_profile_name = conflicting_stations.get(new_id, new_values[4])
-                
-                new_values[9] = new_id # Wavelog ID
-                new_values[4] = new_profile_name # Profilname
-                new_values[8] = f"Zugewiesen: ID {new_id}" # Status
-                new_values[0] = "" # Checkbox entfernen, da existierende ID
+                # Checkbox entfällt, da existierende ID
+                apply_resolution(data, new_id, new_profile_name)
                 self.log_message(f"Mehrdeutigkeit für {location_key} auf ID {new_id} ({new_profile_name}) aufgelöst.")
             
-            self.tree.item(item_id, values=tuple(new_values))
-            self.location_data[location_key]['wavelog_id'] = new_values[9]
-            self.location_data[location_key]['is_new'] = (new_values[9] == "NEU")
+            data['is_new'] = (data['wavelog_id'] == "NEU")
+            self.refresh_row(location_key)
 
 
     def on_item_double_click(self, event):
         """Erlaubt das Editieren des Profilnamens, CQ und ITU (Entry) und DXCC (Dialog)."""
         
         item_id = self.tree.identify_row(event.y)
-        if not item_id:
+        location_key = self.results_table.key_for_item(item_id)
+        if location_key is None:
             return
             
         column_id = self.tree.identify_column(event.x)
-        column_index = int(column_id.replace('#', '')) - 1
         
         column_name = self.tree.heading(column_id)['text']
-        editable_columns = ["Profilname", "DXCC", "CQ", "ITU"]
+        # Spaltenname -> Feld in den Standortdaten
+        editable_columns = {"Profilname": 'profile_name', "DXCC": 'dxcc', "CQ": 'cqz', "ITU": 'ituz'}
         
         if column_name not in editable_columns:
             return 
             
-        # Prüfe, ob die Zeile unvollständige Daten hat oder MEHRDEUTIG ist (Status Index 8)
-        current_values = self.tree.item(item_id, 'values')
-        if current_values[8] in ["Unvollständige Daten", "MEHRDEUTIG (Klick zur Auflösung)"]:
+        data = self.location_data[location_key]
+        field = editable_columns[column_name]
+        
+        # Prüfe, ob die Zeile unvollständige Daten hat oder MEHRDEUTIG ist
+        if data['status'] in [STATUS_INCOMPLETE, STATUS_AMBIGUOUS]:
              self.log_message("HINWEIS: Dieses Feld kann für Standorte mit unvollständigen Daten oder unaufgelöster Mehrdeutigkeit nicht editiert werden.")
              return
             
-        original_value = current_values[column_index]
+        original_value = str(data[field])
         
-        # Position des Widgets (nur noch für Entry benötigt)
-        x, y, width, height = self.tree.bbox(item_id, column_id)
-
         if column_name == "DXCC":
-            # --- LOGIK FÜR DXCC (COMBOBOX-DIALOG) ---
-            
-            call = current_values[1]
-            locator = current_values[2]
-            location_key = f"{call}|{locator}"
+            # --- LOGIK FÜR DXCC (AUSWAHLDIALOG MIT SUCHE) ---
             
             # 1. Dialog starten
-            dialog = DXCCSelectionComboboxDialog(
+            dialog = DXCCSelectionDialog(
                 self.master, 
                 location_key, 
-                self.dxcc_combo_list, # Liste der vorformatierten Namen + IDs
+                self.dxcc_catalog,    # Katalog mit Suchindizes
                 original_value        # Original DXCC ID
             )
             
@@ -545,22 +1007,20 @@ class ADIFSplitterApp:
             
             if new_value and new_value != original_value:
                 
-                selected_name = self.dxcc_id_to_name.get(new_value, 'Unbekannt')
+                selected_name = self.dxcc_catalog.name(new_value)
                 
-                # 3. Treeview aktualisieren (Index 5 ist DXCC ID)
-                new_values = list(current_values)
-                new_values[5] = new_value 
-                self.tree.item(item_id, values=tuple(new_values))
+                # 3. Interne Daten und Tabelle aktualisieren
+                data['dxcc'] = new_value
+                self.refresh_row(location_key)
                 
-                # 4. Interne Daten aktualisieren
-                if location_key in self.location_data:
-                    self.location_data[location_key]['dxcc'] = new_value
-                
-                self.log_message(f"DXCC für {call}@{locator} auf '{selected_name}' (ID: {new_value}) geändert.")
+                self.log_message(f"DXCC für {data['call']}@{data['locator']} auf '{selected_name}' (ID: {new_value}) geändert.")
                 
         else:
             # --- BESTEHENDE LOGIK FÜR ENTRY (Profilname, CQ, ITU) ---
             
+            # Position des Widgets
+            x, y, width, height = self.tree.bbox(item_id, column_id)
+            
             entry_edit = ttk.Entry(self.tree, width=len(original_value) + 5)
             entry_edit.insert(0, original_value)
             entry_edit.select_range(0, tk.END)
@@ -583,20 +1043,12 @@ class ADIFSplitterApp:
                         self.log_message(f"WARNUNG: ITU-Zone {new_value} außerhalb des üblichen Bereichs (1-90).")
                 
                 
-                if new_value != original_value:
-                    new_values = list(current_values)
-                    new_values[column_index] = new_value
-                    self.tree.item(item_id, values=tuple(new_values))
-                    
-                    # Interne Datenstruktur aktualisieren
-                    location_key = f"{new_values[1]}|{new_values[2]}"
-                    if location_key in self.location_data:
-                        if column_name == "CQ":
-                            self.location_data[location_key]['cqz'] = new_value
-                        elif column_name == "ITU":
-                            self.location_data[location_key]['ituz'] = new_value
-
-                    self.log_message(f"{column_name} für {new_values[1]}@{new_values[2]} auf '{new_value}' geändert.")
+                if new_value != original_value and location_key in self.location_data:
+                    # Interne Datenstruktur und Tabelle aktualisieren
+                    data[field] = new_value
+                    self.refresh_row(location_key)
+
+                    self.log_message(f"{column_name} für {data['call']}@{data['locator']} auf '{new_value}' geändert.")
 
 
             entry_edit.bind('<Return>', on_edit_finished)
@@ -604,37 +1056,129 @@ class ADIFSplitterApp:
             
     
     def load_adif_file(self):
-        """Öffnet einen Dialog zur Auswahl der ADIF-Datei. (Re-inserted)"""
-        file_path = filedialog.askopenfilename(
+        """Öffnet einen Dialog zur Auswahl einer oder mehrerer ADIF-Dateien."""
+        if self.is_job_running():
+            return
+        
+        file_paths = filedialog.askopenfilenames(
             defaultextension=".adi",
             filetypes=[ 
                 ("ADIF alternative", "*.adi"),
                 ("ADIF files", "*.adif"),
+                ("ADIF komprimiert", "*.gz *.bz2 *.xz *.zip"),
                 ("All files", "*.*")
             ]
         )
         
+        if len(file_paths) > 1:
+            self.select_adif_batch(collect_adif_files(file_paths))
+            return
+
+        file_path = file_paths[0] if file_paths else None
         if file_path:
             self.log_message(f"Datei ausgewählt: {os.path.basename(file_path)}")
-            self.loaded_qso_list = []
-            self.tree.delete(*self.tree.get_children())
-            self.location_data = {}
+
+            # Dieselbe Datei erneut gewählt: Ergebnisse und Änderungen behalten, nur neue QSOs lesen
+            if not get_compression(file_path) and self.processed_file is not None and self.processed_file.file_path == os.path.abspath(file_path) and self.location_data:
+                self.adif_file_path = file_path
+                self.log_message("Datei wurde bereits verarbeitet. Beim Verarbeiten werden nur neu angehängte QSOs gelesen.")
+                return
+
+            self.reset_loaded_files()
             
-            try:
-                # adif_io.read_from_file gibt eine Liste von QSOs und ein Header-Dictionary zurück.
-                self.loaded_qso_list, _ = adif_io.read_from_file(file_path)
-                self.log_message(f"Erfolgreich {len(self.loaded_qso_list)} QSOs eingelesen und gespeichert.")
-            except Exception as e:
-                error_message = f"Fehler beim Lesen der ADIF-Datei: {e}"
+            # Die Datei wird nicht mehr komplett eingelesen, sondern bei Analyse und Export gestreamt.
+            if os.path.isfile(file_path):
+                self.adif_file_path = file_path
+                size_mb = os.path.getsize(file_path) / (1024 * 1024)
+                self.log_message(f"ADIF-Datei vorgemerkt ({size_mb:.1f} MB). QSOs werden bei der Verarbeitung gelesen.")
+            else:
+                error_message = f"Fehler beim Lesen der ADIF-Datei: '{file_path}' existiert nicht."
                 self.log_message(error_message)
                 messagebox.showerror("Fehler", error_message)
         else:
             self.log_message("Dateiauswahl abgebrochen.")
 
 
-    def start_processing(self):
-        """Startet den gesamten Prozess. (Re-inserted)"""
-        if not self.loaded_qso_list:
+    def load_adif_directory(self):
+        """Wählt ein Verzeichnis aus, alle darin enthaltenen ADIF-Dateien werden gemeinsam verarbeitet."""
+        if self.is_job_running():
+            return
+
+        directory = filedialog.askdirectory(title="Wählen Sie das Verzeichnis mit den ADIF-Dateien")
+        if not directory:
+            self.log_message("Verzeichnisauswahl abgebrochen.")
+            return
+
+        file_paths = collect_adif_files([directory])
+        if not file_paths:
+            error_message = f"Im Verzeichnis '{directory}' wurden keine ADIF-Dateien (*.adi, *.adif) gefunden."
+            self.log_message(error_message)
+            messagebox.showerror("Fehler", error_message)
+            return
+
+        if len(file_paths) == 1:
+            self.reset_loaded_files()
+            self.adif_file_path = file_paths[0]
+            self.log_message(f"Datei ausgewählt: {os.path.basename(file_paths[0])}")
+            return
+
+        self.select_adif_batch(file_paths)
+
+
+    def select_adif_batch(self, file_paths):
+        """Merkt mehrere ADIF-Dateien zur gemeinsamen Verarbeitung vor."""
+        self.reset_loaded_files()
+        self.adif_file_paths = file_paths
+
+        total_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / (1024 * 1024)
+        self.log_message(f"{len(file_paths)} ADIF-Dateien vorgemerkt ({total_mb:.1f} MB). Sie werden bei der Verarbeitung parallel gelesen.")
+
+
+    def reset_loaded_files(self):
+        """Verwirft die bisher gewählten Dateien und alle Ergebnisse."""
+        self.adif_file_path = None
+        self.adif_file_paths = []
+        self.grouped_by_file = None
+        self.processed_file = None
+        self.qso_store = None
+        self.grouped_qsos = None
+        self.clear_results_table()
+
+
+    def report_job_progress(self, value, maximum=0, text=None):
+        """Fortschritts-Callback für die Engine-Funktionen (prüft zugleich auf Abbruch)."""
+        self.jobs.check_cancelled()
+        self.jobs.report_progress(value, maximum, text)
+
+
+    def iter_loaded_qsos(self, progress_text=None, start_offset=0, position=None):
+        """
+        Liefert die QSOs der gewählten ADIF-Datei einzeln (Streaming, begrenzter Speicher).
+        Mit progress_text wird der Lesefortschritt gemeldet und auf einen Abbruch geprüft.
+        """
+        progress = self.report_job_progress if progress_text else None
+        if self.uses_raw_copy():
+            return iter_adif_spans(self.adif_file_path, progress=progress, progress_text=progress_text or "Scanne ADIF",
+                                   start_offset=start_offset, position=position, with_time=self.session_gap_hours > 0)
+        return iter_adif_file(self.adif_file_path, progress=progress, progress_text=progress_text or "Lese ADIF",
+                              start_offset=start_offset, position=position)
+
+
+    def uses_raw_copy(self):
+        """Rohkopie-Export: Gruppierung per mmap-Vorlauf, nur ohne kompakten QSO-Speicher und für unkomprimierte Dateien."""
+        return (self.raw_copy_export and not self.keep_qsos_in_memory
+                and not get_compression(self.adif_file_path or ''))
+
+
+    def start_processing(self, full=False):
+        """
+        Startet den gesamten Prozess als Hintergrund-Job.
+        Wurde die Datei bereits verarbeitet, werden nur angehängte QSOs gelesen (außer bei full=True).
+        """
+        if self.is_job_running():
+            return
+        
+        if not self.adif_file_path and not self.adif_file_paths:
             messagebox.showwarning("Achtung", "Bitte zuerst eine ADIF-Datei laden.")
             return
 
@@ -642,358 +1186,311 @@ class ADIFSplitterApp:
             messagebox.showwarning("Achtung", "Bitte zuerst die Wavelog API konfigurieren.")
             return
 
+        # Komprimierte Dateien werden immer vollständig gelesen, Aktivierungen brauchen die Zeitpunkte aller QSOs
+        incremental = (not full and not self.adif_file_paths and not get_compression(self.adif_file_path)
+                       and self.session_gap_hours <= 0
+                       and self.processed_file is not None and bool(self.location_data)
+                       and self.processed_file.file_path == os.path.abspath(self.adif_file_path))
+        if not incremental:
+            self.clear_results_table()
+        
+        self.jobs.start("Verarbeitung", self.instrumented("Verarbeitung", self.run_processing_job), incremental)
+
+
+    def run_processing_job(self, incremental=False):
+        """Worker: Lädt die Wavelog-Profile und gruppiert anschließend die QSOs (ggf. nur die neuen)."""
         self.fetch_all_wavelog_locations()
+        self.jobs.check_cancelled()
         
-        if self.wavelog_locations is not None:
-             self.group_and_process_qsos(self.loaded_qso_list)
+        if self.wavelog_locations is not None and self.adif_file_paths:
+             try:
+                 self.group_and_process_files()
+                 self.run_in_ui(self.save_workspace, True)
+             except OSError as e:
+                 error_message = f"Fehler beim Lesen der ADIF-Dateien: {e}"
+                 self.log_message(error_message)
+                 self.run_in_ui(messagebox.showerror, "Fehler", error_message)
+        elif self.wavelog_locations is not None:
+             try:
+                 start_offset = None
+                 if incremental:
+                     start_offset = self.processed_file.resume_offset(self.adif_file_path)
+                     if start_offset is None:
+                         self.log_message("HINWEIS: Die Datei wurde nicht nur ergänzt, sondern verändert. Verarbeite vollständig neu.")
+
+                 position = {}
+                 if start_offset is None:
+                     self.group_and_process_qsos(self.iter_loaded_qsos(progress_text="Analysiere", position=position))
+                 else:
+                     self.process_appended_qsos(self.iter_loaded_qsos(progress_text="Analysiere neue QSOs",
+                                                                      start_offset=start_offset, position=position))
+                 self.processed_file = ProcessedFile.capture(self.adif_file_path, position['end_offset'])
+                 # Nach dem Befüllen der Tabelle (Aufrufe im Haupt-Thread laufen in Reihenfolge)
+                 self.run_in_ui(self.save_workspace, True)
+             except OSError as e:
+                 error_message = f"Fehler beim Lesen der ADIF-Datei: {e}"
+                 self.log_message(error_message)
+                 self.run_in_ui(messagebox.showerror, "Fehler", error_message)
         else:
              self.log_message("FEHLER: Konnte Wavelog-Daten nicht laden. Verarbeitung abgebrochen.")
 
     
-    def fetch_all_wavelog_locations(self):
-        """Ruft alle Stationsprofile von Wavelog ab. (Ihre Korrektur beibehalten: station_info)"""
-        self.log_message("\n-> Lade alle existierenden Wavelog Stationsprofile...")
-        
-        base_url = self.wavelog_url.rstrip('/') 
-        base_host = base_url.split('/api')[0] 
-        # ENDPUNKT KORREKTUR: 'station_info' anstelle von 'station_profile'
-        search_url = f"{base_host}/index.php/api/station_info/{self.wavelog_token}"
-        
-        headers = {'Content-Type': 'application/json'}
-        
-        try:
-            response = requests.get(search_url, headers=headers, timeout=15)
-            response.raise_for_status()
+    def get_wavelog_client(self):
+        """Liefert den wiederverwendeten API-Client (Verbindungspool passend zur Parallelität, Wiederholungen, Ratenbegrenzung)."""
+        if self.wavelog_client is None:
+            self.wavelog_client = WavelogClient(self.wavelog_url, self.wavelog_token, self.max_workers,
+                                                max_retries=self.max_retries, rate_limit=self.rate_limit,
+                                                stats=self.stats)
+        return self.wavelog_client
+
+
+    def fetch_all_wavelog_locations(self, force_refresh=False):
+        """Ruft alle Stationsprofile ab (innerhalb der TTL aus dem lokalen Cache) und baut den Stationsindex auf."""
+        with self.stats.stage('station_info'):
+            self.wavelog_locations = fetch_station_info(
+                self.get_wavelog_client(), self.log_message,
+                cache=self.station_cache, force_refresh=force_refresh
+            )
+        self.station_index = WavelogStationIndex(self.wavelog_locations)
+        return self.wavelog_locations is not None
 
-            data = response.json()
-            
-            # PRÜFUNG KORREKTUR: Prüft direkt auf Liste
-            if isinstance(data, list):
-                self.wavelog_locations = data
-                self.log_message(f"-> {len(data)} Stationsprofile erfolgreich geladen.")
-                return True
-            else:
-                self.log_message("FEHLER: API gab keine erwartete Liste von Standorten zurück.")
-                return False
-
-        except requests.exceptions.HTTPError as errh:
-            status_code = errh.response.status_code
-            self.log_message(f"-> HTTP-FEHLER ({status_code}) beim Laden der Profile: {errh}")
-        except requests.exceptions.RequestException as err:
-            self.log_message(f"-> Allgemeiner Fehler beim Laden der Profile: {err}")
-            
-        self.wavelog_locations = None
-        return False
+
+    def clear_station_cache(self):
+        """Verwirft den lokalen Stations-Cache, die nächste Verarbeitung lädt alle Profile neu."""
+        if self.is_job_running():
+            return
+        self.station_cache.invalidate()
+        self.log_message("Stations-Cache geleert. Die Profile werden bei der nächsten Verarbeitung neu geladen.")
+
+
+    def get_location_resolver(self):
+        """Offline-Ermittlung von DXCC/Zonen (lädt die Länderdatei erst bei Bedarf), None wenn abgeschaltet."""
+        if not self.infer_dxcc:
+            return None
+        if self.location_resolver is None:
+            self.location_resolver = LocationResolver.for_config(self.CONFIG_FILE, self.cty_path, self.grid_zones_path,
+                                                                 self.log_message)
+        return self.location_resolver
 
 
-    def group_and_process_qsos(self, qso_list):
+    def get_creation_journal(self):
+        """Journal der Anlege-Requests für die konfigurierte Wavelog-Instanz."""
+        return CreationJournal.for_config(self.CONFIG_FILE, station_cache_source(self.wavelog_url, self.wavelog_token))
+
+
+    def clear_creation_journal(self):
+        """Verwirft das Anlege-Journal, danach werden auch früher angelegte Stationen erneut gesendet."""
+        if self.is_job_running():
+            return
+        if not messagebox.askyesno("Anlege-Journal leeren",
+                                   "Das Journal verhindert doppelt angelegte Stationen bei wiederholten Läufen.\n"
+                                   "Wirklich leeren?"):
+            return
+        self.get_creation_journal().clear()
+        self.log_message("Anlege-Journal geleert.")
+
+
+    def group_and_process_qsos(self, qso_iter):
         """
-        Gruppiert QSOs, prüft Wavelog und liest DXCC, CQ und ITU Zonen aus. (Indexe angepasst)
+        Gruppiert QSOs, prüft Wavelog und liest DXCC, CQ und ITU Zonen aus.
+        Die QSOs werden als Stream verarbeitet, pro Standort werden nur Zähler und Auszählungen behalten.
         """
         self.log_message("\n--- Starte Analyse und Gruppierung der Standorte ---\n")
         
-        self.tree.delete(*self.tree.get_children())
+        store = QSOStore() if self.keep_qsos_in_memory else None
+        with self.stats.stage('parse_group'):
+            grouped_qsos = group_qsos(self.stats.timed_iter('parse', qso_iter), self.log_message, store,
+                                      with_spans=self.uses_raw_copy(), grid_precision=self.grid_precision,
+                                      session_times=self.session_gap_hours > 0)
+            cluster_location_groups(grouped_qsos, self.cluster_km, log=self.log_message)
+            split_sessions(grouped_qsos, self.session_gap_hours, log=self.log_message)
+        self.count_grouped(grouped_qsos)
+        self.qso_store = store
+        self.grouped_qsos = grouped_qsos
+        with self.stats.stage('matching'):
+            location_data = build_location_data(grouped_qsos, self.station_index, self.log_message,
+                                                self.get_location_resolver())
+
+        # Tabelle im Haupt-Thread befüllen
+        self.run_in_ui(self.fill_results_table, location_data)
+
+
+    def group_and_process_files(self):
+        """Gruppiert mehrere ADIF-Dateien parallel und führt die Standorte zu einer Tabelle zusammen."""
+        self.log_message("\n--- Starte Analyse und Gruppierung der Standorte (mehrere Dateien) ---\n")
+        if self.keep_qsos_in_memory:
+            self.log_message("HINWEIS: Bei mehreren Dateien werden die QSOs nicht im Speicher gehalten.")
+
+        with self.stats.stage('parse_group'):
+            grouped_by_file = group_adif_files(self.adif_file_paths, self.import_workers, self.raw_copy_export,
+                                               self.log_message, self.report_job_progress, self.grid_precision,
+                                               self.session_gap_hours > 0)
+            grouped_qsos = merge_file_groups(grouped_by_file, self.log_message)
+            cluster_location_groups(grouped_qsos, self.cluster_km, grouped_by_file, log=self.log_message)
+            split_sessions(grouped_qsos, self.session_gap_hours, grouped_by_file, self.log_message)
+            self.grouped_by_file = grouped_by_file
+            self.grouped_qsos = grouped_qsos
+        self.count_grouped(self.grouped_qsos)
+        self.qso_store = None
+        with self.stats.stage('matching'):
+            location_data = build_location_data(self.grouped_qsos, self.station_index, self.log_message,
+                                                self.get_location_resolver())
+
+        self.run_in_ui(self.fill_results_table, location_data)
+
+
+    def process_appended_qsos(self, qso_iter):
+        """Gruppiert nur die seit der letzten Verarbeitung angehängten QSOs und ergänzt die bestehenden Gruppen."""
+        self.log_message("\n--- Inkrementelle Verarbeitung: Lese nur neu angehängte QSOs ---\n")
+
+        store = self.qso_store if self.keep_qsos_in_memory else None
+        with self.stats.stage('parse_group'):
+            new_groups = group_qsos(self.stats.timed_iter('parse', qso_iter), self.log_message, store,
+                                    with_spans=self.uses_raw_copy(), grid_precision=self.grid_precision)
+        self.count_grouped(new_groups)
+        # Erst nach vollständigem Lesen übernehmen, damit ein Abbruch die Gruppierung nicht verfälscht
+        merge_grouped_qsos(self.grouped_qsos, new_groups)
+        # Neue Locatoren nahe bestehender Standorte diesen zuordnen (angezeigte Standorte bleiben Leitstandorte)
+        cluster_location_groups(self.grouped_qsos, self.cluster_km, preferred_keys=list(self.location_data),
+                                log=self.log_message)
+
+        self.run_in_ui(self.apply_appended_groups)
+
+
+    def apply_appended_groups(self):
+        """Übernimmt die ergänzten Gruppen in Standortdaten und Tabelle (Haupt-Thread, Änderungen bleiben erhalten)."""
+        new_keys = merge_location_data(self.location_data, self.grouped_qsos, self.station_index, self.log_message,
+                                       self.get_location_resolver())
+        self.results_table.set_keys(self.location_data, keep_position=True)
+        self.log_message(f"{len(new_keys)} neue Standorte hinzugefügt, bestehende Einträge aktualisiert.")
+
+
+    def clear_results_table(self):
         self.location_data = {}
-        
-        grouped_qsos = defaultdict(list)
-        
-        CALL_FIELD = 'STATION_CALLSIGN'
-        LOCATOR_FIELD = 'MY_GRIDSQUARE'
-        DXCC_FIELD = 'MY_DXCC' 
-        CQZ_FIELD = 'MY_CQ_ZONE'
-        ITUZ_FIELD = 'MY_ITU_ZONE'
-        
-        # 1. Gruppierung der QSOs
-        unassigned_count = 0
-        for qso in qso_list:
-            call = qso.get(CALL_FIELD, '').upper()
-            locator = qso.get(LOCATOR_FIELD, '').upper()
-            
-            if call and locator:
-                location_key = f"{call}|{locator}"
-            else:
-                location_key = "UNZUGEOORDNET|FEHLT"
-                unassigned_count += 1
-                
-            grouped_qsos[location_key].append(qso)
-            
-        self.log_message(f"Gesamtanzahl eindeutiger Standorte gefunden: {len(grouped_qsos) - (1 if unassigned_count > 0 else 0)}")
-        if unassigned_count > 0:
-             self.log_message(f"WARNUNG: {unassigned_count} QSOs fehlen wichtige Felder.")
+        self.results_table.set_keys([])
 
-        # 2. Anzeige in der Tabelle und API-Prüfung
-        for location_key, qsos in grouped_qsos.items():
-            
-            first_qso = qsos[0]
-            
-            # Extrahiere und bereinige die neuen Felder
-            qso_dxcc = first_qso.get(DXCC_FIELD, '0').strip()
-            qso_cq = first_qso.get(CQZ_FIELD, '0').strip()
-            qso_itu = first_qso.get(ITUZ_FIELD, '0').strip()
-            
-            if not qso_dxcc.isdigit() or qso_dxcc == "": qso_dxcc = "0"
-            if not qso_cq.isdigit() or qso_cq == "": qso_cq = "0"
-            if not qso_itu.isdigit() or qso_itu == "": qso_itu = "0"
-            
-            
-            if location_key == "UNZUGEOORDNET|FEHLT":
-                call, locator = "N/A", "N/A"
-                is_found_on_api, wavelog_id, profile_name_db, conflicts = False, "N/A", "UNZUGEOORDNET", None
-                status_text = "Unvollständige Daten"
-                checkbox_value = ""
-                profile_name_db = "UNZUGEOORDNET"
-            else:
-                call, locator = location_key.split('|')
-                is_found_on_api, wavelog_id, profile_name_db, conflicts = self.check_wavelog_api_local(call, locator)
-                
-                if conflicts:
-                    status_text = "MEHRDEUTIG (Klick zur Auflösung)"
-                    wavelog_id = "KONFLIKT"
-                    checkbox_value = ""
-                    profile_name_db = ", ".join(conflicts.values())
-                elif is_found_on_api:
-                    status_text = "Gefunden" 
-                    checkbox_value = ""
-                else:
-                    status_text = "NEU (Anlegen)"
-                    checkbox_value = "X"
-                    wavelog_id = "NEU"
-
-
-            # Daten in der Tabelle anzeigen (mit Indexen 0-9)
-            item_id = self.tree.insert('', tk.END, values=(
-                checkbox_value,  # 0
-                call,            # 1
-                locator,         # 2
-                len(qsos),       # 3
-                profile_name_db, # 4 (Profilname/Konfliktliste)
-                qso_dxcc,        # 5 (DXCC)
-                qso_cq,          # 6 (CQ)
-                qso_itu,         # 7 (ITU)
-                status_text,     # 8 (Status)
-                wavelog_id       # 9 (Wavelog ID)
-            ))
-            
-            self.checkbox_status[item_id] = (checkbox_value == "X")
-            
-            # Speichere die QSOs und optionalen Felder intern
-            self.location_data[location_key] = {
-                'call': call,
-                'locator': locator,
-                'qsos': qsos,
-                'wavelog_id': wavelog_id,
-                'is_new': (wavelog_id == "NEU"),
-                'tree_item_id': item_id,
-                'conflicting_stations': conflicts,
-                'dxcc': qso_dxcc,
-                'cqz': qso_cq,
-                'ituz': qso_itu
-            }
-
-        self.log_message("Tabelle mit Standorten befüllt.")
 
+    def fill_results_table(self, location_data):
+        """Zeigt die Standorte in der Tabelle an (Haupt-Thread, nur die sichtbaren Zeilen werden angelegt)."""
+        self.location_data = location_data
+        self.results_table.set_keys(location_data)
 
-    def check_wavelog_api_local(self, callsign, gridsquare):
-        """Prüft lokal auf Stationen. (Unverändert)"""
-        if not self.wavelog_locations:
-            self.log_message("WARNUNG: Lokale Stationsliste ist leer. Überspringe Check.")
-            return False, "N/A", "N/A", None
+        self.log_message(f"Tabelle mit {len(location_data)} Standorten befüllt.")
 
-        search_call = callsign.upper()
-        search_locator = gridsquare.upper()
 
-        found_matches = {}
-
-        for station in self.wavelog_locations:
-            station_call = station.get('station_callsign', '').upper()
-            station_locator = station.get('station_gridsquare', '').upper()
-            station_profile_name = station.get('station_profile_name', 'Unbekanntes Profil')
-            
-            if station_call == search_call and station_locator == search_locator:
-                station_id = station.get('station_id')
-                if station_id:
-                    found_matches[str(station_id)] = station_profile_name
-                    
-        
-        count = len(found_matches)
-        
-        if count == 0:
-            return False, "N/A", "N/A", None
-        elif count == 1:
-            station_id, station_name = list(found_matches.items())[0]
-            self.log_message(f"  -> {callsign}@{gridsquare} GEFUNDEN (ID: {station_id}, Profil: {station_name})")
-            return True, station_id, station_name, None
-        else:
-            self.log_message(f"  -> {callsign}@{gridsquare} MEHRDEUTIG! ({count} Profile gefunden)")
-            first_id, first_name = list(found_matches.items())[0]
-            return True, first_id, first_name, found_matches
+    def check_wavelog_api_local(self, callsign, gridsquare):
+        """Prüft lokal auf Stationen."""
+        return self.station_index.match(callsign, gridsquare, self.log_message)
 
 
     # ----------------------------------------
-    # Abschnitt: Weitere Methoden (Unverändert)
+    # Abschnitt: Weitere Methoden
     # ----------------------------------------
     def create_new_wavelog_locations(self):
         """
         Sendet POST-Requests zur Erstellung von Stationsprofilen, inkl. DXCC, CQ, ITU. 
+        Die Einträge werden im Haupt-Thread gesammelt, das Anlegen läuft als Hintergrund-Job.
         """
+        if self.is_job_running():
+            return
         
         if not self.wavelog_url or not self.wavelog_token:
             self.log_message("FEHLER: Wavelog API URL oder Token fehlt. Kann keine Stationen anlegen.")
             return
 
-        # Endpunkt-Korrekur beibehalten
-        base_url = self.wavelog_url.rstrip('/') 
-        base_host = base_url.split('/api')[0] 
-        post_url = f"{base_host}/index.php/api/create_station/{self.wavelog_token}" 
-        
-        headers = { 'Content-Type': 'application/json' }
-        
-        items_to_create = []
-        
-        # 2. Sammle alle zu erstellenden Einträge aus der Tabelle (Index 0: Checkbox, Index 8: Status)
-        for item_id in self.tree.get_children():
-            values = self.tree.item(item_id, 'values')
-            
-            if values and values[0] == "X" and values[8] not in ["Unvollständige Daten", "MEHRDEUTIG (Klick zur Auflösung)"]: 
-                
-                data = {
-                    'callsign': values[1],
-                    'locator': values[2],
-                    'profile_name': values[4], 
-                    'station_dxcc': values[5],   # Index 5
-                    'station_cq': values[6],     # Index 6
-                    'station_itu': values[7],    # Index 7
-                    'item_id': item_id,
-                    'created_successfully': False
-                }
-                items_to_create.append(data)
-                
-                new_values = list(values)
-                new_values[8] = "Wird erstellt..." # Status (Index 8)
-                self.tree.item(item_id, values=tuple(new_values))
-            
-            elif values and values[8].startswith("MEHRDEUTIG"):
-                 self.log_message(f"WARNUNG: Kann Station {values[1]}@{values[2]} nicht anlegen, Mehrdeutigkeit muss zuerst aufgelöst werden.")
-
+        # Sammle alle zu erstellenden Einträge
+        items_to_create = collect_items_to_create(self.location_data, self.log_message)
 
         if not items_to_create:
             self.log_message("\nKeine Stationen zum Anlegen markiert.")
             return
 
+        for item in items_to_create:
+            self.location_data[item['location_key']]['status'] = "Wird erstellt..."
+            self.refresh_row(item['location_key'])
+
         self.log_message(f"\nStarte Erstellung von {len(items_to_create)} neuen Stationsprofilen...")
         
-        successfully_created_items = [] 
+        self.jobs.start("Stationen anlegen", self.instrumented("Stationen anlegen", self.run_creation_job), items_to_create)
 
-        # 3. Führe den POST-Request für jeden Eintrag aus
-        for item in items_to_create:
-            call = item['callsign']
-            locator = item['locator']
-            profile_name = item['profile_name']
-            item_id = item['item_id']
-            dxcc = item['station_dxcc']
-            cq = item['station_cq']
-            itu = item['station_itu']
-            
-            # Payload mit den neuen Feldern
-            payload = [{
-                "station_callsign": call,
-                "station_gridsquare": locator,
-                "station_profile_name": profile_name,
-                "station_dxcc": dxcc,
-                "station_cq": cq,
-                "station_itu": itu
-            }]
-            
-            new_id = "FEHLER"
-            status_text = "FEHLER (unbek.)"
-            
-            try:
-                self.log_message(f"  -> POST-Request zum Anlegen für {call}@{locator} (DXCC: {dxcc}, CQ: {cq}, ITU: {itu})...")
-                
-                response = requests.post(post_url, json=payload, headers=headers, timeout=10)
-                response.raise_for_status()
 
-                api_response = response.json() 
-                
-                if api_response.get('status') == 'success' and 'imported' in api_response.get('message', ''):
-                    status_text = "Angelegt (ID wird gesucht)"
-                    item['created_successfully'] = True 
-                    successfully_created_items.append(item)
-                    self.log_message(f"  -> ERFOLG: Station {call}@{locator} angelegt. Suche ID...")
-                else:
-                    status_text = "FEHLER (kein Erfolg i. Status)"
-                    self.log_message(f"  -> FEHLER: POST OK, aber Status nicht 'success'. Response: {api_response}")
-                    
-            except requests.exceptions.HTTPError as errh:
-                status_code = errh.response.status_code
-                response_text = errh.response.text.strip()
-                status_text = f"HTTP-FEHLER {status_code}"
-                self.log_message(f"  -> HTTP-FEHLER ({status_code}) bei Erstellung: {response_text}")
-                
-            except requests.exceptions.RequestException as err:
-                status_text = "VERBINDUNGSFEHLER"
-                self.log_message(f"  -> Allgemeiner Fehler bei Erstellung: {err}")
-            
-            # Aktualisiere Zeile mit Zwischenstatus
-            current_values = self.tree.item(item_id, 'values')
-            new_values = list(current_values)
-            new_values[8] = status_text # Status (Index 8)
-            new_values[0] = "" if item['created_successfully'] else "X" 
-            self.tree.item(item_id, values=tuple(new_values))
-
-        # 4. Nach der Erstellung alle Profile neu laden und ID suchen
+    def run_creation_job(self, items_to_create):
+        """Worker: Legt die gesammelten Stationen an und sucht anschließend deren IDs."""
+        self.jobs.report_progress(0, len(items_to_create), "Lege Stationen an...")
+
+        def on_result(item, status_text, created_ok):
+            self.run_in_ui(self.apply_creation_result, item['location_key'], status_text, created_ok)
+
+        # Offene Versuche eines abgebrochenen Laufs gegen die aktuelle Stationsliste prüfen
+        journal = self.get_creation_journal()
+        if journal.needs_check(items_to_create):
+            self.log_message("Das Anlege-Journal enthält offene Versuche. Lade die Stationsliste neu...")
+            self.fetch_all_wavelog_locations(force_refresh=True)
+        stations_before = self.wavelog_locations
+
+        with self.stats.stage('create'):
+            successfully_created_items = create_stations(
+                self.get_wavelog_client(), items_to_create,
+                max_workers=self.max_workers, batch_size=self.create_batch_size,
+                log=self.log_message, on_result=on_result, progress=self.report_job_progress,
+                journal=journal, station_index=self.station_index
+            )
+        self.stats.count('stations_created', len(successfully_created_items))
+
+        # Nach der Erstellung die IDs zuordnen: Liefert die API die IDs mit, wird der Cache
+        # direkt ergänzt, sonst werden die Profile einmal neu geladen und mit der Liste davor verglichen
         if successfully_created_items:
-            self.log_message("\n--- Starte Suche nach neu erstellten Stations-IDs ---")
-            
-            self.fetch_all_wavelog_locations() 
-            
-            for item in successfully_created_items:
-                call = item['callsign']
-                locator = item['locator']
-                profile_name = item['profile_name']
-                item_id = item['item_id']
-                
-                found_id = "NICHT GEFUNDEN"
-                
-                if self.wavelog_locations:
-                    for station in self.wavelog_locations:
-                        db_call = station.get('station_callsign', '').upper()
-                        db_locator = station.get('station_gridsquare', '').upper()
-                        db_name = station.get('station_profile_name', '')
-                        
-                        if db_call == call.upper() and \
-                           db_locator.startswith(locator.upper()[:4]) and \
-                           db_name == profile_name:
-                            
-                            found_id = station.get('station_id', "ID FEHLT")
-                            break
-
-                # 5. Finales Update der Zeile
-                current_values = self.tree.item(item_id, 'values')
-                new_values = list(current_values)
-                
-                if found_id not in ["NICHT GEFUNDEN", "ID FEHLT"]:
-                    final_status = f"ID {found_id} gefunden"
-                    self.log_message(f"  -> ID gefunden für {call}@{locator}: {found_id}")
-                    # Interne Daten aktualisieren für den Export
-                    self.location_data[f"{call}|{locator}"]['wavelog_id'] = str(found_id)
-                    self.location_data[f"{call}|{locator}"]['is_new'] = False
+            self.jobs.report_progress(0, 0, "Suche neue Stations-IDs...")
+            with self.stats.stage('resolve_ids'):
+                new_stations = created_items_as_stations(successfully_created_items)
+                source = station_cache_source(self.wavelog_url, self.wavelog_token)
+                if new_stations and self.station_cache.has_data(source):
+                    self.station_cache.add_stations(new_stations)
+                    self.wavelog_locations = self.station_cache.stations
+                    self.station_index = WavelogStationIndex(self.wavelog_locations)
                 else:
-                    final_status = "Anlage OK, ID unklar"
-                    found_id = "UNKLARE ID"
-                    self.log_message(f"  -> FEHLER: ID konnte nach Neuladen nicht eindeutig gefunden werden.")
-                
-                new_values[8] = final_status # Status (Index 8)
-                new_values[9] = str(found_id) # Wavelog ID (Index 9)
-                self.tree.item(item_id, values=tuple(new_values))
+                    self.fetch_all_wavelog_locations(force_refresh=True)
+                found_ids, ambiguous = reconcile_created_ids(successfully_created_items, stations_before,
+                                                             self.wavelog_locations, self.log_message)
+                journal.record_ids(successfully_created_items, found_ids)
+            self.run_in_ui(self.apply_created_station_ids, found_ids, ambiguous)
 
         self.log_message("\nAnlegeprozess abgeschlossen.")
 
 
+    def apply_creation_result(self, location_key, status_text, created_ok):
+        """Übernimmt das Ergebnis eines Anlege-Requests in Tabelle und interne Daten (Haupt-Thread)."""
+        data = self.location_data[location_key]
+        data['status'] = status_text
+        data['selected'] = not created_ok
+        self.refresh_row(location_key)
+
+
+    def apply_created_station_ids(self, found_ids, ambiguous=None):
+        """
+        Übernimmt die nach dem Anlegen gefundenen IDs in Tabelle und interne Daten (Haupt-Thread).
+        Mehrdeutige Zuordnungen werden als MEHRDEUTIG markiert und per Klick aufgelöst.
+        """
+        for location_key, found_id in found_ids.items():
+            apply_created_id(self.location_data[location_key], found_id)
+            self.refresh_row(location_key)
+        for location_key, candidates in (ambiguous or {}).items():
+            apply_created_id(self.location_data[location_key], "KONFLIKT", candidates)
+            self.refresh_row(location_key)
+        if ambiguous:
+            self.log_message(f"WARNUNG: {len(ambiguous)} angelegte Station(en) konnten nicht eindeutig zugeordnet werden. Bitte in der Tabelle auflösen.")
+        if self.workspace is not None and self.wavelog_locations is not None:
+            self.run_workspace_action(self.workspace.save_stations, self.wavelog_locations)
+
+
     def export_adif_files(self):
         """
         Exportiert die eingelesenen QSOs in separate ADIF-Dateien. 
+        Die Zuordnung wird im Haupt-Thread ermittelt, das Schreiben läuft als Hintergrund-Job.
         """
+        if self.is_job_running():
+            return
+        
         if not self.location_data:
             messagebox.showwarning("Export Fehler", "Bitte zuerst eine ADIF-Datei laden und die Verarbeitung starten.")
             return
@@ -1015,92 +1512,254 @@ class ADIFSplitterApp:
             
         self.log_message("\n--- Starte ADIF-Export nach Wavelog ID ---")
         
-        qsos_by_export_key = defaultdict(list)
-        
-        for location_key, data in self.location_data.items():
-            
-            wavelog_id = data.get('wavelog_id')
-            qsos = data.get('qsos')
-            
-            item_id = data.get('tree_item_id')
-            try:
-                profile_name = self.tree.item(item_id, 'values')[4] 
-                status_text = self.tree.item(item_id, 'values')[8] # Index 8
-            except:
-                profile_name = data.get('call', 'NA')
-                status_text = "Unbekannt"
-            
-            
-            if status_text.startswith('MEHRDEUTIG'):
-                 self.log_message(f"  -> EXPORT ABGEBROCHEN: Standort {location_key} ist mehrdeutig und muss zuerst aufgelöst werden.")
-                 continue
-            
-            
-            if location_key == "UNZUGEOORDNET|FEHLT":
-                export_key_raw = "UNZUGEOORDNET"
-            elif wavelog_id == "NEU":
-                export_key_raw = f"NEU_{profile_name}_{data['call']}_{data['locator']}"
-            elif wavelog_id and wavelog_id not in ["N/A", "FEHLER", "UNKLARE ID", "KONFLIKT"]:
-                export_key_raw = f"ID_{wavelog_id}_{profile_name}_{data['locator']}"
+        # Zuordnung Standort -> Exportdatei (die QSOs selbst werden erst beim Schreiben gestreamt)
+        export_key_by_location = build_export_keys(self.location_data, self.log_message, self.grouped_qsos)
+
+        if self.grouped_by_file is not None:
+            separate_files = messagebox.askyesno(
+                "Export", f"Es wurden {len(self.grouped_by_file)} Dateien verarbeitet.\n"
+                          "Sollen die Exportdateien pro Quelldatei getrennt bleiben?",
+                default=messagebox.YES if self.separate_files else messagebox.NO)
+            self.jobs.start("Export", self.instrumented("Export", self.run_batch_export_job),
+                            export_dir, export_key_by_location, separate_files)
+            return
+
+        self.jobs.start("Export", self.instrumented("Export", self.run_export_job), export_dir, export_key_by_location)
+
+
+    def run_export_job(self, export_dir, export_key_by_location):
+        """
+        Worker: Schreibt die Exportdateien. Mit gespeicherten QSOs direkt aus dem Speicher,
+        sonst aus der Datei (Rohkopie der Datensätze oder bei export_workers > 1 auf mehrere Prozesse verteilt).
+        """
+        raw_copy = self.uses_raw_copy() and self.grouped_qsos is not None and all(
+            'offsets' in group for group in self.grouped_qsos.values())
+        if raw_copy and (self.processed_file is None or self.processed_file.resume_offset(self.adif_file_path) is None):
+            self.log_message("HINWEIS: Die Datei wurde seit der Verarbeitung verändert. Exportiere ohne Rohkopie.")
+            raw_copy = False
+
+        files_before = snapshot_directory(export_dir)
+        with self.stats.stage('export'), \
+                export_target(export_dir, self.export_compression, self.log_message) as (target_dir, compression):
+            if self.qso_store is not None:
+                exported_files_count = export_adif_store(
+                    self.qso_store, self.grouped_qsos, target_dir, export_key_by_location,
+                    log=self.log_message, progress=self.report_job_progress, compression=compression
+                )
+            elif raw_copy:
+                exported_files_count = export_adif_raw(
+                    self.adif_file_path, self.grouped_qsos, target_dir, export_key_by_location,
+                    log=self.log_message, progress=self.report_job_progress, compression=compression
+                )
             else:
-                export_key_raw = f"KEINE_ID_{profile_name}_{data['call']}_{data['locator']}"
-            
-            export_key = self.sanitize_filename(export_key_raw)
-                
-            qsos_by_export_key[export_key].extend(qsos)
+                exported_files_count = export_adif_parallel(
+                    self.adif_file_path, target_dir, export_key_by_location, self.export_workers,
+                    log=self.log_message, progress=self.report_job_progress, compression=compression
+                )
+        self.stats.count('bytes_written', count_written_bytes(export_dir, files_before))
+        self.run_in_ui(messagebox.showinfo, "Export Fertig", f"Der Export ist abgeschlossen. {exported_files_count} Dateien wurden im Verzeichnis '{export_dir}' erstellt.")
+
+
+    def run_batch_export_job(self, export_dir, export_key_by_location, separate_files):
+        """Worker: Exportiert die QSOs mehrerer Quelldateien (gemeinsam oder pro Quelldatei getrennt)."""
+        files_before = snapshot_directory(export_dir)
+        with self.stats.stage('export'), \
+                export_target(export_dir, self.export_compression, self.log_message) as (target_dir, compression):
+            exported_files_count = export_adif_batch(
+                self.grouped_by_file, target_dir, export_key_by_location, separate_files,
+                raw_copy=self.raw_copy_export, workers=self.export_workers,
+                log=self.log_message, progress=self.report_job_progress, compression=compression
+            )
+        self.stats.count('bytes_written', count_written_bytes(export_dir, files_before))
+        self.run_in_ui(messagebox.showinfo, "Export Fertig", f"Der Export ist abgeschlossen. {exported_files_count} Dateien wurden im Verzeichnis '{export_dir}' erstellt.")
 
-        # 2. Schreibe die Dateien (MANUELLE ADIF-GENERIERUNG, Unverändert)
-        exported_files_count = 0
-        
-        def format_adif_field(key, value):
-            if value is None or str(value).strip() == "":
-                return ""
-            content = str(value).strip().upper()
-            return f"<{key}:{len(content)}>{content} "
 
-        for export_key, qso_list in qsos_by_export_key.items():
-            
-            filename = os.path.join(export_dir, f"{export_key}.adi") 
-            adif_text = ""
-            
+    # ----------------------------------------
+    # Abschnitt: Projekt-Arbeitsbereich
+    # ----------------------------------------
+    def run_workspace_action(self, func, *args):
+        """Führt eine Schreib-/Leseaktion auf dem Arbeitsbereich aus; Fehler werden nur protokolliert."""
+        try:
+            return func(*args)
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            self.log_message(f"FEHLER im Projekt-Arbeitsbereich: {e}")
+            return None
+
+
+    def save_workspace(self, restore_resolutions=False):
+        """
+        Schreibt die komplette Sitzung (Haupt-Thread, nach der Verarbeitung). Mit restore_resolutions
+        werden zuvor die im Arbeitsbereich aufgelösten Mehrdeutigkeiten übernommen (erneute Analyse).
+        """
+        if self.workspace is None:
+            return
+        if restore_resolutions:
+            restored = self.run_workspace_action(self.workspace.restore_resolutions, self.location_data, self.log_message)
+            for location_key in restored or ():
+                self.refresh_row(location_key)
+        self.run_workspace_action(
+            self.workspace.save_session, self.location_data, self.grouped_qsos, self.grouped_by_file,
+            self.adif_file_path, self.adif_file_paths, self.processed_file, self.wavelog_locations
+        )
+
+
+    def save_workspace_location(self, location_key):
+        """Schreibt einen geänderten Standort sofort (Auswahl, Bearbeitung, Auflösung, Anlegestatus)."""
+        if self.workspace is None or location_key not in self.location_data:
+            return
+        self.run_workspace_action(self.workspace.update_location, location_key, self.location_data[location_key])
+
+
+    def open_workspace(self, path):
+        """Öffnet den Arbeitsbereich path und setzt eine darin gespeicherte Sitzung fort."""
+        workspace = self.run_workspace_action(ProjectWorkspace, path)
+        if workspace is None:
+            return False
+        if self.workspace is not None:
+            self.workspace.close()
+        self.workspace = workspace
+
+        session = self.run_workspace_action(workspace.load_session)
+        if session:
+            self.restore_session(session)
+        return True
+
+
+    def restore_session(self, session):
+        """Übernimmt eine gespeicherte Sitzung in Tabelle und interne Daten."""
+        self.adif_file_path = session['adif_file_path']
+        self.adif_file_paths = session['adif_file_paths']
+        self.grouped_qsos = session['grouped_qsos']
+        self.grouped_by_file = session['grouped_by_file']
+        self.processed_file = session['processed_file']
+        self.qso_store = None
+        if session['stations'] is not None:
+            self.wavelog_locations = session['stations']
+            self.station_index = WavelogStationIndex(self.wavelog_locations)
+
+        self.location_data = session['location_data']
+        self.results_table.set_keys(self.location_data)
+
+        self.log_message(f"Sitzung aus '{self.workspace.path}' fortgesetzt: {len(self.location_data)} Standorte.")
+        missing_files = [file_path for file_path in (self.adif_file_paths or [self.adif_file_path])
+                         if file_path and not os.path.isfile(file_path)]
+        for file_path in missing_files:
+            self.log_message(f"WARNUNG: Die ADIF-Datei '{file_path}' existiert nicht mehr, der Export ist nicht möglich.")
+
+
+    def choose_workspace(self):
+        if self.is_job_running():
+            return
+        path = filedialog.askopenfilename(title="Projekt öffnen", defaultextension=".sqlite",
+                                          filetypes=[("Projekt", "*.sqlite"), ("Alle Dateien", "*.*")])
+        if not path:
+            return
+        self.reset_loaded_files()
+        if self.open_workspace(path):
+            self.workspace_path = path
+            self.save_config()
+
+
+    def save_workspace_as(self):
+        """Speichert die aktuelle Sitzung in einen neuen Arbeitsbereich und arbeitet dort weiter."""
+        if self.is_job_running():
+            return
+        path = filedialog.asksaveasfilename(title="Projekt speichern unter", defaultextension=".sqlite",
+                                            filetypes=[("Projekt", "*.sqlite"), ("Alle Dateien", "*.*")])
+        if not path:
+            return
+        workspace = self.run_workspace_action(ProjectWorkspace, path)
+        if workspace is None:
+            return
+        if self.workspace is not None:
+            self.workspace.close()
+        self.workspace = workspace
+        self.save_workspace()
+        self.workspace_enabled = True
+        self.workspace_path = path
+        self.save_config()
+        self.log_message(f"Projekt gespeichert: {path}")
+
+
+    # ----------------------------------------
+    # Abschnitt: Statistik und Profiling
+    # ----------------------------------------
+    def instrumented(self, label, func):
+        """Umschließt einen Job mit cProfile/tracemalloc (falls aktiviert) und schreibt danach ggf. den JSON-Bericht."""
+        def run(*args):
             try:
-                self.log_message(f"  -> VERSUCHE ZU SCHREIBEN (Manuell): {filename}")
-                
-                adif_text += "ADIF-EXPORTIERT MIT WAVELOGSTATIONCREATOR\r\n"
-                adif_text += f"<PROGRAMID:{len('WavelogStationCreator')}>WavelogStationCreator "
-                adif_text += f"<PROGRAMVERSION:{len('1.0')}>1.0\r\n\r\n"
-                
-                for qso in qso_list:
-                    qso['OPERATOR'] = qso.get('STATION_CALLSIGN', '').split('|')[0]
-                       
-                    qso_record = ""
-                    sorted_keys = sorted(qso.keys())
+                with self.stats.capture(label):
+                    return func(*args)
+            finally:
+                if self.stats_report_path:
+                    try:
+                        self.stats.write_report(self.stats_report_path)
+                    except OSError as e:
+                        self.log_message(f"FEHLER beim Schreiben des Statistik-Berichts: {e}")
+                self.run_in_ui(self.refresh_stats_window)
+        return run
 
-                    for key in sorted_keys:
-                        qso_record += format_adif_field(key, qso[key])
 
-                    adif_text += qso_record + "<EOR>\r\n"
-                
-                adif_text += "<EOT>\r\n"
-                
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(adif_text)
-                
-                self.log_message(f"  -> ERFOLG: {len(qso_list)} QSOs geschrieben in: {os.path.basename(filename)}")
-                exported_files_count += 1
-                
-            except Exception as e:
-                self.log_message(f"  -> FEHLER beim manuellen Schreiben von {os.path.basename(filename)}: {e}")
+    def count_grouped(self, grouped_qsos):
+        self.stats.count('qsos', sum(group['count'] for group in grouped_qsos.values()))
+        self.stats.count('groups', len(grouped_qsos))
+
+
+    def toggle_profiling(self):
+        """Übernimmt die Schalter aus dem Diagnose-Menü (gilt ab dem nächsten Job)."""
+        self.stats.profile = self.profile_var.get()
+        self.stats.trace_memory = self.tracemalloc_var.get()
+        self.save_config()
 
-        self.log_message(f"\nADIF-Export abgeschlossen. {exported_files_count} Dateien erstellt.")
-        messagebox.showinfo("Export Fertig", f"Der Export ist abgeschlossen. {exported_files_count} Dateien wurden im Verzeichnis '{export_dir}' erstellt.")
+
+    def reset_stats(self):
+        if self.is_job_running():
+            return
+        self.stats.reset()
+        self.refresh_stats_window()
+        self.log_message("Statistik zurückgesetzt.")
+
+
+    def save_stats_report(self):
+        filename = filedialog.asksaveasfilename(title="Statistik speichern", defaultextension=".json",
+                                                filetypes=[("JSON", "*.json"), ("Alle Dateien", "*.*")])
+        if not filename:
+            return
+        try:
+            self.stats.write_report(filename)
+            self.log_message(f"Statistik-Bericht gespeichert: {filename}")
+        except OSError as e:
+            messagebox.showerror("Fehler", f"Der Bericht konnte nicht gespeichert werden: {e}")
 
 
-    def sanitize_filename(self, text):
-        """Ersetzt Leerzeichen und entfernt alle ungültigen Zeichen für Dateinamen. (Unverändert)"""
-        text = text.replace(' ', '_')
-        sanitized_text = ''.join(c for c in text if c.isalnum() or c in ('_', '-'))
-        return sanitized_text
+    def show_stats_window(self):
+        """Zeigt Laufzeiten, Zähler und HTTP-Latenzen in einem eigenen Fenster an."""
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            self.refresh_stats_window()
+            return
+
+        self.stats_window = tk.Toplevel(self.master)
+        self.stats_window.title("Statistik")
+        text = tk.Text(self.stats_window, width=80, height=30, font=('Courier', 9), state=tk.DISABLED)
+        text.pack(fill='both', expand=True, padx=10, pady=(10, 5))
+        self.stats_window.text = text
+        button_frame = tk.Frame(self.stats_window)
+        button_frame.pack(fill='x', padx=10, pady=(0, 10))
+        tk.Button(button_frame, text="Aktualisieren", command=self.refresh_stats_window).pack(side='left')
+        tk.Button(button_frame, text="Als JSON speichern...", command=self.save_stats_report).pack(side='left', padx=5)
+        tk.Button(button_frame, text="Schließen", command=self.stats_window.destroy).pack(side='right')
+        self.refresh_stats_window()
+
+
+    def refresh_stats_window(self):
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            return
+        text = self.stats_window.text
+        text.config(state=tk.NORMAL)
+        text.delete('1.0', tk.END)
+        text.insert(tk.END, self.stats.format_summary())
+        text.config(state=tk.DISABLED)
 # ----------------------------------------
 # ENDE KLASSE: ADIFSplitterApp
 # ----------------------------------------
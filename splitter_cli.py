@@ -0,0 +1,295 @@
+"""
+Kommandozeilen-/Batch-Modus des ADIF Location Splitters.
+
+Führt die Schritte Einlesen -> Gruppieren -> Abgleich -> Anlegen -> Export ohne
+grafische Oberfläche aus (z.B. per cron auf einem Server). Importiert kein tkinter.
+
+Beispiel:
+    python splitter_cli.py log.adi --output-dir export --auto-create new --workers 8
+    python splitter_cli.py fieldday/ --output-dir export --separate-files
+    python splitter_cli.py rover.adi --output-dir export --grid-precision 6 --session-gap 12
+"""
+import argparse
+import os
+import sys
+import sqlite3
+
+from splitter_engine import (
+    STATUS_NEW, DEFAULT_MAX_WORKERS, DEFAULT_BATCH_SIZE,
+    StationCache, station_cache_source, QSOStore, load_config, iter_adif_file, iter_adif_spans, group_qsos, build_location_data,
+    WavelogClient, fetch_station_info, WavelogStationIndex, collect_items_to_create, create_stations,
+    created_items_as_stations, reconcile_created_ids, apply_created_id, build_export_keys, export_adif_parallel,
+    export_adif_store, export_adif_raw, collect_adif_files, group_adif_files, merge_file_groups, export_adif_batch,
+    EXPORT_COMPRESSIONS, get_compression, export_target, PipelineStats, snapshot_directory, count_written_bytes,
+    ProjectWorkspace, CreationJournal, LocationResolver, GRID_PRECISIONS, cluster_location_groups, split_sessions
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="ADIF-Log nach Standorten aufteilen, mit Wavelog abgleichen und exportieren."
+    )
+    parser.add_argument('input', nargs='+', help="ADIF-Datei(en) (.adi/.adif, auch .gz/.bz2/.xz/.zip) oder Verzeichnisse")
+    parser.add_argument('-o', '--output-dir', required=True, help="Exportverzeichnis für die ADIF-Dateien")
+    parser.add_argument('-c', '--config', default='config.ini', help="Konfigurationsdatei (Standard: config.ini)")
+    parser.add_argument('--url', help="Wavelog Basis-URL (überschreibt config.ini)")
+    parser.add_argument('--token', help="Wavelog API Token (überschreibt config.ini)")
+    parser.add_argument('--auto-create', choices=['never', 'new'], default='never',
+                        help="'new': alle nicht gefundenen Standorte in Wavelog anlegen (Standard: never)")
+    parser.add_argument('--profile-template', default="{call}-{locator}",
+                        help="Profilname für neu anzulegende Stationen (Platzhalter: {call}, {locator}, {date} = erstes "
+                             "QSO-Datum, {session} = Nummer der Aktivierung)")
+    parser.add_argument('-w', '--workers', type=int, help=f"Parallele Anlege-Requests (Standard: config.ini bzw. {DEFAULT_MAX_WORKERS})")
+    parser.add_argument('--batch-size', type=int, help=f"Stationen pro create_station-Request (Standard: config.ini bzw. {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--max-retries', type=int, help="Wiederholungen bei vorübergehenden API-Fehlern (Standard: config.ini bzw. 4)")
+    parser.add_argument('--rate-limit', type=float, help="Max. API-Anfragen pro Sekunde, 0 = unbegrenzt (Standard: config.ini bzw. 0)")
+    parser.add_argument('--export-workers', type=int, help="Prozesse für den ADIF-Export (Standard: config.ini bzw. 1)")
+    parser.add_argument('--refresh-stations', action='store_true',
+                        help="Stationsprofile unabhängig von der Cache-TTL neu von Wavelog laden")
+    parser.add_argument('--no-cache', action='store_true', help="Lokalen Stations-Cache nicht verwenden")
+    parser.add_argument('--clear-cache', action='store_true', help="Lokalen Stations-Cache vor dem Lauf löschen")
+    parser.add_argument('--no-infer', action='store_true',
+                        help="Fehlende DXCC-/Zonen-Angaben nicht aus Rufzeichen und Locator ergänzen")
+    parser.add_argument('--no-journal', action='store_true',
+                        help="Anlege-Journal nicht verwenden (laut Journal angelegte Stationen werden erneut gesendet)")
+    parser.add_argument('--clear-journal', action='store_true', help="Anlege-Journal vor dem Lauf löschen")
+    parser.add_argument('--in-memory', action='store_true',
+                        help="QSOs kompakt im Speicher halten, der Export liest die Datei nicht erneut")
+    parser.add_argument('--raw-copy', action='store_true',
+                        help="Nur die Gruppierungsfelder per mmap lesen und die Datensätze unverändert exportieren")
+    parser.add_argument('--import-workers', type=int,
+                        help="Prozesse zum Einlesen mehrerer Dateien (Standard: config.ini bzw. 4)")
+    parser.add_argument('--grid-precision', type=int, choices=GRID_PRECISIONS,
+                        help="Nach den ersten 4/6/8/10 Zeichen des Locators gruppieren, 0 = vollständig (Standard: config.ini bzw. 0)")
+    parser.add_argument('--cluster-km', type=float,
+                        help="Standorte desselben Rufzeichens im Umkreis von N km zusammenfassen (Standard: config.ini bzw. 0 = aus)")
+    parser.add_argument('--session-gap', type=float, metavar='STUNDEN',
+                        help="Standorte in Aktivierungen aufteilen, wenn zwischen QSOs mehr als N Stunden liegen "
+                             "(Standard: config.ini bzw. 0 = aus)")
+    parser.add_argument('--separate-files', action='store_true',
+                        help="Bei mehreren Eingabedateien pro Quelldatei getrennt exportieren")
+    parser.add_argument('--compression', choices=EXPORT_COMPRESSIONS,
+                        help="Exportdateien komprimieren oder als ein ZIP-Archiv schreiben (Standard: config.ini bzw. none)")
+    parser.add_argument('--workspace', metavar='DATEI',
+                        help="Sitzung in einen Projekt-Arbeitsbereich (SQLite) schreiben, z.B. zum Fortsetzen in der GUI")
+    parser.add_argument('--stats-report', metavar='DATEI',
+                        help="Laufzeiten, Zähler und HTTP-Latenzen als JSON-Bericht schreiben")
+    parser.add_argument('--profile', action='store_true', help="Lauf mit cProfile profilieren (Ergebnis im JSON-Bericht)")
+    parser.add_argument('--tracemalloc', action='store_true', help="Speicherbelegung mit tracemalloc erfassen")
+    parser.add_argument('--stats', action='store_true', help="Statistik-Übersicht am Ende ausgeben")
+    parser.add_argument('--offline', action='store_true', help="Ohne Wavelog-Abgleich nur gruppieren und exportieren")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Nur Fehler ausgeben")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def log(message):
+        if not args.quiet:
+            print(message, file=sys.stderr)
+
+    settings = load_config(args.config)
+    stats = PipelineStats(profile=args.profile or settings['profile'],
+                          trace_memory=args.tracemalloc or settings['tracemalloc'])
+    with stats.capture('cli'):
+        result = run(args, settings, stats, log)
+
+    report_path = args.stats_report or settings['stats_report']
+    if report_path:
+        try:
+            stats.write_report(report_path)
+            log(f"Statistik-Bericht geschrieben: {report_path}")
+        except OSError as e:
+            print(f"FEHLER: Statistik-Bericht '{report_path}' konnte nicht geschrieben werden: {e}", file=sys.stderr)
+    if args.stats:
+        print(stats.format_summary(), file=sys.stderr)
+    return result
+
+
+def run(args, settings, stats, log):
+    wavelog_url = args.url or settings['wavelog_url']
+    wavelog_token = args.token or settings['wavelog_token']
+    max_workers = args.workers or settings['max_workers']
+    batch_size = args.batch_size or settings['batch_size']
+    export_workers = args.export_workers or settings['export_workers']
+    import_workers = args.import_workers or settings['import_workers']
+    grid_precision = settings['grid_precision'] if args.grid_precision is None else args.grid_precision
+    cluster_km = settings['cluster_km'] if args.cluster_km is None else args.cluster_km
+    session_gap = settings['session_gap_hours'] if args.session_gap is None else args.session_gap
+
+    input_files = collect_adif_files(args.input)
+    for input_file in input_files:
+        if not os.path.isfile(input_file):
+            print(f"FEHLER: ADIF-Datei '{input_file}' existiert nicht.", file=sys.stderr)
+            return 2
+    if not input_files:
+        print("FEHLER: Keine ADIF-Dateien gefunden.", file=sys.stderr)
+        return 2
+    batch = len(input_files) > 1
+
+    if not args.offline and (not wavelog_url or not wavelog_token):
+        print("FEHLER: Wavelog URL/Token fehlen (config.ini, --url/--token oder --offline verwenden).", file=sys.stderr)
+        return 2
+
+    # 1. Wavelog-Profile laden (innerhalb der TTL aus dem lokalen Cache)
+    if args.max_retries is not None:
+        settings['max_retries'] = args.max_retries
+    if args.rate_limit is not None:
+        settings['rate_limit'] = args.rate_limit
+    client = WavelogClient.from_settings(settings, wavelog_url, wavelog_token, max_workers, stats=stats)
+    cache = None
+    if not args.no_cache:
+        cache = StationCache.for_config(args.config, settings['cache_ttl_minutes'])
+        if args.clear_cache:
+            cache.invalidate()
+
+    stations = None
+    if not args.offline:
+        with stats.stage('station_info'):
+            stations = fetch_station_info(client, log, cache=cache, force_refresh=args.refresh_stations)
+        if stations is None:
+            print("FEHLER: Konnte Wavelog-Daten nicht laden. Verarbeitung abgebrochen.", file=sys.stderr)
+            return 1
+
+    # 2. Gruppieren und abgleichen
+    log("\n--- Starte Analyse und Gruppierung der Standorte ---\n")
+    # Bei mehreren Dateien wird pro Prozess gruppiert, ein gemeinsamer QSO-Speicher ist dann nicht möglich
+    store = QSOStore() if (args.in_memory or settings['in_memory']) and not batch else None
+    raw_copy = store is None and (args.raw_copy or settings['raw_copy'])
+    if raw_copy and not batch and get_compression(input_files[0]):
+        log("HINWEIS: Komprimierte Eingabedatei, Rohkopie beim Export ist nicht möglich.")
+        raw_copy = False
+    grouped_by_file = None
+    try:
+        with stats.stage('parse_group'):
+            session_times = session_gap > 0
+            if batch:
+                grouped_by_file = group_adif_files(input_files, import_workers, raw_copy, log,
+                                                   grid_precision=grid_precision, session_times=session_times)
+                grouped_qsos = merge_file_groups(grouped_by_file, log)
+            elif raw_copy:
+                grouped_qsos = group_qsos(stats.timed_iter('parse', iter_adif_spans(input_files[0], with_time=session_times)),
+                                          log, with_spans=True, grid_precision=grid_precision, session_times=session_times)
+            else:
+                grouped_qsos = group_qsos(stats.timed_iter('parse', iter_adif_file(input_files[0])), log, store,
+                                          grid_precision=grid_precision, session_times=session_times)
+            cluster_location_groups(grouped_qsos, cluster_km, grouped_by_file, log=log)
+            split_sessions(grouped_qsos, session_gap, grouped_by_file, log)
+    except OSError as e:
+        print(f"FEHLER beim Lesen der ADIF-Datei: {e}", file=sys.stderr)
+        return 1
+    stats.count('qsos', sum(group['count'] for group in grouped_qsos.values()))
+    stats.count('groups', len(grouped_qsos))
+
+    resolver = None
+    if settings['infer_dxcc'] and not args.no_infer:
+        resolver = LocationResolver.for_config(args.config, settings['cty_path'], settings['grid_zones_path'], log)
+    with stats.stage('matching'):
+        location_data = build_location_data(grouped_qsos, WavelogStationIndex(stations), log, resolver)
+    # Im Arbeitsbereich aufgelöste Mehrdeutigkeiten übernehmen (sonst würden diese Standorte nicht exportiert)
+    if args.workspace and os.path.isfile(args.workspace):
+        try:
+            workspace = ProjectWorkspace(args.workspace)
+            try:
+                workspace.restore_resolutions(location_data, log)
+            finally:
+                workspace.close()
+        except sqlite3.Error as e:
+            print(f"FEHLER beim Lesen des Arbeitsbereichs '{args.workspace}': {e}", file=sys.stderr)
+
+    # 3. Optional neue Stationen anlegen
+    if args.auto_create == 'new' and not args.offline:
+        for data in location_data.values():
+            if data['status'] == STATUS_NEW:
+                data['profile_name'] = args.profile_template.format(call=data['call'], locator=data['locator'],
+                                                                    date=data.get('first_date', ''),
+                                                                    session=data.get('session') or '')
+                # Aktivierungen desselben Standorts brauchen unterschiedliche Profilnamen
+                if data.get('session') and '{session}' not in args.profile_template:
+                    data['profile_name'] += f"-A{data['session']}"
+
+        items_to_create = collect_items_to_create(location_data, log)
+        journal = None
+        if not args.no_journal:
+            journal = CreationJournal.for_config(args.config, station_cache_source(wavelog_url, wavelog_token))
+            if args.clear_journal:
+                journal.clear()
+        if items_to_create:
+            log(f"\nStarte Erstellung von {len(items_to_create)} neuen Stationsprofilen...")
+            # Offene Versuche eines abgebrochenen Laufs gegen die aktuelle Stationsliste prüfen
+            if journal is not None and journal.needs_check(items_to_create):
+                log("Das Anlege-Journal enthält offene Versuche. Lade die Stationsliste neu...")
+                stations = fetch_station_info(client, log, cache=cache, force_refresh=True)
+            stations_before = stations
+            with stats.stage('create'):
+                created_items = create_stations(client, items_to_create,
+                                                max_workers=max_workers, batch_size=batch_size, log=log,
+                                                journal=journal, station_index=WavelogStationIndex(stations))
+            stats.count('stations_created', len(created_items))
+
+            for item in items_to_create:
+                if not item['created_successfully']:
+                    location_data[item['location_key']]['status'] = "FEHLER beim Anlegen"
+
+            if created_items:
+                with stats.stage('resolve_ids'):
+                    new_stations = created_items_as_stations(created_items)
+                    if new_stations and cache is not None and cache.has_data(station_cache_source(wavelog_url, wavelog_token)):
+                        cache.add_stations(new_stations)
+                        stations = cache.stations
+                    else:
+                        stations = fetch_station_info(client, log, cache=cache, force_refresh=True)
+                    found_ids, ambiguous = reconcile_created_ids(created_items, stations_before, stations, log)
+                if journal is not None:
+                    journal.record_ids(created_items, found_ids)
+                for location_key, found_id in found_ids.items():
+                    apply_created_id(location_data[location_key], found_id)
+                for location_key, candidates in ambiguous.items():
+                    apply_created_id(location_data[location_key], "KONFLIKT", candidates)
+                if ambiguous:
+                    log(f"WARNUNG: {len(ambiguous)} angelegte Station(en) konnten nicht eindeutig zugeordnet werden.")
+        else:
+            log("\nKeine Stationen zum Anlegen markiert.")
+
+    if args.workspace:
+        try:
+            workspace = ProjectWorkspace(args.workspace)
+            try:
+                workspace.save_session(location_data, grouped_qsos, grouped_by_file,
+                                       None if batch else input_files[0], input_files if batch else [],
+                                       stations=stations)
+            finally:
+                workspace.close()
+            log(f"Projekt-Arbeitsbereich geschrieben: {args.workspace}")
+        except sqlite3.Error as e:
+            print(f"FEHLER beim Schreiben des Arbeitsbereichs '{args.workspace}': {e}", file=sys.stderr)
+
+    # 4. Export
+    try:
+        os.makedirs(args.output_dir, exist_ok=True)
+    except OSError as e:
+        print(f"FEHLER: Das Exportverzeichnis '{args.output_dir}' konnte nicht erstellt werden: {e}", file=sys.stderr)
+        return 1
+
+    log("\n--- Starte ADIF-Export nach Wavelog ID ---")
+    export_key_by_location = build_export_keys(location_data, log, grouped_qsos)
+    files_before = snapshot_directory(args.output_dir)
+    with stats.stage('export'), \
+            export_target(args.output_dir, args.compression or settings['compression'], log) as (target_dir, compression):
+        if batch:
+            export_adif_batch(grouped_by_file, target_dir, export_key_by_location, args.separate_files or settings['separate_files'],
+                              raw_copy, export_workers, log, compression=compression)
+        elif store is not None:
+            export_adif_store(store, grouped_qsos, target_dir, export_key_by_location, log, compression=compression)
+        elif raw_copy:
+            export_adif_raw(input_files[0], grouped_qsos, target_dir, export_key_by_location, log, compression=compression)
+        else:
+            export_adif_parallel(input_files[0], target_dir, export_key_by_location, export_workers, log,
+                                 compression=compression)
+    stats.count('bytes_written', count_written_bytes(args.output_dir, files_before))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3759 @@
+"""
+GUI-freie Kernlogik des ADIF Location Splitters.
+
+Enthält das Einlesen (Streaming), die Gruppierung nach Standorten, den Abgleich mit
+den Wavelog-Stationsprofilen, das Anlegen neuer Stationen und den ADIF-Export.
+Wird sowohl von der Tk-Oberfläche (main.py) als auch von der Kommandozeile
+(splitter_cli.py) verwendet und darf daher kein tkinter importieren.
+"""
+import os
+import sys
+import re
+import io
+import json
+import mmap
+import gzip
+import bz2
+import lzma
+import zipfile
+import heapq
+import bisect
+import difflib
+import unicodedata
+import hashlib
+import time
+import random
+import shutil
+import tempfile
+import threading
+import cProfile
+import pstats
+import tracemalloc
+import configparser
+import math
+import datetime
+import sqlite3
+from email.utils import parsedate_to_datetime
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+import requests
+
+
+# Gruppierungsschlüssel für QSOs ohne Rufzeichen oder Locator
+UNASSIGNED_KEY = "UNZUGEOORDNET|FEHLT"
+
+# Statustexte der Standorte (werden auch in der Tabelle angezeigt)
+STATUS_INCOMPLETE = "Unvollständige Daten"
+STATUS_AMBIGUOUS = "MEHRDEUTIG (Klick zur Auflösung)"
+STATUS_FOUND = "Gefunden"
+STATUS_NEW = "NEU (Anlegen)"
+
+# Wavelog-IDs, unter denen (noch) keine gültige Station exportiert werden kann
+INVALID_WAVELOG_IDS = ["N/A", "FEHLER", "UNKLARE ID", "KONFLIKT"]
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_EXPORT_WORKERS = 1
+DEFAULT_CACHE_TTL_MINUTES = 60
+DEFAULT_IMPORT_WORKERS = 4
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_RATE_LIMIT = 0.0
+DEFAULT_PROFILE_TOP = 30
+WORKSPACE_FILE_NAME = 'workspace.sqlite'
+CTY_FILE_NAME = 'cty.csv'
+GRID_ZONES_FILE_NAME = 'grid_zones.csv'
+# Gruppierung nach den ersten n Zeichen des Locators (0 = Locator unverändert)
+GRID_PRECISIONS = (0, 4, 6, 8, 10)
+EARTH_RADIUS_KM = 6371.0
+
+
+class JobCancelled(Exception):
+    """Signalisiert, dass ein laufender Vorgang vom Benutzer abgebrochen wurde."""
+
+
+def _no_log(message):
+    pass
+
+
+# ----------------------------------------
+# Abschnitt: Konfiguration
+# ----------------------------------------
+def load_config(config_file):
+    """Läd die Konfiguration aus der Datei und gibt sie als Dictionary zurück."""
+    config = configparser.ConfigParser()
+    # Versuche, die Datei zu lesen (Unterdrücken von Fehlern, falls Datei fehlt)
+    config.read(config_file)
+
+    settings = {
+        'wavelog_url': config.get('Wavelog', 'url', fallback=""),
+        'wavelog_token': config.get('Wavelog', 'token', fallback=""),
+        'max_workers': config.getint('Wavelog', 'max_workers', fallback=DEFAULT_MAX_WORKERS),
+        'batch_size': config.getint('Wavelog', 'batch_size', fallback=DEFAULT_BATCH_SIZE),
+        'max_retries': config.getint('Wavelog', 'max_retries', fallback=DEFAULT_MAX_RETRIES),
+        'rate_limit': config.getfloat('Wavelog', 'rate_limit', fallback=DEFAULT_RATE_LIMIT),
+        'dxcc_csv_path': config.get('DXCC', 'csv_path', fallback=""),
+        'infer_dxcc': config.getboolean('DXCC', 'infer', fallback=True),
+        'cty_path': config.get('DXCC', 'cty_path', fallback=CTY_FILE_NAME),
+        'grid_zones_path': config.get('DXCC', 'grid_zones_path', fallback=GRID_ZONES_FILE_NAME),
+        'export_workers': config.getint('Export', 'workers', fallback=DEFAULT_EXPORT_WORKERS),
+        'cache_ttl_minutes': config.getint('Cache', 'ttl_minutes', fallback=DEFAULT_CACHE_TTL_MINUTES),
+        'in_memory': config.getboolean('Export', 'in_memory', fallback=False),
+        'profile': config.getboolean('Diagnostics', 'profile', fallback=False),
+        'tracemalloc': config.getboolean('Diagnostics', 'tracemalloc', fallback=False),
+        'stats_report': config.get('Diagnostics', 'report_path', fallback=""),
+        'workspace_enabled': config.getboolean('Workspace', 'enabled', fallback=True),
+        'workspace_path': config.get('Workspace', 'path', fallback=""),
+        'raw_copy': config.getboolean('Export', 'raw_copy', fallback=False),
+        'separate_files': config.getboolean('Export', 'separate_files', fallback=False),
+        'compression': config.get('Export', 'compression', fallback='none'),
+        'import_workers': config.getint('Import', 'workers', fallback=DEFAULT_IMPORT_WORKERS),
+        'grid_precision': config.getint('Import', 'grid_precision', fallback=0),
+        'cluster_km': config.getfloat('Import', 'cluster_km', fallback=0.0),
+        'session_gap_hours': config.getfloat('Import', 'session_gap_hours', fallback=0.0),
+    }
+
+    if settings['grid_precision'] not in GRID_PRECISIONS:
+        settings['grid_precision'] = 0
+
+    # Prüfe, ob Wavelog URL am Ende ein Slash hat
+    if settings['wavelog_url'] and not settings['wavelog_url'].endswith('/'):
+        settings['wavelog_url'] += '/'
+
+    return settings
+
+
+def get_wavelog_base_host(wavelog_url):
+    """Ermittelt die Basisadresse der Wavelog-Instanz (ohne '/api')."""
+    base_url = wavelog_url.rstrip('/')
+    return base_url.split('/api')[0]
+
+
+# ----------------------------------------
+# KLASSE: PipelineStats
+# ----------------------------------------
+class PipelineStats:
+    """
+    Messwerte eines Laufs (threadsicher): Wall- und CPU-Zeit pro Verarbeitungsschritt, Zähler
+    (QSOs, Gruppen, HTTP-Anfragen, Wiederholungen, geschriebene Bytes) und Latenz-Histogramme
+    der HTTP-Anfragen. Optional werden cProfile- und tracemalloc-Auswertungen erfasst.
+    """
+    LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, profile=False, trace_memory=False, profile_top=DEFAULT_PROFILE_TOP):
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_top = profile_top
+        self._lock = threading.Lock()
+        self.reset()
+
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.stages = {}       # Name -> {'wall_s', 'cpu_s', 'calls'}
+            self.counters = {}
+            self.histograms = {}   # Name -> {'counts', 'count', 'sum_ms', 'max_ms'}
+            self.profiles = []     # [{'label', 'top'}]
+            self.memory = []       # [{'label', 'peak_bytes', 'top'}]
+
+
+    def add_stage_time(self, name, wall, cpu=0.0):
+        with self._lock:
+            stage = self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0, 'calls': 0})
+            stage['wall_s'] += wall
+            stage['cpu_s'] += cpu
+            stage['calls'] += 1
+
+
+    @contextmanager
+    def stage(self, name):
+        """Misst Wall- und CPU-Zeit (des Prozesses) eines Verarbeitungsschritts."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+
+    def timed_iter(self, name, iterator):
+        """Reicht die Elemente von iterator durch und misst die Wall-Zeit in next() (z.B. Parsen, ohne CPU-Zeit)."""
+        iterator = iter(iterator)
+        clock = time.perf_counter
+        elapsed = 0.0
+        try:
+            while True:
+                start = clock()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += clock() - start
+                    return
+                elapsed += clock() - start
+                yield item
+        finally:
+            self.add_stage_time(name, elapsed)
+
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+    def observe_latency(self, name, seconds):
+        """Trägt eine Dauer in das Histogramm name ein (Buckets in Millisekunden)."""
+        milliseconds = seconds * 1000.0
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {
+                    'counts': [0] * (len(self.LATENCY_BUCKETS_MS) + 1), 'count': 0, 'sum_ms': 0.0, 'max_ms': 0.0
+                }
+            index = 0
+            while index < len(self.LATENCY_BUCKETS_MS) and milliseconds > self.LATENCY_BUCKETS_MS[index]:
+                index += 1
+            histogram['counts'][index] += 1
+            histogram['count'] += 1
+            histogram['sum_ms'] += milliseconds
+            histogram['max_ms'] = max(histogram['max_ms'], milliseconds)
+
+
+    @contextmanager
+    def capture(self, label):
+        """
+        Erfasst für den umschlossenen Block (im aktuellen Thread) ein cProfile-Profil und/oder
+        die Speicherbelegung mit tracemalloc, falls aktiviert.
+        """
+        profiler = None
+        if self.profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Es läuft bereits ein anderes Profil (verschachtelter Aufruf)
+                profiler = None
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                output = io.StringIO()
+                pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(self.profile_top)
+                with self._lock:
+                    self.profiles.append({'label': label, 'top': output.getvalue()})
+
+            if self.trace_memory and tracemalloc.is_tracing():
+                peak = tracemalloc.get_traced_memory()[1]
+                top = [str(statistic) for statistic in tracemalloc.take_snapshot().statistics('lineno')[:10]]
+                if started_tracing:
+                    tracemalloc.stop()
+                with self._lock:
+                    self.memory.append({'label': label, 'peak_bytes': peak, 'top': top})
+
+
+    def to_dict(self):
+        with self._lock:
+            histograms = {}
+            for name, histogram in self.histograms.items():
+                histograms[name] = dict(histogram, buckets_ms=list(self.LATENCY_BUCKETS_MS) + ['inf'],
+                                        avg_ms=round(histogram['sum_ms'] / histogram['count'], 2) if histogram['count'] else 0.0)
+            return {
+                'started_at': self.started_at,
+                'stages': {name: {'wall_s': round(stage['wall_s'], 4), 'cpu_s': round(stage['cpu_s'], 4),
+                                  'calls': stage['calls']}
+                           for name, stage in self.stages.items()},
+                'counters': dict(self.counters),
+                'http_latency': histograms,
+                'profiles': list(self.profiles),
+                'memory': list(self.memory)
+            }
+
+
+    def write_report(self, path):
+        """Schreibt alle Messwerte als JSON-Datei."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+    def format_summary(self):
+        """Kurze Textübersicht (für Statistik-Fenster und Kommandozeile)."""
+        data = self.to_dict()
+        lines = ["Schritte (Wall / CPU):"]
+        for name, stage in data['stages'].items():
+            lines.append(f"  {name:<28} {stage['wall_s']:>9.3f} s  {stage['cpu_s']:>9.3f} s  ({stage['calls']}x)")
+        lines.append("Zähler:")
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"  {name:<28} {value:>12}")
+        for name, histogram in data['http_latency'].items():
+            lines.append(f"HTTP-Latenz {name}: {histogram['count']} Anfragen, Ø {histogram['avg_ms']:.1f} ms, max {histogram['max_ms']:.1f} ms")
+            bounds = [f"<={bound} ms" for bound in self.LATENCY_BUCKETS_MS] + [f">{self.LATENCY_BUCKETS_MS[-1]} ms"]
+            for bound, count in zip(bounds, histogram['counts']):
+                if count:
+                    lines.append(f"  {bound:>12} {count:>8}")
+        for memory in data['memory']:
+            lines.append(f"Speicher-Spitze {memory['label']}: {memory['peak_bytes'] / (1024 * 1024):.1f} MB")
+        if data['profiles']:
+            lines.append(f"{len(data['profiles'])} cProfile-Auswertung(en) im JSON-Bericht.")
+        return "\n".join(lines)
+
+# ----------------------------------------
+# ENDE KLASSE PipelineStats
+# ----------------------------------------
+
+
+def snapshot_directory(directory):
+    """Dateiname -> (Größe, Änderungszeit) aller Dateien in directory (für count_written_bytes)."""
+    snapshot = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    info = entry.stat()
+                    snapshot[entry.name] = (info.st_size, info.st_mtime_ns)
+    except OSError:
+        pass
+    return snapshot
+
+
+def count_written_bytes(directory, before):
+    """Summe der Größen aller Dateien in directory, die seit dem Schnappschuss before neu oder geändert sind."""
+    return sum(size for name, (size, mtime) in snapshot_directory(directory).items()
+               if before.get(name) != (size, mtime))
+
+
+# ----------------------------------------
+# KLASSE: ADIFStreamReader
+# ----------------------------------------
+class ADIFStreamReader:
+    """
+    Liest ADIF-Datensätze inkrementell aus einem binären Datei-Handle.
+    Es wird immer nur ein Puffer von wenigen Blöcken im Speicher gehalten,
+    die QSOs werden einzeln als Dictionary (Feldname in Großbuchstaben) geliefert.
+    """
+    DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, file_handle, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8', start_offset=0):
+        self.file_handle = file_handle
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self._buffer = b""
+        self._eof = False
+        # Dateiposition von _buffer[0] und Ende des letzten vollständigen Datensatzes (bzw. Headers)
+        self._buffer_offset = start_offset
+        self.end_offset = start_offset
+
+
+    def _fill(self, size):
+        """Liest weitere Blöcke nach, bis der Puffer mindestens size Bytes enthält."""
+        while len(self._buffer) < size and not self._eof:
+            chunk = self.file_handle.read(self.chunk_size)
+            if chunk:
+                self._buffer += chunk
+            else:
+                self._eof = True
+        return len(self._buffer) >= size
+
+
+    def _read_value(self, start, length):
+        """
+        Liest einen Feldwert ab start. Die ADIF-Länge wird (wie bei adif_io) in Zeichen gezählt,
+        daher werden bei Nicht-ASCII-Inhalten ggf. mehr Bytes verbraucht.
+        Gibt (Wert, Endposition im Puffer) zurück.
+        """
+        self._fill(start + length)
+        raw = self._buffer[start:start + length]
+        if raw.isascii():
+            return raw.decode('ascii'), start + len(raw)
+
+        # Mehrbyte-Zeichen: maximal 4 Bytes pro Zeichen bei UTF-8
+        self._fill(start + 4 * length)
+        text = self._buffer[start:start + 4 * length].decode(self.encoding, 'surrogateescape')[:length]
+        end = start + len(text.encode(self.encoding, 'surrogateescape'))
+        return self._buffer[start:end].decode(self.encoding, 'replace'), end
+
+
+    def __iter__(self):
+        pos = 0
+        record = {}
+
+        while True:
+            # Verarbeiteten Teil des Puffers verwerfen, damit der Speicher begrenzt bleibt
+            if pos >= self.chunk_size:
+                self._buffer_offset += pos
+                self._buffer = self._buffer[pos:]
+                pos = 0
+
+            lt = self._buffer.find(b'<', pos)
+            if lt == -1:
+                self._buffer_offset += len(self._buffer)
+                self._buffer = b""
+                pos = 0
+                if not self._fill(1):
+                    break
+                continue
+
+            gt = self._buffer.find(b'>', lt + 1)
+            if gt == -1:
+                # Tag ist über die Blockgrenze verteilt
+                self._buffer_offset += lt
+                self._buffer = self._buffer[lt:]
+                pos = 0
+                if not self._fill(len(self._buffer) + 1):
+                    break
+                continue
+
+            tag = self._buffer[lt + 1:gt]
+            name, _, spec = tag.partition(b':')
+            name = name.strip().upper().decode('ascii', 'replace')
+            pos = gt + 1
+
+            if name == 'EOR':
+                self.end_offset = self._buffer_offset + pos
+                if record:
+                    yield record
+                record = {}
+                continue
+            if name == 'EOH':
+                # Alles vor <EOH> gehört zum Header und wird verworfen
+                self.end_offset = self._buffer_offset + pos
+                record = {}
+                continue
+
+            length_text = spec.partition(b':')[0].strip()
+            if not length_text.isdigit():
+                continue
+
+            value, pos = self._read_value(pos, int(length_text))
+            record[name] = value
+
+# ----------------------------------------
+# ENDE KLASSE ADIFStreamReader
+# ----------------------------------------
+
+
+# ----------------------------------------
+# Abschnitt: Komprimierte Dateien
+# ----------------------------------------
+ADIF_EXTENSIONS = ('.adi', '.adif')
+
+# Kompressionsverfahren (Dateiendung ohne Punkt) -> Funktion zum Öffnen
+COMPRESSION_OPENERS = {'gz': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+EXPORT_COMPRESSIONS = ('none', 'gz', 'bz2', 'xz', 'zip')
+ZIP_ARCHIVE_NAME = 'adif_export.zip'
+
+
+def get_compression(file_path):
+    """Kompression einer Datei anhand der Endung ('gz', 'bz2', 'xz', 'zip') oder None."""
+    extension = os.path.splitext(file_path)[1].lower().lstrip('.')
+    return extension if extension in COMPRESSION_OPENERS or extension == 'zip' else None
+
+
+def is_adif_file_name(name):
+    """Prüft, ob ein Dateiname eine (ggf. komprimierte) ADIF-Datei bezeichnet."""
+    compression = get_compression(name)
+    if compression == 'zip':
+        return True
+    if compression is not None:
+        name = os.path.splitext(name)[0]
+    return name.lower().endswith(ADIF_EXTENSIONS)
+
+
+def _iter_decompressed_streams(file_handle, file_path):
+    """Liefert die entpackten Datenströme einer komprimierten Datei (bei ZIP alle ADIF-Einträge nacheinander)."""
+    compression = get_compression(file_path)
+
+    if compression != 'zip':
+        # Die Opener akzeptieren auch einen bereits geöffneten Datei-Handle
+        with COMPRESSION_OPENERS[compression](file_handle, 'rb') as stream:
+            yield stream
+        return
+
+    with zipfile.ZipFile(file_handle) as archive:
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        adif_members = [info for info in members if is_adif_file_name(info.filename) and get_compression(info.filename) is None]
+        for info in (adif_members or members):
+            with archive.open(info) as stream:
+                yield stream
+
+
+def iter_adif_file(file_path, progress=None, progress_text="Lese ADIF", start_offset=0, position=None):
+    """
+    Liefert die QSOs einer ADIF-Datei einzeln (Streaming, begrenzter Speicher).
+    Komprimierte Dateien (.gz, .bz2, .xz, .zip) werden beim Lesen entpackt.
+    progress(wert, maximum, text) wird regelmäßig aufgerufen und darf JobCancelled auslösen.
+    start_offset: Byteposition, ab der gelesen wird (muss direkt hinter einem <EOR>/<EOH> liegen, nur unkomprimiert).
+    position: optionales dict, in dem am Ende 'end_offset' (Ende des letzten vollständigen Datensatzes) steht.
+    """
+    PROGRESS_INTERVAL = 5000
+    total_size = os.path.getsize(file_path)
+
+    with open(file_path, 'rb') as f:
+        if get_compression(file_path):
+            if start_offset:
+                raise ValueError("Komprimierte ADIF-Dateien können nur vollständig gelesen werden.")
+            streams = _iter_decompressed_streams(f, file_path)
+        else:
+            f.seek(start_offset)
+            streams = [f]
+
+        count = 0
+        end_offset = start_offset
+        for stream in streams:
+            reader = ADIFStreamReader(stream, start_offset=start_offset)
+            for qso in reader:
+                count += 1
+                # Fortschritt anhand der gelesenen (ggf. komprimierten) Bytes
+                if progress and count % PROGRESS_INTERVAL == 0:
+                    progress(f.tell(), total_size, f"{progress_text}: {count} QSOs...")
+                yield qso
+            end_offset = reader.end_offset
+
+        if position is not None:
+            position['end_offset'] = end_offset
+
+
+def open_export_file(filename, mode, compression=None, encoding=None, buffering=-1):
+    """
+    Öffnet eine Exportdatei, bei compression ('gz', 'bz2', 'xz') komprimiert.
+    Binäre komprimierte Dateien werden zusätzlich gepuffert, damit nicht jeder kleine write einzeln komprimiert wird.
+    """
+    opener = COMPRESSION_OPENERS.get(compression)
+    if opener is None:
+        return open(filename, mode, encoding=encoding, buffering=buffering)
+    if 'b' in mode:
+        return io.BufferedWriter(opener(filename, mode), buffer_size=buffering if buffering > 0 else io.DEFAULT_BUFFER_SIZE)
+    return opener(filename, mode + 't', encoding=encoding)
+
+
+def export_file_name(export_dir, export_key, compression=None):
+    """Pfad der Exportdatei eines Exportschlüssels (mit Endung der Kompression)."""
+    extension = f".adi.{compression}" if compression in COMPRESSION_OPENERS else ".adi"
+    return os.path.join(export_dir, f"{export_key}{extension}")
+
+
+@contextmanager
+def export_target(export_dir, compression=None, log=_no_log):
+    """
+    Liefert (verzeichnis, kompression) für die Exportfunktionen. Bei 'zip' wird zunächst in ein
+    temporäres Verzeichnis exportiert, das danach in ein einzelnes ZIP-Archiv gepackt wird.
+    """
+    if compression != 'zip':
+        yield export_dir, (compression if compression in COMPRESSION_OPENERS else None)
+        return
+
+    temp_dir = tempfile.mkdtemp(prefix=".zip_", dir=export_dir)
+    try:
+        yield temp_dir, None
+
+        archive_path = os.path.join(export_dir, ZIP_ARCHIVE_NAME)
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name in sorted(os.listdir(temp_dir)):
+                archive.write(os.path.join(temp_dir, name), name)
+        log(f"  -> ZIP-Archiv geschrieben: {archive_path}")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# Vorlauf per mmap: Jeder Tag wird gefunden und sein Wert anhand der Längenangabe übersprungen (wie beim
+# Streaming-Leser, Tag-Text in Werten bleibt damit Wert). Behalten werden nur die für die Gruppierung
+# benötigten Felder, alle anderen Werte werden nicht dekodiert.
+ADIF_TAG_PATTERN = re.compile(rb'<([^:>]*)(?::([^>]*))?>')
+
+SCAN_FIELDS = frozenset(('STATION_CALLSIGN', 'MY_GRIDSQUARE', 'MY_DXCC', 'MY_CQ_ZONE', 'MY_ITU_ZONE', 'QSO_DATE', 'BAND'))
+
+# Zusätzlich TIME_ON für die Aufteilung in Aktivierungen (Zeitfenster)
+SCAN_FIELDS_TIME = SCAN_FIELDS | {'TIME_ON'}
+
+
+def _scan_value_end(mm, start, length, encoding='utf-8'):
+    """Endposition eines Feldwerts (Länge in Zeichen wie bei ADIFStreamReader._read_value)."""
+    raw = mm[start:start + length]
+    if raw.isascii():
+        return start + len(raw)
+    text = mm[start:start + 4 * length].decode(encoding, 'surrogateescape')[:length]
+    return start + len(text.encode(encoding, 'surrogateescape'))
+
+
+def iter_adif_spans(file_path, progress=None, progress_text="Scanne ADIF", start_offset=0, position=None,
+                    with_time=False):
+    """
+    Schneller Vorlauf für die Gruppierung: Die Datei wird per mmap eingeblendet und Tag für Tag
+    durchlaufen, jeder Wert wird anhand seiner Längenangabe übersprungen (Tag-Text in einem Wert,
+    z.B. '<EOR>' in einem Kommentar, bleibt Teil des Werts). Behalten werden nur STATION_CALLSIGN,
+    MY_GRIDSQUARE, MY_DXCC, MY_CQ_ZONE, MY_ITU_ZONE, QSO_DATE und BAND (mit with_time zusätzlich TIME_ON).
+    Liefert pro Datensatz (felder, offset, länge); offset/länge beschreiben den Datensatz vom
+    ersten Tag bis einschließlich <EOR> in der Datei. Es werden dieselben Datensätze wie bei
+    iter_adif_file geliefert. start_offset und position wie bei iter_adif_file.
+    """
+    PROGRESS_INTERVAL = 5000
+    total_size = os.path.getsize(file_path)
+    end_offset = start_offset
+
+    if total_size > start_offset:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            search = ADIF_TAG_PATTERN.search
+            find = mm.find
+            wanted = SCAN_FIELDS_TIME if with_time else SCAN_FIELDS
+            pos = start_offset
+            record = {}
+            has_fields = False
+            count = 0
+            # Tag wie in der Datei -> (Feldname, Länge bzw. -1 ohne Längenangabe, behalten), spart die
+            # Auswertung der immer gleichen Tags
+            tags = {}
+
+            while True:
+                match = search(mm, pos)
+                if match is None:
+                    break
+
+                tag_end = match.end()
+                tag = match.group()
+                info = tags.get(tag)
+                if info is None:
+                    raw_name, spec = match.groups()
+                    name = raw_name.strip().upper().decode('ascii', 'replace')
+                    length_text = spec.partition(b':')[0].strip() if spec is not None else b''
+                    length = int(length_text) if length_text.isdigit() else -1
+                    info = tags[tag] = (name, length, name in wanted)
+                name, length, keep = info
+
+                if name == 'EOR':
+                    # Leere Datensätze werden wie beim Streaming-Leser übersprungen
+                    if has_fields:
+                        record_start = find(b'<', end_offset, match.start())
+                        count += 1
+                        if progress and count % PROGRESS_INTERVAL == 0:
+                            progress(tag_end, total_size, f"{progress_text}: {count} QSOs...")
+                        yield record, record_start, tag_end - record_start
+                    end_offset = pos = tag_end
+                    record = {}
+                    has_fields = False
+                    continue
+                if name == 'EOH':
+                    # Alles vor <EOH> gehört zum Header
+                    end_offset = pos = tag_end
+                    record = {}
+                    has_fields = False
+                    continue
+
+                if length < 0:
+                    # Tag ohne Längenangabe: kein Wert, der laufende Datensatz bleibt erhalten
+                    pos = tag_end
+                    continue
+
+                has_fields = True
+                raw = mm[tag_end:tag_end + length]
+                if raw.isascii():
+                    pos = tag_end + len(raw)
+                    if keep:
+                        record[name] = raw.decode('ascii')
+                else:
+                    pos = _scan_value_end(mm, tag_end, length)
+                    if keep:
+                        record[name] = mm[tag_end:pos].decode('utf-8', 'replace')
+
+    if position is not None:
+        position['end_offset'] = end_offset
+
+
+# ----------------------------------------
+# KLASSE: ProcessedFile
+# ----------------------------------------
+class ProcessedFile:
+    """
+    Merkt sich, bis zu welchem Byte (Ende des letzten vollständigen Datensatzes) eine ADIF-Datei
+    verarbeitet wurde, zusammen mit einem Hash dieses Bereichs. Wurde die Datei seitdem nur
+    fortgeschrieben, müssen beim erneuten Verarbeiten nur die angehängten Datensätze gelesen werden.
+    """
+    HASH_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, file_path, end_offset, content_hash):
+        self.file_path = os.path.abspath(file_path)
+        self.end_offset = end_offset
+        self.content_hash = content_hash
+
+
+    @classmethod
+    def hash_prefix(cls, file_path, length):
+        """SHA-256 über die ersten length Bytes der Datei."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(cls.HASH_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        return digest.hexdigest()
+
+
+    @classmethod
+    def capture(cls, file_path, end_offset):
+        return cls(file_path, end_offset, cls.hash_prefix(file_path, end_offset))
+
+
+    def resume_offset(self, file_path):
+        """
+        Gibt die Byteposition zurück, ab der neue Datensätze stehen, wenn file_path dieselbe Datei ist
+        und der verarbeitete Bereich unverändert ist. Sonst None (vollständige Verarbeitung nötig).
+        """
+        if os.path.abspath(file_path) != self.file_path:
+            return None
+        try:
+            if os.path.getsize(file_path) < self.end_offset:
+                return None
+            if self.hash_prefix(file_path, self.end_offset) != self.content_hash:
+                return None
+        except OSError:
+            return None
+        return self.end_offset
+
+# ----------------------------------------
+# ENDE KLASSE ProcessedFile
+# ----------------------------------------
+
+
+# ----------------------------------------
+# KLASSE: DXCCCatalog
+# ----------------------------------------
+class DXCCCatalog:
+    """
+    DXCC-Liste mit Indizes für die Auswahl: ID -> Name, normalisierter Name -> ID sowie sortierte
+    Namens- und Wortlisten für die Präfixsuche (bisect). Die Suche liefert IDs, Anzeigetexte
+    müssen nicht zurückgeparst werden.
+    """
+    NA_ID = '0'
+    NA_NAME = 'N/A (nicht definiert)'
+
+    def __init__(self, entries=()):
+        self.by_id = {self.NA_ID: self.NA_NAME}
+        for dxcc_id, name in entries:
+            # Duplikate überspringen, damit '0' (N/A) nicht überschrieben wird
+            self.by_id.setdefault(str(dxcc_id), name)
+
+        self.id_by_name = {}
+        self.names = []   # sortiert: (normalisierter Name, ID)
+        self.words = []   # sortiert: (normalisiertes Wort, ID)
+        for dxcc_id, name in self.by_id.items():
+            normalized = self.normalize(name)
+            self.id_by_name.setdefault(normalized, dxcc_id)
+            self.names.append((normalized, dxcc_id))
+            self.words.extend((word, dxcc_id) for word in set(normalized.split()))
+        self.names.sort()
+        self.words.sort()
+        # Anzeige-Reihenfolge: N/A zuerst, dann nach Namen
+        self.ordered_ids = [self.NA_ID] + [dxcc_id for _, dxcc_id in self.names if dxcc_id != self.NA_ID]
+
+
+    @staticmethod
+    def normalize(text):
+        """Kleinschreibung ohne Akzente und Satzzeichen (für Vergleich und Suche)."""
+        text = unicodedata.normalize('NFKD', text.casefold())
+        text = ''.join(char if char.isalnum() else ' ' for char in text if not unicodedata.combining(char))
+        return ' '.join(text.split())
+
+
+    @classmethod
+    def from_csv(cls, file_path, log=_no_log):
+        """Liest eine CSV-Datei ID,Name (oder ID;Name, erste Zeile = Kopfzeile)."""
+        entries = []
+        with open(file_path, 'r', encoding='utf-8') as f:
+            next(f, None)
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                if ',' in line:
+                    separator = ','
+                elif ';' in line:
+                    separator = ';'
+                else:
+                    log(f"WARNUNG: Zeile ohne gültiges Trennzeichen übersprungen: {line[:20]}...")
+                    continue
+
+                parts = [part.strip() for part in line.split(separator, 1)]
+                if len(parts) == 2 and parts[0].isdigit():
+                    # Anführungszeichen entfernen, falls vorhanden
+                    entries.append((parts[0], parts[1].replace('"', '').strip()))
+                else:
+                    log(f"WARNUNG: Ungültiges Datenformat in Zeile: {line[:20]}...")
+        return cls(entries)
+
+
+    def __len__(self):
+        return len(self.by_id)
+
+
+    def __contains__(self, dxcc_id):
+        return str(dxcc_id) in self.by_id
+
+
+    def name(self, dxcc_id, default='Unbekannt'):
+        return self.by_id.get(str(dxcc_id), default)
+
+
+    def display_name(self, dxcc_id):
+        return f"{self.name(dxcc_id)} (ID: {dxcc_id})"
+
+
+    def find_id(self, name):
+        """ID zu einem Namen (unabhängig von Groß-/Kleinschreibung, Akzenten und Satzzeichen) oder None."""
+        return self.id_by_name.get(self.normalize(name))
+
+
+    @staticmethod
+    def _prefix_range(sorted_pairs, prefix):
+        start = bisect.bisect_left(sorted_pairs, (prefix,))
+        end = bisect.bisect_left(sorted_pairs, (prefix + '\uffff',))
+        return (dxcc_id for _, dxcc_id in sorted_pairs[start:end])
+
+
+    def search(self, query, limit=None, candidates=None):
+        """
+        Sucht DXCC-Einträge und gibt die IDs nach Relevanz zurück: ID, Namensanfang, Wortanfang,
+        Teilstring, zuletzt unscharfe Treffer (Tippfehler). Ohne Suchtext alle Einträge.
+        candidates schränkt die Suche auf eine frühere Trefferliste ein (Weitertippen).
+        """
+        normalized = self.normalize(query)
+        if not normalized:
+            results = list(self.ordered_ids)
+            return results[:limit] if limit else results
+
+        allowed = set(candidates) if candidates is not None else None
+        results = []
+        seen = set()
+
+        def add(ids):
+            for dxcc_id in ids:
+                if dxcc_id not in seen and (allowed is None or dxcc_id in allowed):
+                    seen.add(dxcc_id)
+                    results.append(dxcc_id)
+
+        if normalized.isdigit():
+            add([normalized] if normalized in self.by_id else [])
+            add(sorted((dxcc_id for dxcc_id in self.by_id if dxcc_id.startswith(normalized)), key=int))
+
+        add(self._prefix_range(self.names, normalized))
+        # Jedes Wort der Eingabe muss am Anfang eines Wortes im Namen stehen
+        tokens = normalized.split()
+        word_matches = None
+        for token in tokens:
+            ids = set(self._prefix_range(self.words, token))
+            word_matches = ids if word_matches is None else word_matches & ids
+        add(dxcc_id for _, dxcc_id in self.names if dxcc_id in word_matches)
+        add(dxcc_id for name, dxcc_id in self.names if normalized in name)
+
+        if not results and candidates is None:
+            close = difflib.get_close_matches(normalized, [name for name, _ in self.names], n=10, cutoff=0.6)
+            add(self.id_by_name[name] for name in close)
+
+        return results[:limit] if limit else results
+
+# ----------------------------------------
+# ENDE KLASSE DXCCCatalog
+# ----------------------------------------
+
+
+# Zusätze, die das Land eines Rufzeichens nicht ändern (/P, /M, /QRP, ...)
+CALL_SUFFIXES = {'P', 'M', 'MM', 'AM', 'QRP', 'QRPP', 'A', 'B', 'R', 'LH', 'J', 'T'}
+
+
+def callsign_country_part(callsign):
+    """Teil eines Rufzeichens, der das DXCC-Gebiet bestimmt (DL/G4ABC -> DL, G4ABC/P -> G4ABC)."""
+    parts = [part for part in callsign.upper().split('/')
+             if part and part not in CALL_SUFFIXES and not (len(part) == 1 and part.isdigit())]
+    if not parts:
+        return callsign.upper()
+    if len(parts) == 1:
+        return parts[0]
+    # Präfix vor oder nach dem Rufzeichen: der kürzere Teil ist das Gastland
+    return min(parts[:2], key=len)
+
+
+# ----------------------------------------
+# KLASSE: LocationResolver
+# ----------------------------------------
+class LocationResolver:
+    """
+    Ermittelt DXCC-Gebiet, CQ- und ITU-Zone offline aus Rufzeichen und Locator:
+    - Präfix-Trie (längster passender Präfix, exakte Rufzeichen mit '=') aus einer Länderdatei
+      im cty.csv-Format (AD1C, country-files.com; enthält die ADIF-DXCC-Nummern)
+    - optionale Tabelle Locator -> Zonen (CSV grid,cq,itu; 2-, 4- oder 6-stellige Locatoren),
+      die Zonen aus dem Locator haben Vorrang (z.B. für Länder mit mehreren Zonen)
+    Die Dateien werden erst bei der ersten Abfrage geladen, Ergebnisse pro Rufzeichen bzw.
+    Locator zwischengespeichert.
+    """
+    OVERRIDE_PATTERN = re.compile(r'\((\d+)\)|\[(\d+)\]|<[^>]*>|\{[^}]*\}|~[^~]*~')
+
+    def __init__(self, cty_path=None, grid_zones_path=None, log=_no_log):
+        self.cty_path = cty_path
+        self.grid_zones_path = grid_zones_path
+        self.log = log
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.trie = {}        # Zeichen -> Knoten, Eintrag unter None: (dxcc, cq, itu)
+        self.exact_calls = {}
+        self.prefix_count = 0
+        self.grid_zones = {}  # Locator (2/4/6 Zeichen) -> (cq, itu)
+        self._call_cache = {}
+        self._grid_cache = {}
+
+
+    @classmethod
+    def for_config(cls, config_file, cty_path=CTY_FILE_NAME, grid_zones_path=GRID_ZONES_FILE_NAME, log=_no_log):
+        """Relative Pfade beziehen sich auf das Verzeichnis der Konfigurationsdatei."""
+        directory = os.path.dirname(os.path.abspath(config_file))
+
+        def resolve(path):
+            return os.path.join(directory, path) if path and not os.path.isabs(path) else path
+        return cls(resolve(cty_path), resolve(grid_zones_path), log)
+
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.cty_path and os.path.isfile(self.cty_path):
+                self._load_cty(self.cty_path)
+                self.log(f"Länderdatei '{os.path.basename(self.cty_path)}' geladen: {self.prefix_count} Präfixe, {len(self.exact_calls)} Einzelrufzeichen.")
+            else:
+                self.log(f"HINWEIS: Länderdatei '{self.cty_path}' nicht gefunden, DXCC/Zonen werden nicht aus dem Rufzeichen ermittelt.")
+            if self.grid_zones_path and os.path.isfile(self.grid_zones_path):
+                self._load_grid_zones(self.grid_zones_path)
+            self._loaded = True
+
+
+    def _load_cty(self, path):
+        """Liest cty.csv: Präfix,Name,DXCC,Kontinent,CQ,ITU,Breite,Länge,Zeitzone,Präfixe;"""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                fields = line.strip().split(',', 9)
+                if len(fields) < 10 or not fields[2].strip().isdigit():
+                    continue
+                dxcc, cq, itu = fields[2].strip(), fields[4].strip(), fields[5].strip()
+                for token in fields[9].rstrip(';').split():
+                    self._add_prefix(token, dxcc, cq, itu)
+
+
+    def _add_prefix(self, token, dxcc, cq, itu):
+        # Zonen-Überschreibungen: (CQ) [ITU], sonstige Angaben (<Koordinaten>, {Kontinent}, ~Zeitzone~) ignorieren
+        for match in self.OVERRIDE_PATTERN.finditer(token):
+            if match.group(1):
+                cq = match.group(1)
+            elif match.group(2):
+                itu = match.group(2)
+        prefix = self.OVERRIDE_PATTERN.sub('', token).upper()
+        if not prefix:
+            return
+
+        if prefix.startswith('='):
+            self.exact_calls[prefix[1:]] = (dxcc, cq, itu)
+            return
+
+        node = self.trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[None] = (dxcc, cq, itu)
+        self.prefix_count += 1
+
+
+    def _load_grid_zones(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = [field.strip() for field in line.replace(';', ',').split(',')]
+                if len(fields) >= 3 and fields[1].isdigit() and fields[2].isdigit():
+                    self.grid_zones[fields[0].upper()] = (fields[1], fields[2])
+
+
+    def resolve_call(self, callsign):
+        """Gibt (dxcc, cq, itu) für ein Rufzeichen zurück oder None (längster passender Präfix)."""
+        callsign = callsign.upper()
+        result = self._call_cache.get(callsign)
+        if result is not None or callsign in self._call_cache:
+            return result
+
+        self._ensure_loaded()
+        result = self.exact_calls.get(callsign)
+        if result is None:
+            node = self.trie
+            for char in callsign_country_part(callsign):
+                node = node.get(char)
+                if node is None:
+                    break
+                result = node.get(None, result)
+        self._call_cache[callsign] = result
+        return result
+
+
+    def resolve_grid(self, locator):
+        """Gibt (cq, itu) für einen Locator aus der Zonentabelle zurück oder None (genauester Eintrag zuerst)."""
+        locator = locator.upper()
+        if locator in self._grid_cache:
+            return self._grid_cache[locator]
+
+        self._ensure_loaded()
+        result = None
+        for length in (6, 4, 2):
+            if len(locator) >= length:
+                result = self.grid_zones.get(locator[:length])
+                if result is not None:
+                    break
+        self._grid_cache[locator] = result
+        return result
+
+
+    def resolve(self, callsign, locator):
+        """Gibt {'dxcc', 'cqz', 'ituz'} mit den ermittelbaren Werten zurück (fehlende Werte fehlen im Dict)."""
+        result = {}
+        call_result = self.resolve_call(callsign)
+        if call_result is not None:
+            result['dxcc'], result['cqz'], result['ituz'] = call_result
+        grid_result = self.resolve_grid(locator)
+        if grid_result is not None:
+            result['cqz'], result['ituz'] = grid_result
+        return {field: value for field, value in result.items() if value and value != '0'}
+
+# ----------------------------------------
+# ENDE KLASSE LocationResolver
+# ----------------------------------------
+
+
+# ----------------------------------------
+# Abschnitt: Gruppierung
+# ----------------------------------------
+def get_location_key(qso, grid_precision=0):
+    """
+    Bildet den Gruppierungsschlüssel CALL|LOCATOR für ein QSO.
+    Mit grid_precision (4/6/8/10) zählen nur die ersten Zeichen des Locators (JO44, JO44AB und JO44AB12
+    ergeben bei 4 denselben Standort), kürzere Locatoren bleiben unverändert.
+    """
+    call = qso.get('STATION_CALLSIGN', '').upper()
+    locator = qso.get('MY_GRIDSQUARE', '').upper()
+
+    if call and locator:
+        if grid_precision:
+            locator = locator[:grid_precision]
+        return f"{call}|{locator}"
+    return UNASSIGNED_KEY
+
+
+def locator_to_latlon(locator):
+    """Mittelpunkt eines Maidenhead-Locators (2 bis 10 Zeichen) als (breite, länge) oder None bei ungültigem Locator."""
+    locator = locator.strip().upper()
+    if not 2 <= len(locator) <= 10 or len(locator) % 2:
+        return None
+
+    lat, lon = -90.0, -180.0
+    lat_step, lon_step = 10.0, 20.0
+    for pair in range(len(locator) // 2):
+        first, second = locator[2 * pair], locator[2 * pair + 1]
+        if pair % 2:
+            # Ziffernpaar: 10 Teile
+            if not (first.isdigit() and second.isdigit()):
+                return None
+            lat_step, lon_step = lat_step / 10, lon_step / 10
+            x, y = int(first), int(second)
+        else:
+            # Buchstabenpaar: 18 Felder (A-R), danach je 24 Teile (A-X)
+            letters = 18 if pair == 0 else 24
+            x, y = ord(first) - 65, ord(second) - 65
+            if not (0 <= x < letters and 0 <= y < letters):
+                return None
+            if pair:
+                lat_step, lon_step = lat_step / 24, lon_step / 24
+        lon += x * lon_step
+        lat += y * lat_step
+    return lat + lat_step / 2, lon + lon_step / 2
+
+
+def _sphere_point(lat, lon):
+    """Kartesische Koordinaten (km) eines Punkts auf der Erdkugel."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (EARTH_RADIUS_KM * math.cos(lat) * math.cos(lon),
+            EARTH_RADIUS_KM * math.cos(lat) * math.sin(lon),
+            EARTH_RADIUS_KM * math.sin(lat))
+
+
+def cluster_location_keys(grouped_qsos, radius_km, preferred_keys=()):
+    """
+    Fasst Standorte desselben Rufzeichens zusammen, deren Locator-Mittelpunkte höchstens radius_km
+    auseinander liegen. Leader-Verfahren: Die Standorte werden nach QSO-Anzahl abgearbeitet, jeder
+    schließt sich dem nächstgelegenen bereits gewählten Leitstandort im Umkreis an oder wird selbst
+    einer (Schlüssel aus preferred_keys, z.B. bereits angezeigte Standorte, werden zuerst Leitstandort).
+    Räumlicher Index: Gitter aus Würfeln mit Kantenlänge radius_km über den 3D-Koordinaten, geprüft
+    werden nur die 27 Nachbarzellen. Gibt {schlüssel: schlüssel des leitstandorts} für die
+    zusammengefassten Standorte zurück.
+    """
+    preferred_keys = set(preferred_keys)
+    order = sorted((key for key in grouped_qsos if key != UNASSIGNED_KEY),
+                   key=lambda key: (key not in preferred_keys, -grouped_qsos[key]['count'], key))
+
+    # Großkreisentfernung <= radius_km entspricht einer Sehne <= max_chord (die Sehne ist nie länger)
+    max_chord = 2 * EARTH_RADIUS_KM * math.sin(min(math.pi / 2, radius_km / (2 * EARTH_RADIUS_KM)))
+    neighbours = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+    dist = math.dist
+    floor = math.floor
+
+    cells = {}
+    key_map = {}
+    for location_key in order:
+        call, locator = location_key.split('|', 1)
+        center = locator_to_latlon(locator)
+        if center is None:
+            continue
+        point = _sphere_point(*center)
+        cx, cy, cz = floor(point[0] / radius_km), floor(point[1] / radius_km), floor(point[2] / radius_km)
+
+        best_key, best_chord = None, max_chord
+        for dx, dy, dz in neighbours:
+            leaders = cells.get((call, cx + dx, cy + dy, cz + dz))
+            if leaders:
+                for leader_key, leader_point in leaders:
+                    chord = dist(point, leader_point)
+                    if chord <= best_chord:
+                        best_key, best_chord = leader_key, chord
+
+        if best_key is not None:
+            key_map[location_key] = best_key
+        else:
+            cells.setdefault((call, cx, cy, cz), []).append((location_key, point))
+    return key_map
+
+
+def _ensure_grids(location_key, group):
+    """Stellt sicher, dass eine Gruppe unter 'grids' die vollständigen Locatoren ihrer QSOs führt."""
+    if 'grids' not in group and location_key != UNASSIGNED_KEY:
+        group['grids'] = {location_key.split('|', 1)[1]: group['count']}
+
+
+def merge_location_groups(grouped_qsos, key_map):
+    """
+    Führt Gruppen gemäß key_map ({schlüssel: zielschlüssel}) zusammen: Zähler, Auszählungen, Quellen,
+    Zeilen und Bytebereiche (wieder in Dateireihenfolge). Fehlt die Zielgruppe, wird die Gruppe nur umbenannt.
+    """
+    touched = set()
+    for location_key, target_key in key_map.items():
+        group = grouped_qsos.pop(location_key, None)
+        if group is None:
+            continue
+        _ensure_grids(location_key, group)
+
+        target = grouped_qsos.get(target_key)
+        if target is None:
+            grouped_qsos[target_key] = group
+            continue
+        _ensure_grids(target_key, target)
+
+        target['count'] += group['count']
+        _merge_consensus(target, group)
+        for file_path, count in group.get('sources', {}).items():
+            target.setdefault('sources', {})[file_path] = target['sources'].get(file_path, 0) + count
+        if 'times' in group:
+            target.setdefault('times', array('q')).extend(group['times'])
+            target.setdefault('qso_values', []).extend(group.get('qso_values', ()))
+        if 'rows' in group:
+            target.setdefault('rows', array('I')).extend(group['rows'])
+        if 'offsets' in group:
+            target.setdefault('offsets', array('Q')).extend(group['offsets'])
+            target.setdefault('lengths', array('I')).extend(group['lengths'])
+        touched.add(target_key)
+
+    for target_key in touched:
+        target = grouped_qsos[target_key]
+        _apply_consensus(target)
+        # Zeitpunkte und Werte pro QSO ('times', 'qso_values') gehören positionsweise zu Zeilen bzw.
+        # Bytebereichen und werden mitsortiert (Zeilen und Bytebereiche sind eindeutig)
+        for fields, typecodes in ((('rows',), ('I',)), (('offsets', 'lengths'), ('Q', 'I'))):
+            if fields[0] not in target:
+                continue
+            if 'times' in target:
+                fields, typecodes = fields + ('times', 'qso_values'), typecodes + ('q', None)
+            columns = zip(*sorted(zip(*(target[field] for field in fields))))
+            for field, typecode, column in zip(fields, typecodes, columns):
+                target[field] = array(typecode, column) if typecode else list(column)
+    return grouped_qsos
+
+
+def cluster_location_groups(grouped_qsos, radius_km, grouped_by_file=None, preferred_keys=(), log=_no_log):
+    """
+    Fasst nahe beieinander liegende Standorte zusammen (siehe cluster_location_keys) und wendet das
+    Ergebnis auf die Gruppierung und ggf. die Gruppierungen der einzelnen Dateien an.
+    Die Exportdateinamen der ursprünglichen Locatoren ergänzt build_export_keys über 'grids'.
+    """
+    if radius_km <= 0:
+        return {}
+    key_map = cluster_location_keys(grouped_qsos, radius_km, preferred_keys)
+    if not key_map:
+        return key_map
+
+    location_count = len(grouped_qsos)
+    merge_location_groups(grouped_qsos, key_map)
+    for file_groups in (grouped_by_file or {}).values():
+        merge_location_groups(file_groups, key_map)
+    log(f"Standorte im Umkreis von {radius_km:g} km zusammengefasst: {location_count} -> {len(grouped_qsos)}")
+    return key_map
+
+
+# Stationsfelder, deren Werte pro Standort ausgezählt werden (Feld der Gruppe -> ADIF-Feld)
+CONSENSUS_FIELDS = (('dxcc', 'MY_DXCC'), ('cqz', 'MY_CQ_ZONE'), ('ituz', 'MY_ITU_ZONE'))
+
+
+def group_qsos(qso_iter, log=_no_log, store=None, with_spans=False, grid_precision=0, session_times=False):
+    """
+    Gruppiert QSOs nach Standort. Die QSOs werden als Stream verarbeitet,
+    pro Standort werden nur Zähler und Auszählungen behalten.
+    Gibt {location_key: {'count': n, 'dxcc': ..., 'cqz': ..., 'ituz': ..., ...}} zurück.
+    Die Stationsdaten (dxcc/cqz/ituz) sind der häufigste Wert aller QSOs des Standorts, die
+    Auszählungen stehen unter 'dxcc_counts'/'cqz_counts'/'ituz_counts', Felder mit mehreren
+    Werten unter 'disagreement'. Dazu kommen 'bands' ({band: anzahl}) und 'first_date'/'last_date'.
+    Mit store (QSOStore) werden die QSOs zusätzlich kompakt abgelegt und jede Gruppe
+    erhält unter 'rows' die Zeilennummern ihrer QSOs.
+    Mit with_spans liefert qso_iter (felder, offset, länge) wie iter_adif_spans, jede Gruppe
+    erhält unter 'offsets'/'lengths' die Bytebereiche ihrer Datensätze in der Datei.
+    Mit grid_precision wird nach gekürztem Locator gruppiert (siehe get_location_key), die
+    vollständigen Locatoren stehen dann mit ihrer Anzahl unter 'grids'.
+    Mit session_times erhält jede Gruppe unter 'times' die Zeitpunkte ihrer QSOs und unter 'qso_values'
+    deren (dxcc, cqz, ituz, band, locator), damit split_sessions die Auszählungen pro Aktivierung bilden kann.
+    """
+    grouped_qsos = {}
+    # Gleiche Wertetupel werden nur einmal gehalten (pro QSO bleibt ein Verweis)
+    shared_values = {}
+
+    DXCC_FIELD = 'MY_DXCC'
+    CQZ_FIELD = 'MY_CQ_ZONE'
+    ITUZ_FIELD = 'MY_ITU_ZONE'
+
+    unassigned_count = 0
+    total_count = 0
+    for qso in qso_iter:
+        if with_spans:
+            qso, offset, length = qso
+        total_count += 1
+        location_key = get_location_key(qso, grid_precision)
+
+        if location_key == UNASSIGNED_KEY:
+            unassigned_count += 1
+
+        group = grouped_qsos.get(location_key)
+        if group is None:
+            group = grouped_qsos[location_key] = _new_group()
+            if grid_precision:
+                group['grids'] = {}
+            if session_times:
+                group['times'] = array('q')
+                group['qso_values'] = []
+            if store is not None:
+                group['rows'] = array('I')
+            if with_spans:
+                group['offsets'] = array('Q')
+                group['lengths'] = array('I')
+        group['count'] += 1
+
+        # Auszählung im selben Durchlauf (leere Felder zählen nicht mit)
+        value = qso.get(DXCC_FIELD)
+        if value:
+            counts = group['dxcc_counts']
+            counts[value] = counts.get(value, 0) + 1
+        value = qso.get(CQZ_FIELD)
+        if value:
+            counts = group['cqz_counts']
+            counts[value] = counts.get(value, 0) + 1
+        value = qso.get(ITUZ_FIELD)
+        if value:
+            counts = group['ituz_counts']
+            counts[value] = counts.get(value, 0) + 1
+        value = qso.get('BAND')
+        if value:
+            counts = group['bands']
+            value = value.lower()
+            counts[value] = counts.get(value, 0) + 1
+        value = qso.get('QSO_DATE')
+        if value:
+            if not group['first_date'] or value < group['first_date']:
+                group['first_date'] = value
+            if value > group['last_date']:
+                group['last_date'] = value
+
+        if grid_precision and location_key != UNASSIGNED_KEY:
+            counts = group['grids']
+            value = qso['MY_GRIDSQUARE'].upper()
+            counts[value] = counts.get(value, 0) + 1
+
+        if session_times:
+            group['times'].append(qso_timestamp(qso))
+            values = (qso.get(DXCC_FIELD, ''), qso.get(CQZ_FIELD, ''), qso.get(ITUZ_FIELD, ''),
+                      qso.get('BAND', '').lower(), qso.get('MY_GRIDSQUARE', '').upper())
+            group['qso_values'].append(shared_values.setdefault(values, values))
+        if store is not None:
+            group['rows'].append(store.append(qso))
+        if with_spans:
+            group['offsets'].append(offset)
+            group['lengths'].append(length)
+
+    for group in grouped_qsos.values():
+        _apply_consensus(group)
+
+    log(f"Erfolgreich {total_count} QSOs eingelesen.")
+    log(f"Gesamtanzahl eindeutiger Standorte gefunden: {len(grouped_qsos) - (1 if UNASSIGNED_KEY in grouped_qsos else 0)}")
+    if unassigned_count > 0:
+        log(f"WARNUNG: {unassigned_count} QSOs fehlen wichtige Felder.")
+
+    return grouped_qsos
+
+
+def _new_group():
+    """Leere Gruppe mit Zähler und Auszählungen."""
+    return {
+        'count': 0,
+        'dxcc': '0',
+        'cqz': '0',
+        'ituz': '0',
+        'dxcc_counts': {},
+        'cqz_counts': {},
+        'ituz_counts': {},
+        'bands': {},
+        'first_date': '',
+        'last_date': '',
+        'disagreement': []
+    }
+
+
+def _merge_consensus(group, other):
+    """Addiert die Auszählungen einer Gruppe in eine andere (Ergebnis erst nach _apply_consensus gültig)."""
+    for counts_field in ('dxcc_counts', 'cqz_counts', 'ituz_counts', 'bands', 'grids'):
+        if counts_field not in other:
+            continue
+        counts = group.setdefault(counts_field, {})
+        for value, count in other[counts_field].items():
+            counts[value] = counts.get(value, 0) + count
+
+    first_date, last_date = other.get('first_date', ''), other.get('last_date', '')
+    if first_date and (not group.get('first_date') or first_date < group['first_date']):
+        group['first_date'] = first_date
+    if last_date > group.get('last_date', ''):
+        group['last_date'] = last_date
+
+
+def _apply_consensus(group):
+    """
+    Setzt dxcc/cqz/ituz einer Gruppe auf den häufigsten Wert ihrer Auszählung (bei Gleichstand
+    gewinnt der zuerst gesehene Wert) und trägt Felder mit abweichenden Werten in 'disagreement' ein.
+    Gruppen ohne Auszählung (z.B. aus älteren Arbeitsbereichen) bleiben unverändert.
+    """
+    if 'dxcc_counts' not in group:
+        return
+    disagreement = []
+    for field, _adif_field in CONSENSUS_FIELDS:
+        counts = group[f'{field}_counts']
+        group[field] = max(counts, key=counts.get) if counts else '0'
+        if len({_clean_number(value) for value in counts}) > 1:
+            disagreement.append(field)
+    group['disagreement'] = disagreement
+
+
+def merge_grouped_qsos(grouped_qsos, new_groups):
+    """Fügt die Gruppen neu gelesener QSOs in eine bestehende Gruppierung ein (inkrementelle Verarbeitung)."""
+    for location_key, new_group in new_groups.items():
+        group = grouped_qsos.get(location_key)
+        if group is None:
+            grouped_qsos[location_key] = new_group
+            continue
+
+        group['count'] += new_group['count']
+        _merge_consensus(group, new_group)
+        _apply_consensus(group)
+        if 'times' in new_group:
+            group.setdefault('times', array('q')).extend(new_group['times'])
+            group.setdefault('qso_values', []).extend(new_group.get('qso_values', ()))
+        if 'rows' in new_group:
+            group.setdefault('rows', array('I')).extend(new_group['rows'])
+        if 'offsets' in new_group:
+            group.setdefault('offsets', array('Q')).extend(new_group['offsets'])
+            group.setdefault('lengths', array('I')).extend(new_group['lengths'])
+    return grouped_qsos
+
+
+# ----------------------------------------
+# Abschnitt: Aktivierungen (Zeitfenster)
+# ----------------------------------------
+@lru_cache(maxsize=4096)
+def _day_number(qso_date):
+    """Tagesnummer eines QSO_DATE (JJJJMMTT) oder None bei ungültigem Datum."""
+    if len(qso_date) != 8 or not qso_date.isdigit():
+        return None
+    try:
+        return datetime.date(int(qso_date[:4]), int(qso_date[4:6]), int(qso_date[6:])).toordinal()
+    except ValueError:
+        return None
+
+
+def qso_timestamp(qso):
+    """Zeitpunkt eines QSOs in Sekunden aus QSO_DATE und TIME_ON (HHMM oder HHMMSS), -1 ohne gültiges Datum."""
+    day = _day_number(qso.get('QSO_DATE', ''))
+    if day is None:
+        return -1
+    time_on = qso.get('TIME_ON', '')
+    seconds = 0
+    if len(time_on) >= 4 and time_on[:4].isdigit():
+        seconds = int(time_on[:2]) * 3600 + int(time_on[2:4]) * 60
+        if time_on[4:6].isdigit():
+            seconds += int(time_on[4:6])
+    return day * 86400 + seconds
+
+
+def timestamp_date(timestamp):
+    """QSO_DATE (JJJJMMTT) zu einem Zeitpunkt aus qso_timestamp."""
+    return datetime.date.fromordinal(timestamp // 86400).strftime('%Y%m%d')
+
+
+def session_boundaries(times, gap_seconds):
+    """
+    Einmal sortieren, dann linear: Eine neue Aktivierung beginnt, wenn zwischen zwei aufeinanderfolgenden
+    QSOs mehr als gap_seconds liegen. Gibt die Startzeitpunkte der 2. bis n. Aktivierung zurück
+    (leer = nur eine Aktivierung). QSOs ohne gültiges Datum (-1) zählen nicht mit.
+    """
+    boundaries = []
+    previous = None
+    for timestamp in sorted(times):
+        if timestamp < 0:
+            continue
+        if previous is not None and timestamp - previous > gap_seconds:
+            boundaries.append(timestamp)
+        previous = timestamp
+    return boundaries
+
+
+def session_location_key(location_key, session):
+    """Schlüssel der n-ten Aktivierung eines Standorts: CALL|LOCATOR|n."""
+    return f"{location_key}|{session}"
+
+
+def _split_group(location_key, group, boundaries):
+    """
+    Teilt eine Gruppe anhand der Startzeitpunkte in Aktivierungen auf (Zuordnung per bisect, QSOs ohne
+    Datum landen in der ersten). Auszählungen, Stationsdaten (häufigster Wert), Locatoren und Quellen
+    werden im selben Durchlauf pro Aktivierung neu gebildet. Gibt {schlüssel: gruppe} der nicht leeren
+    Aktivierungen zurück; die Quellen mehrerer Dateien ergänzt split_sessions.
+    """
+    session_groups = [None] * (len(boundaries) + 1)
+    session_positions = [[] for _ in session_groups]
+    qso_values = group['qso_values']
+    sources = group.get('sources', {})
+
+    for position, timestamp in enumerate(group['times']):
+        index = bisect.bisect_right(boundaries, timestamp)
+        session_group = session_groups[index]
+        if session_group is None:
+            session_group = session_groups[index] = _new_group()
+            if 'grids' in group:
+                session_group['grids'] = {}
+            if len(sources) == 1:
+                session_group['sources'] = {}
+        session_group['count'] += 1
+        session_positions[index].append(position)
+
+        dxcc, cqz, ituz, band, locator = qso_values[position]
+        for counts_field, value in (('dxcc_counts', dxcc), ('cqz_counts', cqz), ('ituz_counts', ituz), ('bands', band)):
+            if value:
+                counts = session_group[counts_field]
+                counts[value] = counts.get(value, 0) + 1
+        if 'grids' in session_group and locator:
+            counts = session_group['grids']
+            counts[locator] = counts.get(locator, 0) + 1
+
+    sessions = {}
+    for index, session_group in enumerate(session_groups):
+        if session_group is None:
+            continue
+        _apply_consensus(session_group)
+        if 'sources' in session_group:
+            session_group['sources'][next(iter(sources))] = session_group['count']
+        positions = session_positions[index]
+        dated = [timestamp for timestamp in (group['times'][position] for position in positions) if timestamp >= 0]
+        if dated:
+            session_group['first_date'] = timestamp_date(min(dated))
+            session_group['last_date'] = timestamp_date(max(dated))
+        session_group['session'] = {'base': location_key, 'index': index + 1, 'boundaries': boundaries}
+        for field, typecode in (('rows', 'I'), ('offsets', 'Q'), ('lengths', 'I')):
+            if field in group:
+                session_group[field] = array(typecode, (group[field][position] for position in positions))
+        sessions[session_location_key(location_key, index + 1)] = session_group
+    return sessions
+
+
+def split_sessions(grouped_qsos, gap_hours, grouped_by_file=None, log=_no_log):
+    """
+    Teilt jeden Standort in Aktivierungen auf, wenn zwischen QSOs mehr als gap_hours liegen (z.B. ein Rover,
+    der Tage später in dasselbe Feld zurückkehrt). Pro Standort eine Sortierung der Zeitpunkte und ein
+    linearer Durchlauf (session_boundaries), die QSOs werden danach per bisect zugeordnet.
+    Aufgeteilte Standorte erhalten die Schlüssel CALL|LOCATOR|n und unter 'session' {'base', 'index',
+    'boundaries'}; die Gruppierungen der einzelnen Dateien werden mit denselben Grenzen aufgeteilt.
+    Voraussetzung: Gruppierung mit session_times. Zeitpunkte und Werte pro QSO werden danach verworfen.
+    """
+    groupings = [grouped_qsos] + list((grouped_by_file or {}).values())
+    if gap_hours > 0:
+        boundaries_by_key = {}
+        for location_key, group in grouped_qsos.items():
+            if location_key != UNASSIGNED_KEY and 'times' in group:
+                boundaries = session_boundaries(group['times'], gap_hours * 3600)
+                if boundaries:
+                    boundaries_by_key[location_key] = boundaries
+
+        location_count = len(grouped_qsos)
+        for grouping in groupings:
+            for location_key, boundaries in boundaries_by_key.items():
+                group = grouping.pop(location_key, None)
+                if group is not None:
+                    grouping.update(_split_group(location_key, group, boundaries))
+
+        # Quellen der gemeinsamen Gruppierung aus den aufgeteilten Gruppierungen der Dateien
+        for file_path, file_groups in (grouped_by_file or {}).items():
+            for location_key, file_group in file_groups.items():
+                if 'session' in file_group:
+                    grouped_qsos[location_key].setdefault('sources', {})[file_path] = file_group['count']
+
+        if boundaries_by_key:
+            log(f"{len(boundaries_by_key)} Standorte in Aktivierungen aufgeteilt (Abstand > {gap_hours:g} h): "
+                f"{location_count} -> {len(grouped_qsos)} Standorte")
+
+    for grouping in groupings:
+        for group in grouping.values():
+            group.pop('times', None)
+            group.pop('qso_values', None)
+
+
+# ----------------------------------------
+# KLASSE: SessionRoute
+# ----------------------------------------
+class SessionRoute:
+    """
+    Exportziel eines in Aktivierungen aufgeteilten Standorts für den Export, der die QSOs erneut liest:
+    Statt eines Dateinamens steht in export_key_by_location ein SessionRoute, der den Dateinamen
+    anhand des QSO-Zeitpunkts wählt (None = Aktivierung wird nicht exportiert).
+    """
+    __slots__ = ('boundaries', 'export_keys')
+
+    def __init__(self, boundaries, export_keys):
+        self.boundaries = boundaries
+        self.export_keys = export_keys
+
+
+    def select(self, qso):
+        return self.export_keys[bisect.bisect_right(self.boundaries, qso_timestamp(qso))]
+
+
+    def with_suffix(self, suffix):
+        return SessionRoute(self.boundaries, [None if export_key is None else f"{export_key}_{suffix}"
+                                              for export_key in self.export_keys])
+
+# ----------------------------------------
+# ENDE KLASSE SessionRoute
+# ----------------------------------------
+
+
+def _clean_number(value):
+    value = value.strip()
+    return value if value.isdigit() else "0"
+
+
+def build_location_data(grouped_qsos, station_index, log=_no_log, resolver=None):
+    """
+    Gleicht die gruppierten Standorte mit Wavelog ab und erzeugt die Standortdaten
+    (eine Zeile pro Standort, wie sie in der Tabelle angezeigt wird).
+    Mit resolver (LocationResolver) werden fehlende DXCC-/Zonen-Angaben aus Rufzeichen und Locator ergänzt.
+    """
+    location_data = {
+        location_key: _build_location_entry(location_key, group, station_index, log, resolver)
+        for location_key, group in grouped_qsos.items()
+    }
+    _log_location_summary(location_data.values(), log)
+    return location_data
+
+
+def merge_location_data(location_data, grouped_qsos, station_index, log=_no_log, resolver=None):
+    """
+    Übernimmt eine ergänzte Gruppierung in bestehende Standortdaten: Bekannte Standorte erhalten
+    nur die neue QSO-Anzahl (Änderungen des Benutzers bleiben erhalten), neue Standorte werden abgeglichen.
+    Gibt die Liste der neu hinzugekommenen Standortschlüssel zurück.
+    """
+    new_keys = []
+    for location_key, group in grouped_qsos.items():
+        data = location_data.get(location_key)
+        if data is None:
+            location_data[location_key] = _build_location_entry(location_key, group, station_index, log, resolver)
+            new_keys.append(location_key)
+        else:
+            data['qso_count'] = group['count']
+            data.update(_group_summary(group))
+    _log_location_summary((location_data[location_key] for location_key in new_keys), log)
+    return new_keys
+
+
+def _group_summary(group):
+    """Auszählungsdaten einer Gruppe für die Standortdaten (Zeitraum, Bänder, abweichende Felder)."""
+    return {
+        'first_date': group.get('first_date', ''),
+        'last_date': group.get('last_date', ''),
+        'bands': dict(group.get('bands', {})),
+        'disagreement': list(group.get('disagreement', []))
+    }
+
+
+def describe_disagreement(group):
+    """Beschreibt die abweichenden Stationsfelder einer Gruppe, z.B. 'MY_DXCC 230 (120x) / 281 (3x)'."""
+    parts = []
+    for field, adif_field in CONSENSUS_FIELDS:
+        if field not in group.get('disagreement', []):
+            continue
+        counts = group[f'{field}_counts']
+        values = sorted(counts.items(), key=lambda item: -item[1])
+        parts.append(f"{adif_field} " + " / ".join(f"{value} ({count}x)" for value, count in values))
+    return ", ".join(parts)
+
+
+def _log_location_summary(locations, log):
+    locations = list(locations)
+    disagreement_count = sum(1 for data in locations if data.get('disagreement'))
+    if disagreement_count:
+        log(f"WARNUNG: {disagreement_count} Standorte mit abweichenden Stationsdaten (MY_DXCC/MY_CQ_ZONE/MY_ITU_ZONE).")
+    inferred_count = sum(1 for data in locations if data.get('inferred'))
+    if inferred_count:
+        log(f"{inferred_count} Standorte: fehlende DXCC-/Zonen-Angaben aus Rufzeichen und Locator ergänzt.")
+
+
+def _build_location_entry(location_key, group, station_index, log=_no_log, resolver=None):
+    """Erzeugt die Standortdaten für eine Gruppe (inkl. Abgleich mit dem Stationsindex)."""
+    if location_key == UNASSIGNED_KEY:
+        call, locator = "N/A", "N/A"
+        wavelog_id, profile_name, conflicts = "N/A", "UNZUGEOORDNET", None
+        status_text = STATUS_INCOMPLETE
+    else:
+        call, locator = location_key.split('|')[:2]
+        is_found_on_api, wavelog_id, profile_name, conflicts = station_index.match(call, locator, log, group.get('grids', ()))
+
+        if conflicts:
+            status_text = STATUS_AMBIGUOUS
+            wavelog_id = "KONFLIKT"
+            profile_name = ", ".join(conflicts.values())
+        elif is_found_on_api:
+            status_text = STATUS_FOUND
+        else:
+            status_text = STATUS_NEW
+            wavelog_id = "NEU"
+
+    station_data = {
+        'dxcc': _clean_number(group['dxcc']),
+        'cqz': _clean_number(group['cqz']),
+        'ituz': _clean_number(group['ituz'])
+    }
+    if group.get('disagreement') and location_key != UNASSIGNED_KEY:
+        log(f"WARNUNG: {call}@{locator}: abweichende Stationsdaten in den QSOs ({describe_disagreement(group)}), "
+            f"verwendet wird der häufigste Wert.")
+
+    # Fehlende Angaben (0) offline aus Rufzeichen und Locator ergänzen
+    inferred = []
+    if resolver is not None and location_key != UNASSIGNED_KEY and "0" in station_data.values():
+        for field, value in resolver.resolve(call, locator).items():
+            if station_data[field] == "0":
+                station_data[field] = value
+                inferred.append(field)
+
+    entry = {
+        'call': call,
+        'locator': locator,
+        'qso_count': group['count'],
+        'profile_name': profile_name,
+        'status': status_text,
+        'selected': status_text == STATUS_NEW,
+        'wavelog_id': wavelog_id,
+        'is_new': (wavelog_id == "NEU"),
+        'conflicting_stations': conflicts,
+        'dxcc': station_data['dxcc'],
+        'cqz': station_data['cqz'],
+        'ituz': station_data['ituz'],
+        'inferred': inferred
+    }
+    entry.update(_group_summary(group))
+    if 'session' in group:
+        entry['session'] = group['session']['index']
+        # Jede Aktivierung wird ein eigenes Profil, der Name muss sich daher unterscheiden
+        if status_text == STATUS_NEW:
+            entry['profile_name'] = f"{call}-{locator}-A{entry['session']}"
+    return entry
+
+
+# ----------------------------------------
+# KLASSE: WavelogStationIndex
+# ----------------------------------------
+class WavelogStationIndex:
+    """
+    Nachschlage-Indizes über die Wavelog-Stationsprofile (einmal pro Abruf aufgebaut):
+    - (CALL, LOCATOR) -> {station_id: profile_name} für den Abgleich
+    - (CALL, LOCATOR[:n]) -> {station_id: profile_name} für den Abgleich gekürzter Locatoren (grid_precision)
+    - (CALL, LOCATOR[:4], profile_name) -> station_id für die Prüfung offener Anlege-Versuche
+    """
+
+    def __init__(self, stations=None):
+        self.stations = stations
+        self.by_call_locator = {}
+        self.by_locator_prefix = {}
+        self.by_prefix = {}
+        self.station_ids = set()
+
+        for station in stations or []:
+            station_id = station.get('station_id')
+            if not station_id:
+                continue
+            self.station_ids.add(str(station_id))
+
+            station_call = station.get('station_callsign', '').upper()
+            station_locator = station.get('station_gridsquare', '').upper()
+            station_profile_name = station.get('station_profile_name', 'Unbekanntes Profil')
+
+            self.by_call_locator.setdefault((station_call, station_locator), {})[str(station_id)] = station_profile_name
+            for precision in GRID_PRECISIONS:
+                if 0 < precision < len(station_locator):
+                    self.by_locator_prefix.setdefault((station_call, station_locator[:precision]), {})[str(station_id)] = station_profile_name
+            # Erster Treffer gewinnt (wie bei der bisherigen linearen Suche)
+            self.by_prefix.setdefault((station_call, station_locator[:4], station.get('station_profile_name', '')), station_id)
+
+
+    def match(self, callsign, gridsquare, log=_no_log, grids=()):
+        """
+        Prüft lokal auf Stationen. Gibt (gefunden, id, profilname, konflikte) zurück.
+        grids sind die vollständigen Locatoren der QSOs eines gekürzten oder zusammengefassten Standorts:
+        Ohne exakten Treffer zählen dann Stationen mit einem dieser Locatoren und, falls gridsquare gekürzt
+        ist, Stationen, deren Locator mit gridsquare beginnt.
+        """
+        if not self.stations:
+            log("WARNUNG: Lokale Stationsliste ist leer. Überspringe Check.")
+            return False, "N/A", "N/A", None
+
+        call_key = callsign.upper()
+        gridsquare = gridsquare.upper()
+        found_matches = self.by_call_locator.get((call_key, gridsquare), {})
+        if not found_matches and grids:
+            found_matches = {}
+            for locator in grids:
+                found_matches.update(self.by_call_locator.get((call_key, locator.upper()), {}))
+            if any(len(locator) > len(gridsquare) for locator in grids):
+                found_matches.update(self.by_locator_prefix.get((call_key, gridsquare), {}))
+
+        count = len(found_matches)
+
+        if count == 0:
+            return False, "N/A", "N/A", None
+        elif count == 1:
+            station_id, station_name = list(found_matches.items())[0]
+            log(f"  -> {callsign}@{gridsquare} GEFUNDEN (ID: {station_id}, Profil: {station_name})")
+            return True, station_id, station_name, None
+        else:
+            log(f"  -> {callsign}@{gridsquare} MEHRDEUTIG! ({count} Profile gefunden)")
+            first_id, first_name = list(found_matches.items())[0]
+            return True, first_id, first_name, dict(found_matches)
+
+
+    def find_created_id(self, callsign, locator, profile_name):
+        """Sucht die ID einer neu angelegten Station (Rufzeichen, 4-stelliger Locator, Profilname)."""
+        return self.by_prefix.get((callsign.upper(), locator.upper()[:4], profile_name))
+
+# ----------------------------------------
+# ENDE KLASSE WavelogStationIndex
+# ----------------------------------------
+
+
+# ----------------------------------------
+# Abschnitt: Wavelog API
+# ----------------------------------------
+def create_http_session(max_workers=DEFAULT_MAX_WORKERS):
+    """Erzeugt eine HTTP-Session mit Verbindungspool passend zur Parallelität."""
+    pool_size = max(1, max_workers)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# ----------------------------------------
+# KLASSE: TokenBucket
+# ----------------------------------------
+class TokenBucket:
+    """
+    Clientseitige Ratenbegrenzung (threadsicher): rate Anfragen pro Sekunde im Mittel,
+    kurzfristig bis zu capacity Anfragen am Stück. rate <= 0 schaltet die Begrenzung ab.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def acquire(self):
+        """Wartet, bis eine Anfrage gesendet werden darf."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # Token sofort reservieren; wer ins Minus geht, wartet die entsprechende Zeit ab
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+# ----------------------------------------
+# ENDE KLASSE TokenBucket
+# ----------------------------------------
+
+
+# ----------------------------------------
+# KLASSE: WavelogClient
+# ----------------------------------------
+class WavelogClient:
+    """
+    Zugriff auf die Wavelog-API über eine gemeinsame HTTP-Session (Verbindungspool, Keep-Alive).
+    Vorübergehende Fehler werden mit exponentiellem Backoff (mit Jitter) wiederholt, ein
+    Retry-After des Servers wird beachtet. Alle Anfragen laufen durch einen TokenBucket.
+    """
+    # Bei lesenden Anfragen wird auch nach Verbindungsfehlern/Timeouts wiederholt
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    # Anlegen: Nur wiederholen, wenn der Server die Anfrage sicher nicht verarbeitet hat,
+    # sonst könnten doppelte Stationen entstehen
+    RETRY_STATUS_NON_IDEMPOTENT = (429, 503)
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 30.0
+    RETRY_AFTER_MAX = 300.0
+
+    def __init__(self, wavelog_url, wavelog_token, max_workers=DEFAULT_MAX_WORKERS,
+                 max_retries=DEFAULT_MAX_RETRIES, rate_limit=DEFAULT_RATE_LIMIT, stats=None):
+        self.wavelog_url = wavelog_url
+        self.wavelog_token = wavelog_token
+        self.max_retries = max(0, max_retries)
+        self.session = create_http_session(max_workers)
+        self.session.headers['Connection'] = 'keep-alive'
+        self.rate_limiter = TokenBucket(rate_limit, capacity=max(1, max_workers))
+        self.request_count = 0
+        self.retry_count = 0
+        self._stats_lock = threading.Lock()
+        # Optionale PipelineStats für Zähler und Latenz-Histogramme
+        self.stats = stats
+
+
+    @classmethod
+    def from_settings(cls, settings, wavelog_url=None, wavelog_token=None, max_workers=None, stats=None):
+        """Erzeugt den Client aus den Einstellungen von load_config (einzelne Werte überschreibbar)."""
+        return cls(wavelog_url or settings['wavelog_url'], wavelog_token or settings['wavelog_token'],
+                   max_workers=max_workers or settings['max_workers'],
+                   max_retries=settings['max_retries'], rate_limit=settings['rate_limit'], stats=stats)
+
+
+    @property
+    def base_host(self):
+        return get_wavelog_base_host(self.wavelog_url)
+
+
+    @property
+    def station_info_url(self):
+        # ENDPUNKT KORREKTUR: 'station_info' anstelle von 'station_profile'
+        return f"{self.base_host}/index.php/api/station_info/{self.wavelog_token}"
+
+
+    @property
+    def create_station_url(self):
+        # Endpunkt-Korrekur beibehalten
+        return f"{self.base_host}/index.php/api/create_station/{self.wavelog_token}"
+
+
+    @property
+    def cache_source(self):
+        return station_cache_source(self.wavelog_url, self.wavelog_token)
+
+
+    def close(self):
+        self.session.close()
+
+
+    def _backoff_delay(self, attempt, response=None):
+        """Wartezeit vor dem nächsten Versuch: Retry-After des Servers oder exponentieller Backoff mit vollem Jitter."""
+        if response is not None:
+            retry_after = self.parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.RETRY_AFTER_MAX)
+        return random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** attempt)))
+
+
+    @staticmethod
+    def parse_retry_after(value):
+        """Retry-After als Sekunden oder HTTP-Datum. Gibt die Wartezeit in Sekunden oder None zurück."""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+    def request(self, method, url, idempotent=True, log=_no_log, **kwargs):
+        """
+        Sendet eine Anfrage mit Wiederholungen. Gibt die letzte Antwort zurück (auch bei Fehlerstatus),
+        Verbindungsfehler werden nach dem letzten Versuch weitergereicht.
+        """
+        retry_status = self.RETRY_STATUS if idempotent else self.RETRY_STATUS_NON_IDEMPOTENT
+        # Endpunkt (z.B. 'station_info') als Name für Zähler und Histogramm, ohne Token
+        endpoint = url.split('/api/')[-1].split('/')[0]
+        stats = self.stats
+        attempt = 0
+
+        while True:
+            self.rate_limiter.acquire()
+            with self._stats_lock:
+                self.request_count += 1
+            if stats is not None:
+                stats.count('http_requests')
+
+            request_start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as err:
+                if stats is not None:
+                    stats.observe_latency(endpoint, time.perf_counter() - request_start)
+                    stats.count('http_errors')
+                # Ein Timeout beim Anlegen lässt offen, ob die Station angelegt wurde -> nicht wiederholen
+                retryable = idempotent or isinstance(err, requests.exceptions.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                log(f"  -> Verbindungsfehler ({err.__class__.__name__}), neuer Versuch in {delay:.1f} s...")
+            else:
+                if stats is not None:
+                    stats.observe_latency(endpoint, time.perf_counter() - request_start)
+                    if response.status_code >= 400:
+                        stats.count('http_errors')
+                if response.status_code not in retry_status or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff_delay(attempt, response)
+                log(f"  -> HTTP {response.status_code}, neuer Versuch in {delay:.1f} s...")
+                response.close()
+
+            with self._stats_lock:
+                self.retry_count += 1
+            if stats is not None:
+                stats.count('http_retries')
+            attempt += 1
+            time.sleep(delay)
+
+
+    def get(self, url, log=_no_log, **kwargs):
+        return self.request('GET', url, log=log, **kwargs)
+
+
+    def post(self, url, log=_no_log, **kwargs):
+        return self.request('POST', url, idempotent=False, log=log, **kwargs)
+
+# ----------------------------------------
+# ENDE KLASSE WavelogClient
+# ----------------------------------------
+
+
+def station_cache_source(wavelog_url, wavelog_token):
+    """Kennung der Wavelog-Instanz für den Cache (Host + Hash des Tokens, der Token selbst wird nicht gespeichert)."""
+    token_hash = hashlib.sha256((wavelog_token or '').encode('utf-8')).hexdigest()[:16]
+    return f"{get_wavelog_base_host(wavelog_url)}#{token_hash}"
+
+
+# ----------------------------------------
+# KLASSE: StationCache
+# ----------------------------------------
+class StationCache:
+    """
+    Lokaler Cache der Wavelog-Stationsliste (JSON-Datei neben der config.ini).
+    Innerhalb der TTL wird die Liste ohne Netzwerkzugriff verwendet, danach wird sie
+    bedingt (ETag / Last-Modified) neu geladen. Neu angelegte Stationen werden direkt ergänzt.
+    """
+    FILE_NAME = 'station_cache.json'
+
+    def __init__(self, path, ttl_seconds=DEFAULT_CACHE_TTL_MINUTES * 60):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.source = None
+        self.stations = None
+        self.fetched_at = 0
+        self.etag = None
+        self.last_modified = None
+        self._lock = threading.Lock()
+        self._load()
+
+
+    @classmethod
+    def for_config(cls, config_file, ttl_minutes=DEFAULT_CACHE_TTL_MINUTES):
+        """Erzeugt den Cache im Verzeichnis der Konfigurationsdatei."""
+        directory = os.path.dirname(os.path.abspath(config_file))
+        return cls(os.path.join(directory, cls.FILE_NAME), ttl_minutes * 60)
+
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(data, dict) and isinstance(data.get('stations'), list):
+            self.source = data.get('source')
+            self.stations = data['stations']
+            self.fetched_at = data.get('fetched_at', 0)
+            self.etag = data.get('etag')
+            self.last_modified = data.get('last_modified')
+
+
+    def _save(self):
+        data = {
+            'source': self.source,
+            'fetched_at': self.fetched_at,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'stations': self.stations
+        }
+        # Erst in eine temporäre Datei schreiben, damit ein Abbruch den Cache nicht beschädigt
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+
+    def has_data(self, source):
+        return self.stations is not None and self.source == source
+
+
+    def is_fresh(self, source):
+        return self.has_data(source) and (time.time() - self.fetched_at) < self.ttl_seconds
+
+
+    def store(self, source, stations, etag=None, last_modified=None):
+        """Übernimmt eine vollständig geladene Stationsliste."""
+        with self._lock:
+            self.source = source
+            self.stations = stations
+            self.fetched_at = time.time()
+            self.etag = etag
+            self.last_modified = last_modified
+            self._save()
+
+
+    def touch(self):
+        """Markiert den Cache als aktuell (Server meldete 304 Not Modified)."""
+        with self._lock:
+            self.fetched_at = time.time()
+            self._save()
+
+
+    def add_stations(self, new_stations):
+        """Ergänzt neu angelegte Stationen (ersetzt Einträge mit gleicher station_id)."""
+        with self._lock:
+            if self.stations is None:
+                return
+            new_ids = {str(station.get('station_id')) for station in new_stations}
+            self.stations = [station for station in self.stations if str(station.get('station_id')) not in new_ids]
+            self.stations.extend(new_stations)
+            # ETag/Last-Modified passen nicht mehr zur lokal ergänzten Liste
+            self.etag = None
+            self.last_modified = None
+            self._save()
+
+
+    def invalidate(self):
+        """Verwirft den Cache, der nächste Abruf lädt die Liste vollständig neu."""
+        with self._lock:
+            self.source = None
+            self.stations = None
+            self.fetched_at = 0
+            self.etag = None
+            self.last_modified = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+# ----------------------------------------
+# ENDE KLASSE StationCache
+# ----------------------------------------
+
+
+def fetch_station_info(client, log=_no_log, cache=None, force_refresh=False):
+    """
+    Ruft alle Stationsprofile von Wavelog ab (Endpunkt station_info). Gibt die Liste oder None zurück.
+    Mit cache wird innerhalb der TTL keine Anfrage gestellt (außer bei force_refresh), sonst bedingt neu geladen.
+    """
+    source = client.cache_source
+
+    if cache is not None and not force_refresh and cache.is_fresh(source):
+        log(f"\n-> {len(cache.stations)} Stationsprofile aus lokalem Cache geladen.")
+        return cache.stations
+
+    log("\n-> Lade alle existierenden Wavelog Stationsprofile...")
+
+    headers = {'Content-Type': 'application/json'}
+    if cache is not None and cache.has_data(source):
+        if cache.etag:
+            headers['If-None-Match'] = cache.etag
+        if cache.last_modified:
+            headers['If-Modified-Since'] = cache.last_modified
+
+    try:
+        response = client.get(client.station_info_url, log=log, headers=headers, timeout=15)
+
+        if response.status_code == 304 and cache is not None and cache.has_data(source):
+            cache.touch()
+            log(f"-> Stationsprofile unverändert, {len(cache.stations)} Profile aus lokalem Cache verwendet.")
+            return cache.stations
+
+        response.raise_for_status()
+
+        data = response.json()
+
+        # PRÜFUNG KORREKTUR: Prüft direkt auf Liste
+        if isinstance(data, list):
+            log(f"-> {len(data)} Stationsprofile erfolgreich geladen.")
+            if cache is not None:
+                try:
+                    cache.store(source, data, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                except OSError as e:
+                    log(f"WARNUNG: Stations-Cache konnte nicht gespeichert werden: {e}")
+            return data
+        else:
+            log("FEHLER: API gab keine erwartete Liste von Standorten zurück.")
+            return None
+
+    except requests.exceptions.HTTPError as errh:
+        status_code = errh.response.status_code
+        log(f"-> HTTP-FEHLER ({status_code}) beim Laden der Profile: {errh}")
+    except (requests.exceptions.RequestException, ValueError) as err:
+        log(f"-> Allgemeiner Fehler beim Laden der Profile: {err}")
+
+    if cache is not None and cache.has_data(source):
+        log(f"WARNUNG: Verwende veralteten lokalen Cache ({len(cache.stations)} Stationsprofile).")
+        return cache.stations
+
+    return None
+
+
+# ----------------------------------------
+# KLASSE: CreationJournal
+# ----------------------------------------
+class CreationJournal:
+    """
+    Write-Ahead-Journal der Anlege-Requests (JSON-Zeilen neben der config.ini), Schlüssel:
+    Wavelog-Instanz, Rufzeichen, Locator, Profilname. Vor jedem POST wird 'pending' geschrieben
+    (mit fsync), danach das Ergebnis: 'created' (ggf. mit ID), 'failed' (sicher nicht angelegt) oder
+    'uncertain' (z.B. Timeout, Ergebnis offen). Ein erneuter Lauf prüft offene und angelegte Einträge
+    gegen die Stationsliste: Angelegte Stationen, die in Wavelog gelöscht wurden, werden erneut angelegt.
+    """
+    FILE_NAME = 'creation_journal.jsonl'
+
+    PENDING = 'pending'
+    CREATED = 'created'
+    FAILED = 'failed'
+    UNCERTAIN = 'uncertain'
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.entries = {}   # Schlüssel (tuple) -> {'state', 'station_id'}
+        self._lock = threading.Lock()
+        self._load()
+
+
+    @classmethod
+    def for_config(cls, config_file, source):
+        """Erzeugt das Journal im Verzeichnis der Konfigurationsdatei."""
+        directory = os.path.dirname(os.path.abspath(config_file))
+        return cls(os.path.join(directory, cls.FILE_NAME), source)
+
+
+    def key(self, item):
+        return (self.source, item['callsign'].upper(), item['locator'].upper(), item['profile_name'])
+
+
+    def _load(self):
+        line_count = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line_count += 1
+                    try:
+                        record = json.loads(line)
+                        self.entries[tuple(record['key'])] = {'state': record['state'],
+                                                              'station_id': record.get('station_id')}
+                    except (ValueError, KeyError, TypeError):
+                        # Unvollständige letzte Zeile nach einem Absturz
+                        continue
+        except OSError:
+            return
+
+        # Überholte Zeilen entfernen, wenn das Journal deutlich größer als nötig ist
+        if line_count > 2 * len(self.entries) + 100:
+            self._compact()
+
+
+    def _compact(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for key, entry in self.entries.items():
+                f.write(json.dumps({'key': list(key), 'state': entry['state'], 'station_id': entry['station_id']}) + "\n")
+        os.replace(temp_path, self.path)
+
+
+    def _write(self, items, state, station_ids=None, sync=False):
+        """Hängt den neuen Zustand der Einträge an (mit sync: fsync vor dem Request)."""
+        now = time.time()
+        lines = []
+        with self._lock:
+            for index, item in enumerate(items):
+                key = self.key(item)
+                station_id = station_ids[index] if station_ids else self.entries.get(key, {}).get('station_id')
+                self.entries[key] = {'state': state, 'station_id': station_id}
+                lines.append(json.dumps({'key': list(key), 'state': state, 'station_id': station_id, 'time': now}) + "\n")
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("".join(lines))
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+
+    def state(self, item):
+        entry = self.entries.get(self.key(item))
+        return (entry['state'], entry['station_id']) if entry else (None, None)
+
+
+    def begin(self, batch):
+        self._write(batch, self.PENDING, sync=True)
+
+
+    def finish(self, batch, created_ok, uncertain=False):
+        if created_ok:
+            self._write(batch, self.CREATED, [item.get('station_id') for item in batch])
+        else:
+            self._write(batch, self.UNCERTAIN if uncertain else self.FAILED)
+
+
+    def record_ids(self, created_items, found_ids):
+        """Übernimmt die nach dem Anlegen gefundenen IDs (für spätere Läufe)."""
+        items = [item for item in created_items if found_ids.get(item['location_key'], "UNKLARE ID") != "UNKLARE ID"]
+        if items:
+            self._write(items, self.CREATED, [found_ids[item['location_key']] for item in items])
+
+
+    def needs_check(self, items):
+        """True, wenn Einträge mit offenem Ergebnis dabei sind (die Stationsliste sollte dann neu geladen werden)."""
+        return any(self.state(item)[0] in (self.PENDING, self.UNCERTAIN) for item in items)
+
+
+    def plan(self, items, station_index, log=_no_log):
+        """
+        Teilt die Einträge in (zu sendende, bereits angelegte, ungeklärte) auf. Offene Einträge gelten als
+        angelegt, wenn die Station (Rufzeichen, Locator, Profilname) in station_index vorhanden ist.
+        Angelegte Einträge werden mit Stationsliste ebenfalls geprüft (per ID, ohne ID wie offene Einträge)
+        und erneut angelegt, wenn die Station nicht mehr existiert.
+        Ohne Stationsliste bleiben offene Einträge ungeklärt (kein erneuter POST, um Duplikate zu vermeiden),
+        angelegte Einträge werden übersprungen.
+        """
+        has_stations = station_index.stations is not None
+        items_to_post, already_created, unresolved = [], [], []
+        for item in items:
+            state, station_id = self.state(item)
+            label = f"{item['callsign']}@{item['locator']}"
+            if state == self.CREATED and has_stations:
+                if station_id:
+                    exists = str(station_id) in station_index.station_ids
+                else:
+                    station_id = station_index.find_created_id(item['callsign'], item['locator'], item['profile_name'])
+                    exists = station_id is not None
+                if not exists:
+                    log(f"  -> {label} wurde laut Journal angelegt, ist in Wavelog aber nicht mehr vorhanden. Lege erneut an.")
+                    items_to_post.append(item)
+                    continue
+                log(f"  -> {label} wurde laut Journal bereits angelegt (ID {station_id}), überspringe.")
+            elif state == self.CREATED:
+                log(f"  -> {label} wurde laut Journal bereits angelegt, überspringe.")
+            elif state in (self.PENDING, self.UNCERTAIN) and not has_stations:
+                log(f"  -> {label}: Ergebnis des letzten Versuchs offen, ohne Stationsliste nicht prüfbar. Überspringe.")
+                unresolved.append(item)
+                continue
+            elif state in (self.PENDING, self.UNCERTAIN):
+                station_id = station_index.find_created_id(item['callsign'], item['locator'], item['profile_name'])
+                if station_id is None:
+                    log(f"  -> {label}: Ergebnis des letzten Versuchs offen, Station nicht vorhanden. Lege erneut an.")
+                    items_to_post.append(item)
+                    continue
+                log(f"  -> {label}: Ergebnis des letzten Versuchs offen, Station mit ID {station_id} gefunden.")
+                self._write([item], self.CREATED, [str(station_id)])
+            else:
+                items_to_post.append(item)
+                continue
+
+            if station_id:
+                item['station_id'] = str(station_id)
+            item['created_successfully'] = True
+            already_created.append(item)
+        return items_to_post, already_created, unresolved
+
+
+    def clear(self):
+        with self._lock:
+            self.entries = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+# ----------------------------------------
+# ENDE KLASSE CreationJournal
+# ----------------------------------------
+
+
+def collect_items_to_create(location_data, log=_no_log):
+    """Sammelt alle zur Neuanlage markierten Standorte als Anlege-Einträge."""
+    items_to_create = []
+
+    for location_key, data in location_data.items():
+        if data['selected'] and data['status'] not in [STATUS_INCOMPLETE, STATUS_AMBIGUOUS]:
+            items_to_create.append({
+                'location_key': location_key,
+                'callsign': data['call'],
+                'locator': data['locator'],
+                'profile_name': data['profile_name'],
+                'station_dxcc': data['dxcc'],
+                'station_cq': data['cqz'],
+                'station_itu': data['ituz'],
+                'created_successfully': False
+            })
+
+        elif data['status'].startswith("MEHRDEUTIG"):
+            log(f"WARNUNG: Kann Station {data['call']}@{data['locator']} nicht anlegen, Mehrdeutigkeit muss zuerst aufgelöst werden.")
+
+    return items_to_create
+
+
+def build_station_payload(batch):
+    """Erzeugt die Payload für create_station (eine Liste von Stationen)."""
+    return [{
+        "station_callsign": item['callsign'],
+        "station_gridsquare": item['locator'],
+        "station_profile_name": item['profile_name'],
+        "station_dxcc": item['station_dxcc'],
+        "station_cq": item['station_cq'],
+        "station_itu": item['station_itu']
+    } for item in batch]
+
+
+def _created_station_ids(api_response, count):
+    """
+    Liest die IDs der angelegten Stationen aus der create_station-Antwort, falls die
+    Wavelog-Version sie mitliefert ('station_ids' oder 'stations' in Payload-Reihenfolge).
+    """
+    ids = api_response.get('station_ids')
+    if ids is None and isinstance(api_response.get('stations'), list):
+        ids = [station.get('station_id') if isinstance(station, dict) else None for station in api_response['stations']]
+
+    if isinstance(ids, list) and len(ids) == count and all(ids):
+        return [str(station_id) for station_id in ids]
+    return None
+
+
+def post_station_batch(client, batch, log=_no_log):
+    """
+    Legt ein Paket von Stationen mit einem POST-Request an (läuft im Worker-Thread).
+    Gibt (status_text, erfolgreich, unklar) zurück; unklar ist True, wenn ein Fehler offen lässt,
+    ob der Server die Stationen angelegt hat (Timeout, 5xx, unlesbare Antwort).
+    Liefert die API die neuen IDs mit, werden sie als 'station_id' im jeweiligen Eintrag abgelegt.
+    """
+    headers = {'Content-Type': 'application/json'}
+    payload = build_station_payload(batch)
+
+    labels = ", ".join(f"{item['callsign']}@{item['locator']}" for item in batch)
+
+    try:
+        for item in batch:
+            log(f"  -> POST-Request zum Anlegen für {item['callsign']}@{item['locator']} (DXCC: {item['station_dxcc']}, CQ: {item['station_cq']}, ITU: {item['station_itu']})...")
+
+        response = client.post(client.create_station_url, log=log, json=payload, headers=headers, timeout=10)
+        response.raise_for_status()
+
+        api_response = response.json()
+
+        if api_response.get('status') == 'success' and 'imported' in api_response.get('message', ''):
+            station_ids = _created_station_ids(api_response, len(batch))
+            if station_ids:
+                for item, station_id in zip(batch, station_ids):
+                    item['station_id'] = station_id
+            log(f"  -> ERFOLG: Station(en) {labels} angelegt. Suche ID...")
+            return "Angelegt (ID wird gesucht)", True, False
+        else:
+            log(f"  -> FEHLER: POST OK, aber Status nicht 'success'. Response: {api_response}")
+            return "FEHLER (kein Erfolg i. Status)", False, False
+
+    except requests.exceptions.HTTPError as errh:
+        status_code = errh.response.status_code
+        response_text = errh.response.text.strip()
+        log(f"  -> HTTP-FEHLER ({status_code}) bei Erstellung von {labels}: {response_text}")
+        return f"HTTP-FEHLER {status_code}", False, status_code in (408, 500, 502, 504)
+
+    except (requests.exceptions.RequestException, ValueError) as err:
+        log(f"  -> Allgemeiner Fehler bei Erstellung von {labels}: {err}")
+        # Ohne Verbindungsaufbau kann der Request nicht verarbeitet worden sein
+        return "VERBINDUNGSFEHLER", False, not isinstance(err, requests.exceptions.ConnectTimeout)
+
+
+def create_stations(client, items_to_create,
+                    max_workers=DEFAULT_MAX_WORKERS, batch_size=DEFAULT_BATCH_SIZE,
+                    log=_no_log, on_result=None, progress=None, journal=None, station_index=None):
+    """
+    Legt die Stationen parallel (begrenzte Anzahl Threads, gemeinsamer WavelogClient) an.
+    Mehrere Stationen können in einem create_station-Request zusammengefasst werden.
+    on_result(item, status_text, erfolgreich) wird pro Eintrag aufgerufen.
+    Löst progress JobCancelled aus, werden noch nicht gestartete Requests verworfen.
+    Mit journal (CreationJournal) werden laut Journal bereits angelegte Stationen übersprungen (sofern sie
+    in station_index noch existieren), offene Einträge gegen station_index geprüft und alle Requests
+    vorab protokolliert.
+    Gibt die Liste der erfolgreich (auch früher) angelegten Einträge zurück.
+    """
+    already_created = []
+    if journal is not None:
+        items_to_create, already_created, unresolved = journal.plan(items_to_create, station_index or WavelogStationIndex(), log)
+        if on_result:
+            for item in already_created:
+                on_result(item, "Bereits angelegt (Journal)", True)
+            for item in unresolved:
+                on_result(item, "Ergebnis unklar (Journal)", False)
+
+    def post_batch(batch):
+        if journal is None:
+            return post_station_batch(client, batch, log)
+        journal.begin(batch)
+        status_text, created_ok, uncertain = post_station_batch(client, batch, log)
+        journal.finish(batch, created_ok, uncertain)
+        return status_text, created_ok, uncertain
+
+    # Einträge in Pakete aufteilen (der Endpunkt create_station akzeptiert eine Liste)
+    batch_size = max(1, batch_size)
+    batches = [items_to_create[i:i + batch_size] for i in range(0, len(items_to_create), batch_size)]
+
+    log(f"  -> {len(batches)} Request(s), max. {max_workers} parallel, {batch_size} Station(en) pro Request.")
+
+    successfully_created_items = list(already_created)
+    processed_count = 0
+    cancelled = False
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(post_batch, batch): batch for batch in batches}
+
+        for future in as_completed(futures):
+            batch = futures[future]
+
+            if future.cancelled():
+                for item in batch:
+                    if on_result:
+                        on_result(item, "Abgebrochen", False)
+                continue
+
+            status_text, created_ok, uncertain = future.result()
+            if uncertain:
+                status_text += " (Ergebnis unklar)"
+
+            for item in batch:
+                item['created_successfully'] = created_ok
+                if created_ok:
+                    successfully_created_items.append(item)
+                if on_result:
+                    on_result(item, status_text, created_ok)
+
+            processed_count += len(batch)
+            if progress and not cancelled:
+                try:
+                    progress(processed_count, len(items_to_create), f"Lege Stationen an: {processed_count}/{len(items_to_create)}")
+                except JobCancelled:
+                    # Noch nicht gestartete Requests verwerfen, laufende werden noch abgeschlossen
+                    cancelled = True
+                    for pending in futures:
+                        pending.cancel()
+                    log("\nAnlegen abgebrochen. Bereits angelegte Stationen werden noch zugeordnet.")
+
+    return successfully_created_items
+
+
+def created_items_as_stations(created_items):
+    """
+    Erzeugt Stationseinträge (wie von station_info) für angelegte Stationen, deren ID aus der
+    create_station-Antwort bekannt ist. Gibt None zurück, wenn nicht alle IDs bekannt sind.
+    """
+    if not all(item.get('station_id') for item in created_items):
+        return None
+
+    stations = []
+    for item, payload in zip(created_items, build_station_payload(created_items)):
+        payload['station_id'] = item['station_id']
+        stations.append(payload)
+    return stations
+
+
+def reconcile_created_ids(created_items, stations_before, stations_after, log=_no_log):
+    """
+    Ordnet den angelegten Stationen ihre Wavelog-IDs zu. IDs aus der create_station-Antwort werden
+    direkt übernommen, sonst werden die neuen Profile über die Differenz der Stations-IDs vor und nach
+    dem Anlegen in einem Durchlauf bestimmt und über (Rufzeichen, Locator, Profilname) zugeordnet
+    (falls Wavelog den Locator verändert: über die ersten 4 Zeichen). Früher angelegte Stationen
+    (z.B. laut Journal) werden in der gesamten Liste gesucht.
+    Gibt (found_ids, ambiguous) zurück: {location_key: id bzw. "UNKLARE ID"} und für mehrdeutige
+    Zuordnungen {location_key: {station_id: profilname}} mit allen Kandidaten.
+    """
+    log("\n--- Ordne die IDs der neu erstellten Stationen zu ---")
+
+    before_ids = {str(station.get('station_id')) for station in stations_before or []}
+    new_by_key, new_by_prefix, all_by_key = {}, {}, {}
+    for station in stations_after or []:
+        station_id = str(station.get('station_id') or '')
+        if not station_id:
+            continue
+        call = station.get('station_callsign', '').upper()
+        locator = station.get('station_gridsquare', '').upper()
+        profile_name = station.get('station_profile_name', '')
+        all_by_key.setdefault((call, locator, profile_name), {})[station_id] = profile_name
+        if station_id not in before_ids:
+            new_by_key.setdefault((call, locator, profile_name), {})[station_id] = profile_name
+            new_by_prefix.setdefault((call, locator[:4], profile_name), {})[station_id] = profile_name
+
+    found_ids, ambiguous = {}, {}
+    claimed_by = {}
+    for item in created_items:
+        call = item['callsign'].upper()
+        locator = item['locator'].upper()
+        profile_name = item['profile_name']
+        location_key = item['location_key']
+
+        if item.get('station_id'):
+            candidates = {str(item['station_id']): profile_name}
+        else:
+            candidates = (new_by_key.get((call, locator, profile_name))
+                          or new_by_prefix.get((call, locator[:4], profile_name))
+                          or all_by_key.get((call, locator, profile_name))
+                          or {})
+
+        if not candidates:
+            log(f"  -> FEHLER: Keine ID für {call}@{locator} ({profile_name}) gefunden.")
+            found_ids[location_key] = "UNKLARE ID"
+            continue
+
+        if len(candidates) > 1:
+            log(f"  -> MEHRDEUTIG: {len(candidates)} passende Profile für {call}@{locator} ({', '.join(candidates)}).")
+            ambiguous[location_key] = dict(candidates)
+            continue
+
+        station_id = next(iter(candidates))
+        if station_id in claimed_by:
+            # Dieselbe Station passt zu mehreren Standorten -> keine der Zuordnungen ist sicher
+            log(f"  -> MEHRDEUTIG: ID {station_id} passt zu {call}@{locator} und zu {claimed_by[station_id]}.")
+            ambiguous[location_key] = dict(candidates)
+            other_key = claimed_by[station_id]
+            if other_key in found_ids:
+                ambiguous[other_key] = {found_ids.pop(other_key): profile_name}
+            continue
+
+        claimed_by[station_id] = location_key
+        log(f"  -> ID gefunden für {call}@{locator}: {station_id}")
+        found_ids[location_key] = station_id
+
+    return found_ids, ambiguous
+
+
+def apply_resolution(location, station_id, profile_name):
+    """Ordnet einen mehrdeutigen Standort der gewählten bestehenden Station zu."""
+    location['wavelog_id'] = station_id
+    location['profile_name'] = profile_name
+    location['status'] = f"Zugewiesen: ID {station_id}"
+    location['selected'] = False
+    location['is_new'] = False
+
+
+def apply_created_id(location, found_id, candidates=None):
+    """
+    Übernimmt eine nach dem Anlegen gefundene ID in die Standortdaten. Mit candidates (mehrdeutige
+    Zuordnung) wird der Standort als MEHRDEUTIG markiert und kann wie beim Abgleich aufgelöst werden.
+    """
+    location['selected'] = False
+    if candidates:
+        location['wavelog_id'] = "KONFLIKT"
+        location['conflicting_stations'] = dict(candidates)
+        location['status'] = STATUS_AMBIGUOUS
+        return
+
+    location['wavelog_id'] = found_id
+    if found_id != "UNKLARE ID":
+        location['status'] = f"ID {found_id} gefunden"
+        location['is_new'] = False
+    else:
+        location['status'] = "Anlage OK, ID unklar"
+
+
+# ----------------------------------------
+# Abschnitt: ADIF-Export
+# ----------------------------------------
+def sanitize_filename(text):
+    """Ersetzt Leerzeichen und entfernt alle ungültigen Zeichen für Dateinamen."""
+    text = text.replace(' ', '_')
+    sanitized_text = ''.join(c for c in text if c.isalnum() or c in ('_', '-'))
+    return sanitized_text
+
+
+def build_export_keys(location_data, log=_no_log, grouped_qsos=None):
+    """
+    Ordnet jedem Standort den Namen seiner Exportdatei zu (mehrdeutige Standorte werden ausgelassen).
+    Mit grouped_qsos erhalten auch die vollständigen Locatoren zusammengefasster Standorte ('grids')
+    einen Eintrag, damit der Export nach Schlüssel des einzelnen QSOs sie derselben Datei zuordnet.
+    """
+    export_key_by_location = {}
+
+    for location_key, data in location_data.items():
+
+        wavelog_id = data.get('wavelog_id')
+        profile_name = data.get('profile_name') or data.get('call', 'NA')
+        status_text = data.get('status', "Unbekannt")
+
+        if status_text.startswith('MEHRDEUTIG'):
+            log(f"  -> EXPORT ABGEBROCHEN: Standort {location_key} ist mehrdeutig und muss zuerst aufgelöst werden.")
+            continue
+
+        if location_key == UNASSIGNED_KEY:
+            export_key_raw = "UNZUGEOORDNET"
+        elif wavelog_id == "NEU":
+            export_key_raw = f"NEU_{profile_name}_{data['call']}_{data['locator']}"
+        elif wavelog_id and wavelog_id not in INVALID_WAVELOG_IDS:
+            export_key_raw = f"ID_{wavelog_id}_{profile_name}_{data['locator']}"
+        else:
+            export_key_raw = f"KEINE_ID_{profile_name}_{data['call']}_{data['locator']}"
+        if data.get('session'):
+            export_key_raw += f"_A{data['session']}"
+
+        export_key_by_location[location_key] = sanitize_filename(export_key_raw)
+
+    # Aufgeteilte Standorte: Der Schlüssel des einzelnen QSOs führt zu einem SessionRoute
+    routes = {}
+    for location_key, group in (grouped_qsos or {}).items():
+        if 'session' not in group:
+            continue
+        session = group['session']
+        route = routes.get(session['base'])
+        if route is None:
+            route = routes[session['base']] = SessionRoute(session['boundaries'], [None] * (len(session['boundaries']) + 1))
+        route.export_keys[session['index'] - 1] = export_key_by_location.get(location_key)
+
+    for location_key, group in (grouped_qsos or {}).items():
+        if 'session' in group:
+            base_key = group['session']['base']
+            export_key = routes[base_key]
+        else:
+            base_key = location_key
+            export_key = export_key_by_location.get(location_key)
+        if export_key is None:
+            continue
+        export_key_by_location.setdefault(base_key, export_key)
+        call = location_key.split('|', 1)[0]
+        for locator in group.get('grids', ()):
+            export_key_by_location.setdefault(f"{call}|{locator}", export_key)
+
+    return export_key_by_location
+
+
+# ----------------------------------------
+# KLASSE: QSOStore
+# ----------------------------------------
+class QSOStore:
+    """
+    Kompakter, verlustfreier Speicher für QSOs (statt einem dict pro QSO).
+    Jede Feldkombination (Layout) wird einmal als Tupel von Feldnamen abgelegt,
+    pro QSO werden nur die Layout-Nummer und ein Tupel der Werte gespeichert.
+    Kurze, häufig wiederkehrende Werte (Band, Mode, Rufzeichen, ...) werden interniert.
+    """
+    INTERN_MAX_LENGTH = 16
+
+    def __init__(self):
+        self.layouts = []             # Layout-Nummer -> Tupel der Feldnamen
+        self._layout_ids = {}         # Tupel der Feldnamen -> Layout-Nummer
+        self._field_positions = []    # Layout-Nummer -> {Feldname: Position}
+        self._export_plans = {}       # Layout-Nummer -> (sortierte Feldnamen, Positionen)
+        self.row_layouts = array('I')
+        self.rows = []
+
+
+    def __len__(self):
+        return len(self.rows)
+
+
+    def append(self, qso):
+        """Legt ein QSO ab und gibt seine Zeilennummer zurück."""
+        fields = tuple(qso)
+        layout_id = self._layout_ids.get(fields)
+        if layout_id is None:
+            layout_id = len(self.layouts)
+            fields = tuple(sys.intern(name) for name in fields)
+            self.layouts.append(fields)
+            self._layout_ids[fields] = layout_id
+            self._field_positions.append({name: index for index, name in enumerate(fields)})
+
+        max_length = self.INTERN_MAX_LENGTH
+        values = tuple(sys.intern(value) if len(value) <= max_length else value for value in qso.values())
+
+        self.row_layouts.append(layout_id)
+        self.rows.append(values)
+        return len(self.rows) - 1
+
+
+    def get(self, row, field, default=''):
+        position = self._field_positions[self.row_layouts[row]].get(field)
+        return default if position is None else self.rows[row][position]
+
+
+    def record(self, row):
+        """Gibt das QSO einer Zeile als dict zurück (nur für Einzelzugriffe gedacht)."""
+        return dict(zip(self.layouts[self.row_layouts[row]], self.rows[row]))
+
+
+    def export_fields(self, row):
+        """
+        Liefert (sortierte Feldnamen, Werte) für den Export einer Zeile, ohne ein dict aufzubauen.
+        OPERATOR wird wie beim Export aus dem Stream aus STATION_CALLSIGN gesetzt.
+        """
+        layout_id = self.row_layouts[row]
+        plan = self._export_plans.get(layout_id)
+        if plan is None:
+            positions = self._field_positions[layout_id]
+            field_order = tuple(sorted(set(positions) | {'OPERATOR'}))
+            # Position None steht für das abgeleitete Feld OPERATOR
+            plan = (field_order, tuple(None if name == 'OPERATOR' else positions[name] for name in field_order),
+                    positions.get('STATION_CALLSIGN'))
+            self._export_plans[layout_id] = plan
+
+        field_order, value_positions, call_position = plan
+        values = self.rows[row]
+        operator = values[call_position].split('|')[0] if call_position is not None else ''
+        return field_order, [operator if position is None else values[position] for position in value_positions]
+
+# ----------------------------------------
+# ENDE KLASSE QSOStore
+# ----------------------------------------
+
+
+# ----------------------------------------
+# KLASSE: ADIFWriter
+# ----------------------------------------
+class ADIFWriter:
+    """
+    Schreibt QSOs direkt in einen gepufferten Datei-Handle (kein Aufbau der Datei im Speicher).
+    Die sortierte Feldreihenfolge wird pro Feldkombination nur einmal berechnet,
+    jeder Datensatz wird mit einem einzigen join erzeugt.
+    Mit compression wird zunächst unkomprimiert in eine Teildatei (.part) geschrieben, die finish()
+    in einem Zug komprimiert: Ein zwischendurch geschlossener Handle (LRU in export_adif) würde
+    sonst beim Anhängen ein weiteres gz/bz2/xz-Member beginnen.
+    """
+    BUFFER_SIZE = 256 * 1024
+
+    HEADER = (
+        "ADIF-EXPORTIERT MIT WAVELOGSTATIONCREATOR\r\n"
+        f"<PROGRAMID:{len('WavelogStationCreator')}>WavelogStationCreator "
+        f"<PROGRAMVERSION:{len('1.0')}>1.0\r\n\r\n"
+    )
+
+    # Feldkombination (Reihenfolge wie im QSO) -> sortierte Feldnamen, von allen Writern geteilt
+    _field_order_cache = {}
+
+    def __init__(self, filename, compression=None):
+        self.filename = filename
+        self.compression = compression if compression in COMPRESSION_OPENERS else None
+        self.record_count = 0
+        self._file = None
+        self._started = False
+        self._write_name = f"{filename}.part" if self.compression else filename
+
+
+    def open(self):
+        """Öffnet die Datei. Beim ersten Mal wird sie neu angelegt, danach wird angehängt."""
+        if self._file is None:
+            mode = 'a' if self._started else 'w'
+            self._file = open(self._write_name, mode, encoding='utf-8', buffering=self.BUFFER_SIZE)
+            if not self._started:
+                self._file.write(self.HEADER)
+                self._started = True
+        return self
+
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+    def finish(self):
+        """Schreibt das Dateiende (<EOT>) und schließt die Datei (komprimiert ggf. die Teildatei in einem Stream)."""
+        self.open()
+        self._file.write("<EOT>\r\n")
+        self.close()
+        if self.compression:
+            try:
+                with open(self._write_name, 'rb') as source, \
+                        open_export_file(self.filename, 'wb', self.compression, buffering=self.BUFFER_SIZE) as out:
+                    shutil.copyfileobj(source, out, self.BUFFER_SIZE)
+            finally:
+                self.discard()
+
+
+    def discard(self):
+        """Schließt die Datei und entfernt eine noch vorhandene Teildatei (z.B. nach einem Schreibfehler)."""
+        self.close()
+        if self.compression and os.path.exists(self._write_name):
+            os.remove(self._write_name)
+
+
+    @classmethod
+    def field_order(cls, qso):
+        keys = tuple(qso)
+        order = cls._field_order_cache.get(keys)
+        if order is None:
+            order = tuple(sorted(keys))
+            cls._field_order_cache[keys] = order
+        return order
+
+
+    @staticmethod
+    def format_record(qso, field_order):
+        """Erzeugt den Text eines Datensatzes. Leere Felder entfallen, Werte werden getrimmt und in Großbuchstaben geschrieben."""
+        return ADIFWriter.format_values(field_order, map(qso.__getitem__, field_order))
+
+
+    @staticmethod
+    def format_values(field_order, values):
+        """Wie format_record, aber mit den Werten in der Reihenfolge von field_order."""
+        parts = []
+        for key, value in zip(field_order, values):
+            if value is None:
+                continue
+            content = str(value).strip()
+            if content:
+                content = content.upper()
+                parts.append(f"<{key}:{len(content)}>{content} ")
+        parts.append("<EOR>\r\n")
+        return "".join(parts)
+
+
+    def write_record(self, qso):
+        self._file.write(self.format_record(qso, self.field_order(qso)))
+        self.record_count += 1
+
+
+    def write_values(self, field_order, values):
+        self._file.write(self.format_values(field_order, values))
+        self.record_count += 1
+
+# ----------------------------------------
+# ENDE KLASSE ADIFWriter
+# ----------------------------------------
+
+
+def export_adif(qso_iter, export_dir, export_key_by_location, log=_no_log, compression=None):
+    """
+    Schreibt die Exportdateien (MANUELLE ADIF-GENERIERUNG) in einem Durchlauf über die QSOs.
+    compression: 'gz', 'bz2' oder 'xz' für komprimierte Exportdateien.
+    Gibt die Anzahl der erstellten Dateien zurück.
+    """
+    MAX_OPEN_EXPORT_FILES = 64
+    writers = {}                # export_key -> ADIFWriter
+    open_writers = OrderedDict()  # export_key -> ADIFWriter mit offenem Handle (LRU, begrenzt offene Handles)
+    failed_keys = set()
+
+    def get_writer(export_key):
+        writer = open_writers.get(export_key)
+        if writer is not None:
+            open_writers.move_to_end(export_key)
+            return writer
+
+        if len(open_writers) >= MAX_OPEN_EXPORT_FILES:
+            _, oldest = open_writers.popitem(last=False)
+            oldest.close()
+
+        writer = writers.get(export_key)
+        if writer is None:
+            filename = export_file_name(export_dir, export_key, compression)
+            log(f"  -> VERSUCHE ZU SCHREIBEN (Manuell): {filename}")
+            writer = writers[export_key] = ADIFWriter(filename, compression)
+
+        open_writers[export_key] = writer.open()
+        return writer
+
+    try:
+        for qso in qso_iter:
+            export_key = export_key_by_location.get(get_location_key(qso))
+            if export_key.__class__ is SessionRoute:
+                export_key = export_key.select(qso)
+            if export_key is None or export_key in failed_keys:
+                continue
+
+            qso['OPERATOR'] = qso.get('STATION_CALLSIGN', '').split('|')[0]
+
+            try:
+                get_writer(export_key).write_record(qso)
+            except Exception as e:
+                failed_keys.add(export_key)
+                log(f"  -> FEHLER beim manuellen Schreiben von {export_key}: {e}")
+
+    except OSError as e:
+        log(f"  -> FEHLER beim Lesen der ADIF-Datei: {e}")
+    finally:
+        for writer in open_writers.values():
+            writer.close()
+
+    # Dateien abschließen
+    exported_files_count = 0
+
+    for export_key, writer in writers.items():
+        if export_key in failed_keys:
+            writer.discard()
+            continue
+
+        try:
+            writer.finish()
+            log(f"  -> ERFOLG: {writer.record_count} QSOs geschrieben in: {os.path.basename(writer.filename)}")
+            exported_files_count += 1
+
+        except Exception as e:
+            log(f"  -> FEHLER beim manuellen Schreiben von {os.path.basename(writer.filename)}: {e}")
+
+    log(f"\nADIF-Export abgeschlossen. {exported_files_count} Dateien erstellt.")
+    return exported_files_count
+
+
+def export_adif_store(store, grouped_qsos, export_dir, export_key_by_location, log=_no_log, progress=None,
+                      compression=None):
+    """
+    Schreibt die Exportdateien aus einem QSOStore anhand der Zeilennummern der Gruppen
+    (die ADIF-Datei wird nicht erneut gelesen). Das Ergebnis ist identisch zu export_adif.
+    """
+    # Mehrere Standorte können in dieselbe Datei gehen -> Zeilen in Dateireihenfolge zusammenführen
+    rows_by_export_key = {}
+    for location_key, group in grouped_qsos.items():
+        export_key = export_key_by_location.get(location_key)
+        if export_key is not None:
+            rows_by_export_key.setdefault(export_key, []).append(group['rows'])
+
+    total_rows = sum(len(rows) for row_lists in rows_by_export_key.values() for rows in row_lists)
+    written_rows = 0
+    exported_files_count = 0
+
+    for export_key, row_lists in rows_by_export_key.items():
+        filename = export_file_name(export_dir, export_key, compression)
+        log(f"  -> VERSUCHE ZU SCHREIBEN (Manuell): {filename}")
+        writer = ADIFWriter(filename, compression)
+
+        try:
+            writer.open()
+            for row in (row_lists[0] if len(row_lists) == 1 else heapq.merge(*row_lists)):
+                writer.write_values(*store.export_fields(row))
+            writer.finish()
+            log(f"  -> ERFOLG: {writer.record_count} QSOs geschrieben in: {os.path.basename(filename)}")
+            exported_files_count += 1
+        except OSError as e:
+            writer.discard()
+            log(f"  -> FEHLER beim manuellen Schreiben von {os.path.basename(filename)}: {e}")
+
+        written_rows += writer.record_count
+        if progress is not None:
+            progress(written_rows, total_rows, "Exportiere")
+
+    log(f"\nADIF-Export abgeschlossen. {exported_files_count} Dateien erstellt.")
+    return exported_files_count
+
+
+def export_adif_raw(file_path, grouped_qsos, export_dir, export_key_by_location, log=_no_log, progress=None,
+                    compression=None):
+    """
+    Schreibt die Exportdateien, indem die Datensätze anhand der Bytebereiche aus iter_adif_spans
+    unverändert aus der (per mmap eingeblendeten) Datei kopiert werden. Es wird nichts neu
+    serialisiert: Die Felder bleiben wie im Original (kein OPERATOR, keine Großschreibung).
+    """
+    return export_adif_raw_sources([(file_path, grouped_qsos)], export_dir, export_key_by_location, log, progress,
+                                   compression)
+
+
+def export_adif_raw_sources(sources, export_dir, export_key_by_location, log=_no_log, progress=None,
+                            compression=None):
+    """
+    Wie export_adif_raw für mehrere Quelldateien: sources ist eine Liste von (datei, gruppierung).
+    Die Datensätze einer Exportdatei werden in der Reihenfolge der Quellen und innerhalb jeder
+    Quelle in Dateireihenfolge geschrieben.
+    """
+    # export_key -> [(Quellindex, [Bytebereiche pro Standort]), ...]
+    spans_by_export_key = {}
+    total_records = 0
+    for source_index, (file_path, grouped_qsos) in enumerate(sources):
+        for location_key, group in grouped_qsos.items():
+            export_key = export_key_by_location.get(location_key)
+            if export_key is None:
+                continue
+            source_spans = spans_by_export_key.setdefault(export_key, [])
+            if not source_spans or source_spans[-1][0] != source_index:
+                source_spans.append((source_index, []))
+            source_spans[-1][1].append(zip(group['offsets'], group['lengths']))
+            total_records += group['count']
+
+    written_records = 0
+    exported_files_count = 0
+    header = ADIFWriter.HEADER.encode('utf-8')
+
+    if not spans_by_export_key:
+        log("\nADIF-Export abgeschlossen. 0 Dateien erstellt.")
+        return 0
+
+    mapped = {}
+    try:
+        for source_index, (file_path, grouped_qsos) in enumerate(sources):
+            if grouped_qsos:
+                with open(file_path, 'rb') as f:
+                    mapped[source_index] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        for export_key, source_spans in spans_by_export_key.items():
+            filename = export_file_name(export_dir, export_key, compression)
+            log(f"  -> VERSUCHE ZU SCHREIBEN (Rohkopie): {filename}")
+            record_count = 0
+
+            try:
+                with open_export_file(filename, 'wb', compression, buffering=ADIFWriter.BUFFER_SIZE) as out:
+                    out.write(header)
+                    for source_index, span_lists in source_spans:
+                        mm = mapped[source_index]
+                        # Mehrere Standorte in einer Datei -> Datensätze in Dateireihenfolge zusammenführen
+                        for offset, length in (span_lists[0] if len(span_lists) == 1 else heapq.merge(*span_lists)):
+                            out.write(mm[offset:offset + length])
+                            out.write(b"\r\n")
+                            record_count += 1
+                    out.write(b"<EOT>\r\n")
+                log(f"  -> ERFOLG: {record_count} QSOs geschrieben in: {os.path.basename(filename)}")
+                exported_files_count += 1
+            except OSError as e:
+                log(f"  -> FEHLER beim Schreiben von {os.path.basename(filename)}: {e}")
+
+            written_records += record_count
+            if progress is not None:
+                progress(written_records, total_records, "Exportiere")
+    finally:
+        for mm in mapped.values():
+            mm.close()
+
+    log(f"\nADIF-Export abgeschlossen. {exported_files_count} Dateien erstellt.")
+    return exported_files_count
+
+
+# ----------------------------------------
+# Abschnitt: Paralleler ADIF-Export
+# ----------------------------------------
+class _RangeReader:
+    """Begrenzt einen binären Datei-Handle auf den Bytebereich [start, end)."""
+
+    def __init__(self, file_handle, start, end):
+        self.file_handle = file_handle
+        self.remaining = end - start
+        file_handle.seek(start)
+
+
+    def read(self, size):
+        if self.remaining <= 0:
+            return b""
+        data = self.file_handle.read(min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+
+def find_record_boundaries(file_path, parts):
+    """
+    Teilt die Datei in bis zu parts etwa gleich große Bytebereiche auf,
+    die jeweils direkt hinter einem <EOR> beginnen. Gibt eine Liste von (start, ende) zurück.
+    Gesucht wird ohne Kenntnis der Feldlängen: Steht '<EOR>' als Text in einem Wert, liegt die Grenze
+    mitten im Datensatz. export_adif_parallel prüft die Grenzen daher anhand der Ergebnisse der Bereiche.
+    """
+    SCAN_SIZE = 64 * 1024
+    total_size = os.path.getsize(file_path)
+    boundaries = [0]
+
+    with open(file_path, 'rb') as f:
+        for part in range(1, parts):
+            position = max(total_size * part // parts, boundaries[-1])
+            f.seek(position)
+            tail = b""
+
+            while True:
+                chunk = f.read(SCAN_SIZE)
+                if not chunk:
+                    position = total_size
+                    break
+                data = (tail + chunk).lower()
+                index = data.find(b'<eor>')
+                if index != -1:
+                    position = position - len(tail) + index + len('<eor>')
+                    break
+                # Die letzten Bytes behalten, falls <EOR> über die Blockgrenze geht
+                tail = chunk[-4:]
+                position += len(chunk)
+
+            if position > boundaries[-1]:
+                boundaries.append(position)
+
+    if boundaries[-1] < total_size:
+        boundaries.append(total_size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _export_range(file_path, start, end, fragment_dir, range_index, export_key_by_location):
+    """
+    Worker-Prozess: Liest einen Bytebereich der ADIF-Datei und schreibt die Datensätze
+    als Fragmente (ohne Header/EOT) pro Exportdatei. Gibt ({export_key: anzahl}, ende des letzten
+    Datensatzes) zurück; das Ende stimmt nur dann mit end überein, wenn der Bereich an einem echten
+    <EOR> endet (und nicht an Tag-Text in einem Wert).
+    """
+    fragments = {}
+    counts = {}
+
+    try:
+        with open(file_path, 'rb') as f:
+            reader = ADIFStreamReader(_RangeReader(f, start, end), start_offset=start)
+            for qso in reader:
+                export_key = export_key_by_location.get(get_location_key(qso))
+                if export_key.__class__ is SessionRoute:
+                    export_key = export_key.select(qso)
+                if export_key is None:
+                    continue
+
+                qso['OPERATOR'] = qso.get('STATION_CALLSIGN', '').split('|')[0]
+
+                fragment = fragments.get(export_key)
+                if fragment is None:
+                    fragment_name = os.path.join(fragment_dir, f"{export_key}.{range_index:05d}.part")
+                    fragment = fragments[export_key] = open(fragment_name, 'w', encoding='utf-8', buffering=ADIFWriter.BUFFER_SIZE)
+                    counts[export_key] = 0
+
+                fragment.write(ADIFWriter.format_record(qso, ADIFWriter.field_order(qso)))
+                counts[export_key] += 1
+    finally:
+        for fragment in fragments.values():
+            fragment.close()
+
+    return counts, reader.end_offset
+
+
+def export_adif_parallel(file_path, export_dir, export_key_by_location, workers,
+                         log=_no_log, progress=None, compression=None):
+    """
+    Exportiert wie export_adif, verteilt die Arbeit aber auf mehrere Prozesse: Die Datei wird
+    an Datensatzgrenzen in gleich große Bereiche geteilt, jeder Prozess parst und serialisiert
+    seinen Bereich. Die Fragmente werden danach in Dateireihenfolge zusammengefügt, sodass die
+    Exportdateien byte-identisch zum seriellen Export sind. Komprimierte Eingabedateien
+    lassen sich nicht aufteilen und werden seriell exportiert.
+    Jeder Bereich wird ab seinem Beginn mit Feldlängen geparst; endet ein Bereich nicht genau an einem
+    echten <EOR> (Grenze in einem Wert gefunden), wird seriell exportiert, statt Datensätze zu verlieren.
+    """
+    MIN_BYTES_PER_WORKER = 4 * 1024 * 1024
+
+    total_size = os.path.getsize(file_path)
+    workers = max(1, min(workers, total_size // MIN_BYTES_PER_WORKER))
+
+    if workers <= 1 or get_compression(file_path):
+        return export_adif(iter_adif_file(file_path, progress=progress, progress_text="Exportiere"),
+                           export_dir, export_key_by_location, log, compression)
+
+    ranges = find_record_boundaries(file_path, workers)
+    log(f"  -> Paralleler Export mit {workers} Prozessen in {len(ranges)} Bereichen.")
+
+    fragment_dir = tempfile.mkdtemp(prefix=".export_", dir=export_dir)
+    try:
+        range_counts = [None] * len(ranges)
+        range_ends = [None] * len(ranges)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_export_range, file_path, start, end, fragment_dir, index, export_key_by_location): index
+                for index, (start, end) in enumerate(ranges)
+            }
+
+            done_count = 0
+            for future in as_completed(futures):
+                range_counts[futures[future]], range_ends[futures[future]] = future.result()
+                done_count += 1
+                if progress:
+                    try:
+                        progress(done_count, len(ranges), f"Exportiere: Bereich {done_count}/{len(ranges)}")
+                    except JobCancelled:
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+
+        # Bereich 0 beginnt am Dateianfang; endet jeder Bereich an einem echten <EOR>, beginnt auch
+        # der nächste an einer echten Datensatzgrenze
+        if any(range_ends[index] != end for index, (_start, end) in enumerate(ranges[:-1])):
+            log("  -> HINWEIS: Bereichsgrenze liegt in einem Feldwert ('<EOR>' als Text), exportiere seriell.")
+            return export_adif(iter_adif_file(file_path, progress=progress, progress_text="Exportiere"),
+                               export_dir, export_key_by_location, log, compression)
+
+        # Fragmente pro Exportdatei in Dateireihenfolge zusammenfügen
+        total_counts = {}
+        for counts in range_counts:
+            for export_key, count in counts.items():
+                total_counts[export_key] = total_counts.get(export_key, 0) + count
+
+        exported_files_count = 0
+        for export_key, count in total_counts.items():
+            filename = export_file_name(export_dir, export_key, compression)
+            try:
+                log(f"  -> VERSUCHE ZU SCHREIBEN (Manuell): {filename}")
+                # Ein einziger (ggf. komprimierter) Stream pro Datei; Kopf und Ende über einen Text-Wrapper,
+                # damit sie genauso kodiert werden wie beim seriellen Export
+                with open_export_file(filename, 'wb', compression, buffering=ADIFWriter.BUFFER_SIZE) as out:
+                    text = io.TextIOWrapper(out, encoding='utf-8', write_through=True)
+                    text.write(ADIFWriter.HEADER)
+                    text.flush()
+                    for index, counts in enumerate(range_counts):
+                        if export_key in counts:
+                            fragment_name = os.path.join(fragment_dir, f"{export_key}.{index:05d}.part")
+                            with open(fragment_name, 'rb') as fragment:
+                                shutil.copyfileobj(fragment, out, ADIFWriter.BUFFER_SIZE)
+                    text.write("<EOT>\r\n")
+                    text.flush()
+                    text.detach()
+
+                log(f"  -> ERFOLG: {count} QSOs geschrieben in: {os.path.basename(filename)}")
+                exported_files_count += 1
+
+            except Exception as e:
+                log(f"  -> FEHLER beim manuellen Schreiben von {os.path.basename(filename)}: {e}")
+
+    finally:
+        shutil.rmtree(fragment_dir, ignore_errors=True)
+
+    log(f"\nADIF-Export abgeschlossen. {exported_files_count} Dateien erstellt.")
+    return exported_files_count
+
+
+# ----------------------------------------
+# Abschnitt: Mehrere ADIF-Dateien
+# ----------------------------------------
+def collect_adif_files(paths):
+    """
+    Erweitert eine Liste von Dateien und Verzeichnissen zu einer sortierten Liste von ADIF-Dateien.
+    Verzeichnisse werden rekursiv nach *.adi/*.adif (auch komprimiert) durchsucht, doppelte Angaben entfallen.
+    """
+    files = []
+    seen = set()
+
+    def add(file_path):
+        file_path = os.path.abspath(file_path)
+        if file_path not in seen:
+            seen.add(file_path)
+            files.append(file_path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for directory, _, names in os.walk(path):
+                found.extend(os.path.join(directory, name) for name in names if is_adif_file_name(name))
+            for file_path in sorted(found):
+                add(file_path)
+        else:
+            add(path)
+
+    return files
+
+
+def _group_adif_file(file_path, with_spans, grid_precision=0, session_times=False):
+    """Worker-Prozess: Gruppiert eine einzelne ADIF-Datei. Gibt (gruppierung, ende des letzten Datensatzes) zurück."""
+    position = {}
+    if with_spans:
+        grouped_qsos = group_qsos(iter_adif_spans(file_path, position=position, with_time=session_times),
+                                  with_spans=True, grid_precision=grid_precision, session_times=session_times)
+    else:
+        grouped_qsos = group_qsos(iter_adif_file(file_path, position=position), grid_precision=grid_precision,
+                                  session_times=session_times)
+    return grouped_qsos, position.get('end_offset', 0)
+
+
+def group_adif_files(file_paths, workers=DEFAULT_IMPORT_WORKERS, with_spans=False, log=_no_log, progress=None,
+                     grid_precision=0, session_times=False):
+    """
+    Gruppiert mehrere ADIF-Dateien parallel (ein Prozess pro Datei, höchstens workers gleichzeitig).
+    Gibt {datei: gruppierung} in der Reihenfolge von file_paths zurück; zusammengeführt wird mit merge_file_groups.
+    Löst progress JobCancelled aus, werden noch nicht gestartete Dateien verworfen.
+    """
+    workers = max(1, min(workers, len(file_paths)))
+    log(f"  -> Lese {len(file_paths)} ADIF-Dateien mit {workers} Prozess(en)...")
+
+    if with_spans and any(get_compression(file_path) for file_path in file_paths):
+        # Bytebereiche gibt es nur in unkomprimierten Dateien
+        log("  -> HINWEIS: Komprimierte Dateien enthalten, Rohkopie beim Export ist nicht möglich.")
+        with_spans = False
+
+    results = {}
+    if workers == 1:
+        for done_count, file_path in enumerate(file_paths, 1):
+            results[file_path] = _group_adif_file(file_path, with_spans, grid_precision, session_times)[0]
+            if progress:
+                progress(done_count, len(file_paths), f"Analysiere: Datei {done_count}/{len(file_paths)}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_group_adif_file, file_path, with_spans, grid_precision, session_times): file_path
+                       for file_path in file_paths}
+
+            done_count = 0
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()[0]
+                done_count += 1
+                if progress:
+                    try:
+                        progress(done_count, len(file_paths), f"Analysiere: Datei {done_count}/{len(file_paths)}")
+                    except JobCancelled:
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+
+    grouped_by_file = {file_path: results[file_path] for file_path in file_paths}
+
+    for file_path, grouped_qsos in grouped_by_file.items():
+        qso_count = sum(group['count'] for group in grouped_qsos.values())
+        log(f"  -> {os.path.basename(file_path)}: {qso_count} QSOs, {len(grouped_qsos)} Standorte")
+
+    return grouped_by_file
+
+
+def merge_file_groups(grouped_by_file, log=_no_log):
+    """
+    Führt die Gruppierungen mehrerer Dateien zu einer Gruppierung zusammen (Auszählungen aller Dateien
+    addiert, Stationsdaten als häufigster Wert). Jede Gruppe erhält unter 'sources' {datei: anzahl}.
+    Die Bytebereiche/Zeilen bleiben in den Gruppierungen der einzelnen Dateien.
+    """
+    grouped_qsos = {}
+    for file_path, file_groups in grouped_by_file.items():
+        for location_key, file_group in file_groups.items():
+            group = grouped_qsos.get(location_key)
+            if group is None:
+                group = grouped_qsos[location_key] = _new_group()
+                # Stationsdaten der ersten Datei, falls die Gruppierung keine Auszählung enthält
+                group.update(dxcc=file_group['dxcc'], cqz=file_group['cqz'], ituz=file_group['ituz'], sources={})
+            group['count'] += file_group['count']
+            group['sources'][file_path] = file_group['count']
+            _merge_consensus(group, file_group)
+            if 'times' in file_group:
+                group.setdefault('times', array('q')).extend(file_group['times'])
+                group.setdefault('qso_values', []).extend(file_group.get('qso_values', ()))
+
+    for group in grouped_qsos.values():
+        if any(group[f'{field}_counts'] for field, _adif_field in CONSENSUS_FIELDS):
+            _apply_consensus(group)
+
+    total_count = sum(group['count'] for group in grouped_qsos.values())
+    unassigned_count = grouped_qsos[UNASSIGNED_KEY]['count'] if UNASSIGNED_KEY in grouped_qsos else 0
+    log(f"Erfolgreich {total_count} QSOs aus {len(grouped_by_file)} Dateien eingelesen.")
+    log(f"Gesamtanzahl eindeutiger Standorte gefunden: {len(grouped_qsos) - (1 if UNASSIGNED_KEY in grouped_qsos else 0)}")
+    if unassigned_count > 0:
+        log(f"WARNUNG: {unassigned_count} QSOs fehlen wichtige Felder.")
+
+    return grouped_qsos
+
+
+def source_export_keys(export_key_by_location, file_path):
+    """Hängt den Namen der Quelldatei an die Exportdateinamen an (getrennter Export pro Quelldatei)."""
+    name = os.path.basename(file_path)
+    if get_compression(name):
+        name = os.path.splitext(name)[0]
+    suffix = sanitize_filename(os.path.splitext(name)[0])
+    return {location_key: export_key.with_suffix(suffix) if isinstance(export_key, SessionRoute) else f"{export_key}_{suffix}"
+            for location_key, export_key in export_key_by_location.items()}
+
+
+def export_adif_batch(grouped_by_file, export_dir, export_key_by_location, separate_files=False,
+                      raw_copy=False, workers=DEFAULT_EXPORT_WORKERS, log=_no_log, progress=None, compression=None):
+    """
+    Exportiert die QSOs mehrerer Quelldateien. Ohne separate_files landen die QSOs eines Standorts
+    aus allen Dateien in einer Exportdatei (in der Reihenfolge der Dateien), mit separate_files
+    wird pro Quelldatei eine eigene Exportdatei geschrieben (Dateiname mit Namen der Quelle).
+    raw_copy: Datensätze unverändert kopieren (nur wenn die Gruppierungen Bytebereiche enthalten).
+    """
+    file_paths = list(grouped_by_file)
+    raw_copy = raw_copy and all('offsets' in group for grouped_qsos in grouped_by_file.values()
+                                for group in grouped_qsos.values())
+
+    if separate_files:
+        exported_files_count = 0
+        for file_path in file_paths:
+            log(f"\n-> Exportiere {os.path.basename(file_path)}")
+            keys = source_export_keys(export_key_by_location, file_path)
+            if raw_copy:
+                exported_files_count += export_adif_raw(file_path, grouped_by_file[file_path], export_dir, keys,
+                                                        log, progress, compression)
+            else:
+                exported_files_count += export_adif_parallel(file_path, export_dir, keys, workers,
+                                                             log, progress, compression)
+        return exported_files_count
+
+    if raw_copy:
+        return export_adif_raw_sources(list(grouped_by_file.items()), export_dir, export_key_by_location,
+                                       log, progress, compression)
+
+    def iter_all_files():
+        for file_path in file_paths:
+            yield from iter_adif_file(file_path, progress=progress, progress_text=f"Exportiere {os.path.basename(file_path)}")
+
+    return export_adif(iter_all_files(), export_dir, export_key_by_location, log, compression)
+
+
+# ----------------------------------------
+# KLASSE: ProjectWorkspace
+# ----------------------------------------
+class ProjectWorkspace:
+    """
+    Persistenter Arbeitsbereich (SQLite) einer Sitzung: Gruppierung inkl. QSO-Verweisen (Bytebereiche,
+    Quelldateien), Standortdaten mit allen Änderungen und Anlegestatus, gewählte Dateien, Stand der
+    inkrementellen Verarbeitung und die zuletzt geladene Stationsliste. Eine Sitzung lässt sich damit
+    ohne erneutes Einlesen und ohne API-Abruf fortsetzen. Einzelne Standorte werden bei jeder
+    Änderung sofort geschrieben, damit nach einem Absturz nichts verloren geht.
+    """
+    SCHEMA_VERSION = 1
+
+    # Felder der Standortdaten mit eigener Spalte, alle weiteren landen als JSON in 'extra'
+    LOCATION_FIELDS = ('call', 'locator', 'qso_count', 'profile_name', 'status', 'selected', 'wavelog_id',
+                       'is_new', 'conflicting_stations', 'dxcc', 'cqz', 'ituz')
+    GROUP_FIELDS = ('count', 'dxcc', 'cqz', 'ituz', 'sources', 'offsets', 'lengths', 'rows', 'times', 'qso_values')
+
+    # Die Datei des gemeinsamen Ergebnisses (grouped_qsos), Gruppierungen einzelner Dateien stehen unter ihrem Pfad
+    MERGED = ''
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+
+    @staticmethod
+    def default_path(config_file, path=""):
+        """path bzw. workspace.sqlite im Verzeichnis der Konfigurationsdatei."""
+        return path or os.path.join(os.path.dirname(os.path.abspath(config_file)), WORKSPACE_FILE_NAME)
+
+
+    @classmethod
+    def for_config(cls, config_file, path=""):
+        return cls(cls.default_path(config_file, path))
+
+
+    def _create_schema(self):
+        with self._lock, self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS groups (
+                    file_path TEXT NOT NULL,
+                    location_key TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    dxcc TEXT, cqz TEXT, ituz TEXT,
+                    sources TEXT,
+                    offsets BLOB,
+                    lengths BLOB,
+                    extra TEXT,
+                    PRIMARY KEY (file_path, location_key)
+                );
+                CREATE TABLE IF NOT EXISTS locations (
+                    location_key TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    call TEXT, locator TEXT,
+                    qso_count INTEGER,
+                    profile_name TEXT,
+                    status TEXT,
+                    selected INTEGER,
+                    wavelog_id TEXT,
+                    is_new INTEGER,
+                    conflicting_stations TEXT,
+                    dxcc TEXT, cqz TEXT, ituz TEXT,
+                    extra TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_locations_call_locator ON locations (call, locator);
+                CREATE INDEX IF NOT EXISTS idx_locations_wavelog_id ON locations (wavelog_id);
+            """)
+            self.connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+                                    (json.dumps(self.SCHEMA_VERSION),))
+
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+
+    # --- Meta-Daten ---
+
+    def _set_meta(self, key, value):
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+
+    def set_meta(self, key, value):
+        with self._lock, self.connection:
+            self._set_meta(key, value)
+
+
+    # --- Standorte ---
+
+    @classmethod
+    def _location_row(cls, location_key, position, data):
+        extra = {field: value for field, value in data.items() if field not in cls.LOCATION_FIELDS}
+        return (
+            location_key, position, data['call'], data['locator'], data['qso_count'], data['profile_name'],
+            data['status'], int(bool(data['selected'])), str(data['wavelog_id']), int(bool(data['is_new'])),
+            json.dumps(data['conflicting_stations']), data['dxcc'], data['cqz'], data['ituz'],
+            json.dumps(extra) if extra else None
+        )
+
+
+    def _write_locations(self, rows):
+        self.connection.executemany("""
+            INSERT OR REPLACE INTO locations (location_key, position, call, locator, qso_count, profile_name, status,
+                selected, wavelog_id, is_new, conflicting_stations, dxcc, cqz, ituz, extra)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+    def update_locations(self, location_data, location_keys):
+        """Schreibt einzelne (geänderte) Standorte, neue Standorte werden hinten angefügt."""
+        location_keys = list(location_keys)
+        if not location_keys:
+            return
+        with self._lock, self.connection:
+            positions = dict(self.connection.execute("SELECT location_key, position FROM locations WHERE location_key IN (%s)"
+                                                     % ",".join("?" * len(location_keys)), location_keys))
+            next_position = self.connection.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM locations").fetchone()[0]
+            rows = []
+            for location_key in location_keys:
+                position = positions.get(location_key)
+                if position is None:
+                    position, next_position = next_position, next_position + 1
+                rows.append(self._location_row(location_key, position, location_data[location_key]))
+            self._write_locations(rows)
+
+
+    def update_location(self, location_key, data):
+        self.update_locations({location_key: data}, [location_key])
+
+
+    def find_locations(self, call=None, locator=None, wavelog_id=None):
+        """Schlüssel der Standorte mit passendem Rufzeichen/Locator bzw. Wavelog-ID (über die Indizes)."""
+        conditions, params = [], []
+        for column, value in (('call', call), ('locator', locator), ('wavelog_id', wavelog_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value).upper() if column != 'wavelog_id' else str(value))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        with self._lock:
+            return [row[0] for row in self.connection.execute(f"SELECT location_key FROM locations{where} ORDER BY position", params)]
+
+
+    def restore_resolutions(self, location_data, log=_no_log):
+        """
+        Übernimmt manuell aufgelöste Mehrdeutigkeiten der gespeicherten Sitzung in neu abgeglichene
+        Standortdaten (vor save_session aufrufen, das den bisherigen Inhalt ersetzt): Ein mehrdeutiger
+        Standort wird der Station zugeordnet, wenn genau eine seiner Kandidaten-IDs gespeichert unter
+        demselben Rufzeichen und Locator gewählt war. Aktivierungen werden nur über ihren eigenen
+        Schlüssel zugeordnet. Gibt die Schlüssel der geänderten Standorte zurück.
+        """
+        restored = []
+        for location_key, data in location_data.items():
+            candidates = data.get('conflicting_stations')
+            if data.get('status') != STATUS_AMBIGUOUS or not candidates:
+                continue
+            matches = []
+            for station_id in candidates:
+                keys = self.find_locations(data['call'], data['locator'], station_id)
+                if location_key in keys or (keys and not data.get('session')):
+                    matches.append(station_id)
+            if len(matches) != 1:
+                continue
+            apply_resolution(data, matches[0], candidates[matches[0]])
+            log(f"Mehrdeutigkeit für {location_key} aus dem Arbeitsbereich übernommen: ID {matches[0]}.")
+            restored.append(location_key)
+        return restored
+
+
+    def load_locations(self):
+        location_data = {}
+        with self._lock:
+            rows = self.connection.execute("""
+                SELECT location_key, call, locator, qso_count, profile_name, status, selected, wavelog_id, is_new,
+                       conflicting_stations, dxcc, cqz, ituz, extra
+                FROM locations ORDER BY position
+            """).fetchall()
+        for row in rows:
+            location_key = row[0]
+            data = dict(zip(self.LOCATION_FIELDS, row[1:13]))
+            data['selected'] = bool(data['selected'])
+            data['is_new'] = bool(data['is_new'])
+            data['conflicting_stations'] = json.loads(data['conflicting_stations'])
+            if row[13]:
+                data.update(json.loads(row[13]))
+            location_data[location_key] = data
+        return location_data
+
+
+    # --- Gruppierungen ---
+
+    @classmethod
+    def _group_row(cls, file_path, location_key, group):
+        extra = {field: value for field, value in group.items() if field not in cls.GROUP_FIELDS}
+        return (
+            file_path, location_key, group['count'], group['dxcc'], group['cqz'], group['ituz'],
+            json.dumps(group['sources']) if 'sources' in group else None,
+            group['offsets'].tobytes() if 'offsets' in group else None,
+            group['lengths'].tobytes() if 'lengths' in group else None,
+            json.dumps(extra) if extra else None
+        )
+
+
+    def _load_groups(self):
+        """Gibt {file_path: {location_key: gruppe}} zurück (MERGED = gemeinsames Ergebnis)."""
+        grouped = {}
+        with self._lock:
+            rows = self.connection.execute("""
+                SELECT file_path, location_key, count, dxcc, cqz, ituz, sources, offsets, lengths, extra
+                FROM groups ORDER BY rowid
+            """).fetchall()
+        for file_path, location_key, count, dxcc, cqz, ituz, sources, offsets, lengths, extra in rows:
+            group = {'count': count, 'dxcc': dxcc, 'cqz': cqz, 'ituz': ituz}
+            if sources is not None:
+                group['sources'] = json.loads(sources)
+            if offsets is not None:
+                group['offsets'] = array('Q', offsets)
+                group['lengths'] = array('I', lengths)
+            if extra:
+                group.update(json.loads(extra))
+            grouped.setdefault(file_path, {})[location_key] = group
+        return grouped
+
+
+    # --- Sitzung ---
+
+    def save_session(self, location_data, grouped_qsos=None, grouped_by_file=None, adif_file_path=None,
+                     adif_file_paths=None, processed_file=None, stations=None):
+        """
+        Schreibt die komplette Sitzung in einer Transaktion (ersetzt den bisherigen Inhalt).
+        QSO-Zeilen eines QSOStore werden nicht gespeichert (der Speicher ist nicht persistent),
+        der Export liest die QSOs nach dem Fortsetzen wieder aus der Datei.
+        """
+        group_rows = []
+        if grouped_qsos is not None:
+            group_rows.extend(self._group_row(self.MERGED, location_key, group)
+                              for location_key, group in grouped_qsos.items())
+        for file_path, file_groups in (grouped_by_file or {}).items():
+            group_rows.extend(self._group_row(file_path, location_key, group)
+                              for location_key, group in file_groups.items())
+
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM locations")
+            self.connection.execute("DELETE FROM groups")
+            self._write_locations(self._location_row(location_key, position, data)
+                                  for position, (location_key, data) in enumerate(location_data.items()))
+            self.connection.executemany("""
+                INSERT INTO groups (file_path, location_key, count, dxcc, cqz, ituz, sources, offsets, lengths, extra)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, group_rows)
+            self._set_meta('adif_file_path', adif_file_path)
+            self._set_meta('adif_file_paths', list(adif_file_paths or []))
+            self._set_meta('batch', grouped_by_file is not None)
+            self._set_meta('processed_file', None if processed_file is None else {
+                'file_path': processed_file.file_path,
+                'end_offset': processed_file.end_offset,
+                'content_hash': processed_file.content_hash
+            })
+            if stations is not None:
+                self._set_meta('stations', stations)
+            self._set_meta('saved_at', time.time())
+
+
+    def save_stations(self, stations):
+        self.set_meta('stations', stations)
+
+
+    def has_session(self):
+        with self._lock:
+            return self.connection.execute("SELECT 1 FROM locations LIMIT 1").fetchone() is not None
+
+
+    def load_session(self):
+        """
+        Lädt die gespeicherte Sitzung als Dict (location_data, grouped_qsos, grouped_by_file,
+        adif_file_path, adif_file_paths, processed_file, stations) oder None, wenn nichts gespeichert ist.
+        """
+        if not self.has_session():
+            return None
+
+        grouped = self._load_groups()
+        grouped_qsos = grouped.pop(self.MERGED, None)
+        grouped_by_file = None
+        if self.get_meta('batch', False):
+            grouped_by_file = {file_path: grouped.get(file_path, {}) for file_path in self.get_meta('adif_file_paths', [])}
+
+        processed = self.get_meta('processed_file')
+        return {
+            'location_data': self.load_locations(),
+            'grouped_qsos': grouped_qsos,
+            'grouped_by_file': grouped_by_file,
+            'adif_file_path': self.get_meta('adif_file_path'),
+            'adif_file_paths': self.get_meta('adif_file_paths', []),
+            'processed_file': None if processed is None else ProcessedFile(
+                processed['file_path'], processed['end_offset'], processed['content_hash']),
+            'stations': self.get_meta('stations'),
+            'saved_at': self.get_meta('saved_at')
+        }
+
+
+    def clear(self):
+        """Verwirft die gespeicherte Sitzung."""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM locations")
+            self.connection.execute("DELETE FROM groups")
+            self.connection.execute("DELETE FROM meta WHERE key != 'schema_version'")
+
+# ----------------------------------------
+# ENDE KLASSE ProjectWorkspace
+# ----------------------------------------
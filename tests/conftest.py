@@ -0,0 +1,40 @@
+"""Gemeinsame Hilfen für die Tests (Import der Module aus dem Projektverzeichnis, kleine ADIF-Logs)."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def adif_record(**fields):
+    """Ein ADIF-Datensatz aus Feldname=Wert (Werte als Text)."""
+    return " ".join(f"<{name}:{len(value)}>{value}" for name, value in fields.items()) + " <EOR>\n"
+
+
+@pytest.fixture
+def write_adif(tmp_path):
+    """Schreibt ein ADIF-Log aus Datensätzen (Dicts) und gibt den Pfad zurück."""
+    def write(name, records):
+        path = tmp_path / name
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write("Testlog <EOH>\n")
+            f.write("".join(adif_record(**record) for record in records))
+        return str(path)
+    return write
+
+
+def qso(call, locator, date, time_on="1200", dxcc="230", cqz="14", ituz="28", band="20m"):
+    """QSO mit den für Gruppierung und Export relevanten Feldern (leere Werte werden weggelassen)."""
+    fields = {
+        'CALL': 'DX0AA', 'QSO_DATE': date, 'TIME_ON': time_on, 'BAND': band, 'MODE': 'SSB',
+        'STATION_CALLSIGN': call, 'MY_GRIDSQUARE': locator,
+        'MY_DXCC': dxcc, 'MY_CQ_ZONE': cqz, 'MY_ITU_ZONE': ituz
+    }
+    return {name: value for name, value in fields.items() if value}
+
+
+def station(station_id, call, locator, profile_name):
+    """Stationsprofil wie in der Antwort von station_info."""
+    return {'station_id': station_id, 'station_callsign': call, 'station_gridsquare': locator,
+            'station_profile_name': profile_name}
@@ -0,0 +1,36 @@
+"""Benchmark-Harness: synthetische Logs und Messlauf gegen den Mock-Wavelog."""
+import json
+
+from benchmarks.adif_generator import generate_adif
+from benchmarks.run_benchmarks import main as run_benchmarks
+from splitter_engine import group_qsos, iter_adif_file
+
+
+def test_generator_is_reproducible(tmp_path):
+    first, second = str(tmp_path / 'a.adi'), str(tmp_path / 'b.adi')
+    generate_adif(first, 500, location_count=10, seed=3)
+    generate_adif(second, 500, location_count=10, seed=3)
+
+    assert open(first, 'rb').read() == open(second, 'rb').read()
+
+
+def test_generator_uses_the_requested_locations(tmp_path):
+    path = str(tmp_path / 'log.adi')
+    locations = generate_adif(path, 500, location_count=10, missing_ratio=0)
+    grouped_qsos = group_qsos(iter_adif_file(path))
+
+    assert sum(group['count'] for group in grouped_qsos.values()) == 500
+    assert set(grouped_qsos) == {f"{location['call']}|{location['locator'].upper()}" for location in locations}
+
+
+def test_benchmark_run_writes_all_stages(tmp_path):
+    output = tmp_path / 'bench.json'
+    run_benchmarks(['--sizes', '300', '--locations', '10', '--latency-ms', '0', '-o', str(output)])
+
+    run, = json.loads(output.read_text(encoding='utf-8'))['runs']
+    assert set(run['stages']) == {'fetch_station_info', 'group_and_process_qsos', 'check_wavelog_api_local',
+                                  'create_new_wavelog_locations', 'export_adif_files', 'total'}
+    # Die Hälfte der Standorte existiert bereits, der Rest wird über den Mock-Server angelegt
+    assert (run['existing_stations'], run['created_stations']) == (5, 5)
+    assert run['http_requests']['create_station'] > 0
+    assert run['export_files'] >= 10
@@ -0,0 +1,63 @@
+"""Komprimierte ADIF-Dateien lesen (.gz, .bz2, .xz, .zip) und Exporte als ZIP-Archiv."""
+import bz2
+import gzip
+import lzma
+import os
+import zipfile
+
+import pytest
+
+from conftest import qso
+from splitter_engine import (
+    ZIP_ARCHIVE_NAME, WavelogStationIndex, build_export_keys, build_location_data, collect_adif_files, export_adif,
+    export_target, group_qsos, iter_adif_file
+)
+
+QSOS = [qso('DL1X', 'JO31AB', '20240501'), qso('DL1X', 'JO31AB', '20240502'),
+        dict(qso('DL2Y', 'JO62QM', '20240503'), COMMENT="Jürgen")]
+
+
+def compress(path, compression):
+    data = open(path, 'rb').read()
+    target = f"{path}.{compression}"
+    if compression == 'zip':
+        with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("readme.txt", "kein ADIF")
+            archive.writestr(os.path.basename(path), data)
+    else:
+        with {'gz': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}[compression](target, 'wb') as f:
+            f.write(data)
+    return target
+
+
+@pytest.mark.parametrize('compression', ['gz', 'bz2', 'xz', 'zip'])
+def test_compressed_input_reads_the_same_qsos(write_adif, compression):
+    path = write_adif('log.adi', QSOS)
+
+    assert list(iter_adif_file(compress(path, compression))) == list(iter_adif_file(path))
+
+
+def test_collect_finds_compressed_logs(write_adif, tmp_path):
+    path = write_adif('log.adi', QSOS)
+    compressed = [compress(path, compression) for compression in ('gz', 'zip')]
+    (tmp_path / 'notes.txt').write_text("kein Log")
+
+    assert collect_adif_files([str(tmp_path)]) == sorted([path] + compressed)
+
+
+def test_zip_export_packs_all_files_into_one_archive(write_adif, tmp_path):
+    path = write_adif('log.adi', QSOS)
+    grouped_qsos = group_qsos(iter_adif_file(path))
+    keys = build_export_keys(build_location_data(grouped_qsos, WavelogStationIndex()))
+    plain_dir, zip_dir = tmp_path / 'plain', tmp_path / 'zip'
+    plain_dir.mkdir()
+    zip_dir.mkdir()
+
+    export_adif(iter_adif_file(path), str(plain_dir), keys)
+    with export_target(str(zip_dir), 'zip') as (target_dir, compression):
+        export_adif(iter_adif_file(path), target_dir, keys, compression=compression)
+
+    assert os.listdir(zip_dir) == [ZIP_ARCHIVE_NAME]
+    with zipfile.ZipFile(zip_dir / ZIP_ARCHIVE_NAME) as archive:
+        assert {name: archive.read(name) for name in archive.namelist()} == {
+            name: (plain_dir / name).read_bytes() for name in os.listdir(plain_dir)}
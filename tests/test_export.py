@@ -0,0 +1,178 @@
+"""Gleiche Exportdateien in allen Exportwegen."""
+import os
+import zlib
+
+import pytest
+
+from benchmarks.adif_generator import generate_adif
+from conftest import qso
+from splitter_engine import (
+    SCAN_FIELDS, QSOStore, WavelogStationIndex, build_export_keys, build_location_data, export_adif, export_adif_parallel,
+    export_adif_raw, export_adif_store, find_record_boundaries, group_qsos, iter_adif_file, iter_adif_spans,
+    split_sessions
+)
+
+
+@pytest.fixture(scope='module')
+def generated_log(tmp_path_factory):
+    # Knapp 10 MB: groß genug, dass export_adif_parallel zwei Prozesse verwendet
+    path = str(tmp_path_factory.mktemp('log') / 'bench.adi')
+    generate_adif(path, 45000, location_count=20)
+    return path
+
+
+def export_keys(grouped_qsos):
+    location_data = build_location_data(grouped_qsos, WavelogStationIndex())
+    return build_export_keys(location_data, grouped_qsos=grouped_qsos)
+
+
+def new_dir(tmp_path, name):
+    path = tmp_path / name
+    path.mkdir()
+    return str(path)
+
+
+def read_exports(export_dir):
+    return {name: open(os.path.join(export_dir, name), 'rb').read() for name in sorted(os.listdir(export_dir))}
+
+
+def qso_identities(export_dir):
+    """Pro Exportdatei die QSOs als (CALL, QSO_DATE, TIME_ON) in Dateireihenfolge."""
+    return {name: [(q['CALL'], q.get('QSO_DATE'), q.get('TIME_ON')) for q in iter_adif_file(os.path.join(export_dir, name))]
+            for name in sorted(os.listdir(export_dir))}
+
+
+def test_streaming_and_parallel_exports_are_identical(generated_log, tmp_path):
+    keys = export_keys(group_qsos(iter_adif_file(generated_log)))
+
+    export_adif(iter_adif_file(generated_log), new_dir(tmp_path, 'stream'), keys)
+    export_adif_parallel(generated_log, new_dir(tmp_path, 'parallel'), keys, workers=2)
+
+    streamed = read_exports(tmp_path / 'stream')
+    assert len(streamed) == 21
+    assert read_exports(tmp_path / 'parallel') == streamed
+
+
+def test_store_export_is_identical_to_streaming(generated_log, tmp_path):
+    store = QSOStore()
+    grouped_qsos = group_qsos(iter_adif_file(generated_log), store=store)
+    keys = export_keys(grouped_qsos)
+
+    export_adif(iter_adif_file(generated_log), new_dir(tmp_path, 'stream'), keys)
+    export_adif_store(store, grouped_qsos, new_dir(tmp_path, 'store'), keys)
+
+    assert len(store) == 45000
+    assert read_exports(tmp_path / 'store') == read_exports(tmp_path / 'stream')
+
+
+def test_store_keeps_every_qso_and_shares_layouts():
+    qsos = [qso('DL1X', 'JO31AB', '20240501'), qso('DL1X', 'JO31AB', '20240502'),
+            dict(qso('DL2Y', 'JO62QM', '20240503'), COMMENT="Jürgen " * 10)]
+    store = QSOStore()
+    rows = [store.append(q) for q in qsos]
+
+    assert [store.record(row) for row in rows] == qsos
+    assert len(store.layouts) == 2
+    assert store.get(rows[2], 'COMMENT') == "Jürgen " * 10
+    assert store.get(rows[0], 'COMMENT') == ''
+
+
+def test_parallel_export_with_tag_text_across_the_split_point(write_adif, tmp_path):
+    # Zwei gleich große Hälften um einen Datensatz, dessen COMMENT '<eor>' hinter der Dateimitte enthält
+    filler = "x" * 2000
+    first_half = [dict(qso('DL1X', 'JO31AB', '20240501', f"{i:04d}"), COMMENT=filler) for i in range(2100)]
+    second_half = [dict(qso('DL2Y', 'JO62QM', '20240502', f"{i:04d}"), COMMENT=filler) for i in range(2100)]
+    trap = dict(qso('DL1X', 'JO31AB', '20240503'), COMMENT="a" * 3000 + " see <eor> here " + "b" * 1000)
+    path = write_adif('split.adi', first_half + [trap] + second_half)
+
+    grouped_qsos = group_qsos(iter_adif_file(path))
+    keys = export_keys(grouped_qsos)
+    # Die reine Bytesuche findet die Grenze im Wert
+    (_start, boundary), _rest = find_record_boundaries(path, 2)
+    assert open(path, 'rb').read()[boundary - len("see <eor>"):boundary] == b"see <eor>"
+
+    export_adif(iter_adif_file(path), new_dir(tmp_path, 'stream'), keys)
+    export_adif_parallel(path, new_dir(tmp_path, 'parallel'), keys, workers=2)
+
+    streamed = read_exports(tmp_path / 'stream')
+    assert sum(len(qsos) for qsos in qso_identities(tmp_path / 'stream').values()) == 4201
+    assert read_exports(tmp_path / 'parallel') == streamed
+
+
+def test_raw_copy_writes_the_same_qsos(generated_log, tmp_path):
+    grouped_qsos = group_qsos(iter_adif_spans(generated_log), with_spans=True)
+    keys = export_keys(grouped_qsos)
+
+    export_adif(iter_adif_file(generated_log), new_dir(tmp_path, 'stream'), keys)
+    export_adif_raw(generated_log, grouped_qsos, new_dir(tmp_path, 'raw'), keys)
+
+    assert qso_identities(tmp_path / 'raw') == qso_identities(tmp_path / 'stream')
+
+
+def test_raw_copy_keeps_tag_text_inside_values(write_adif, tmp_path):
+    path = write_adif('tags.adi', [
+        dict(qso('DL1X', 'JO31AB', '20240501'), COMMENT="see <EOR> here"),
+        dict(qso('DL1X', 'JO31AB', '20240502'), COMMENT="<STATION_CALLSIGN:4>FAKE <EOH>"),
+        dict(qso('DL2Y', 'JO62QM', '20240503'), NAME="Jürgen <eor> Müller")
+    ])
+    spans = list(iter_adif_spans(path))
+    assert [fields for fields, _offset, _length in spans] == [
+        {name: value for name, value in q.items() if name in SCAN_FIELDS} for q in iter_adif_file(path)]
+
+    grouped_qsos = group_qsos(iter_adif_spans(path), with_spans=True)
+    assert sorted(grouped_qsos) == ['DL1X|JO31AB', 'DL2Y|JO62QM']
+    keys = export_keys(grouped_qsos)
+    export_adif(iter_adif_file(path), new_dir(tmp_path, 'stream'), keys)
+    export_adif_raw(path, grouped_qsos, new_dir(tmp_path, 'raw'), keys)
+
+    assert qso_identities(tmp_path / 'raw') == qso_identities(tmp_path / 'stream')
+
+
+def test_parallel_gz_export_is_one_stream(generated_log, tmp_path):
+    grouped_qsos = group_qsos(iter_adif_file(generated_log))
+    keys = export_keys(grouped_qsos)
+
+    export_adif(iter_adif_file(generated_log), new_dir(tmp_path, 'stream'), keys)
+    export_adif_parallel(generated_log, new_dir(tmp_path, 'gz'), keys, workers=2, compression='gz')
+
+    streamed = read_exports(tmp_path / 'stream')
+    compressed = read_exports(tmp_path / 'gz')
+    assert sorted(compressed) == [f"{name}.gz" for name in streamed]
+    for name, data in streamed.items():
+        decompressor = zlib.decompressobj(wbits=31)
+        assert decompressor.decompress(compressed[f"{name}.gz"]) == data
+        assert decompressor.eof and not decompressor.unused_data
+
+
+def test_session_exports_match_in_all_modes(write_adif, tmp_path):
+    path = write_adif('rover.adi', [
+        qso('DL1X', 'JO31AB', '20240501', '1000'),
+        qso('DL1X', 'JO62QM', '20240501', '1100'),
+        qso('DL1X', 'JO31AB', '20240505', '0900'),
+        qso('DL1X', 'JO31AB', '20240501', '1300'),
+        qso('DL1X', 'JO31AB', '', '')
+    ])
+
+    results = {}
+    for mode in ('stream', 'store', 'raw'):
+        store = QSOStore() if mode == 'store' else None
+        if mode == 'raw':
+            grouped_qsos = group_qsos(iter_adif_spans(path, with_time=True), with_spans=True, session_times=True)
+        else:
+            grouped_qsos = group_qsos(iter_adif_file(path), store=store, session_times=True)
+        split_sessions(grouped_qsos, 24)
+        keys = export_keys(grouped_qsos)
+        export_dir = new_dir(tmp_path, mode)
+        if mode == 'store':
+            export_adif_store(store, grouped_qsos, export_dir, keys)
+        elif mode == 'raw':
+            export_adif_raw(path, grouped_qsos, export_dir, keys)
+        else:
+            export_adif(iter_adif_file(path), export_dir, keys)
+        results[mode] = qso_identities(export_dir)
+
+    assert results['store'] == results['stream']
+    assert results['raw'] == results['stream']
+    sessions = {name: len(qsos) for name, qsos in results['stream'].items() if 'JO31AB' in name}
+    assert sorted(sessions.values()) == [1, 3]
+    assert all('_A1' in name or '_A2' in name for name in sessions)
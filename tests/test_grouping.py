@@ -0,0 +1,102 @@
+"""Gruppierung: Aktivierungen (split_sessions), Locator-Genauigkeit, Zusammenfassen naher Standorte und gekürzte Locatoren."""
+from conftest import qso, station
+from splitter_engine import (
+    STATUS_FOUND, STATUS_NEW, WavelogStationIndex, build_location_data, cluster_location_groups,
+    group_adif_files, group_qsos, iter_adif_file, merge_file_groups, split_sessions
+)
+
+
+def test_split_sessions_recounts_each_session(write_adif):
+    path = write_adif('rover.adi', [
+        qso('DL1X', 'JO31AB', '20240501', '1000', band='20m'),
+        qso('DL1X', 'JO31AB', '20240501', '1500', band='40m'),
+        qso('DL1X', 'JO31AB', '20240510', '0800', dxcc='227', ituz='27', band='2m'),
+        qso('DL1X', 'JO31AB', '', '')
+    ])
+    grouped_qsos = group_qsos(iter_adif_file(path), session_times=True)
+    split_sessions(grouped_qsos, 24)
+
+    assert sorted(grouped_qsos) == ['DL1X|JO31AB|1', 'DL1X|JO31AB|2']
+    first, second = grouped_qsos['DL1X|JO31AB|1'], grouped_qsos['DL1X|JO31AB|2']
+    # QSOs ohne Datum landen in der ersten Aktivierung
+    assert first['count'] == 3
+    assert (first['dxcc'], first['ituz'], first['disagreement']) == ('230', '28', [])
+    assert first['bands'] == {'20m': 2, '40m': 1}
+    assert (first['first_date'], first['last_date']) == ('20240501', '20240501')
+    assert second['count'] == 1
+    assert (second['dxcc'], second['ituz'], second['disagreement']) == ('227', '27', [])
+    assert second['bands'] == {'2m': 1}
+    assert second['session']['index'] == 2
+    assert all('times' not in group and 'qso_values' not in group for group in grouped_qsos.values())
+
+
+def test_split_sessions_keeps_short_gaps_together(write_adif):
+    path = write_adif('log.adi', [
+        qso('DL1X', 'JO31AB', '20240501', '2300'),
+        qso('DL1X', 'JO31AB', '20240502', '0100')
+    ])
+    grouped_qsos = group_qsos(iter_adif_file(path), session_times=True)
+    split_sessions(grouped_qsos, 24)
+
+    assert list(grouped_qsos) == ['DL1X|JO31AB']
+    assert 'session' not in grouped_qsos['DL1X|JO31AB']
+
+
+def test_split_sessions_rebuilds_sources_per_session(write_adif):
+    first = write_adif('a.adi', [qso('DL1X', 'JO31AB', '20240501'), qso('DL1X', 'JO31AB', '20240510')])
+    second = write_adif('b.adi', [qso('DL1X', 'JO31AB', '20240511', band='2m')])
+    grouped_by_file = group_adif_files([first, second], workers=1, session_times=True)
+    grouped_qsos = merge_file_groups(grouped_by_file)
+    split_sessions(grouped_qsos, 24, grouped_by_file)
+
+    assert grouped_qsos['DL1X|JO31AB|1']['sources'] == {first: 1}
+    assert grouped_qsos['DL1X|JO31AB|2']['sources'] == {first: 1, second: 1}
+    assert grouped_qsos['DL1X|JO31AB|2']['bands'] == {'20m': 1, '2m': 1}
+    assert sorted(grouped_by_file[second]) == ['DL1X|JO31AB|2']
+
+
+def test_grid_precision_groups_by_truncated_locator(write_adif):
+    path = write_adif('log.adi', [qso('DL1X', 'JO44AB', '20240501'), qso('DL1X', 'JO44CD', '20240502'),
+                                  qso('DL1X', 'JO44CD', '20240503'), qso('DL1X', 'JO45AA', '20240504')])
+    grouped_qsos = group_qsos(iter_adif_file(path), grid_precision=4)
+
+    assert sorted(grouped_qsos) == ['DL1X|JO44', 'DL1X|JO45']
+    assert grouped_qsos['DL1X|JO44']['count'] == 3
+    assert grouped_qsos['DL1X|JO44']['grids'] == {'JO44AB': 1, 'JO44CD': 2}
+
+
+def test_cluster_merges_nearby_locations_into_the_busiest(write_adif):
+    path = write_adif('rover.adi', [
+        qso('DL1X', 'JO31AB', '20240501'),
+        qso('DL1X', 'JO31AC', '20240501'),
+        qso('DL1X', 'JO31AC', '20240501'),
+        qso('DL1X', 'JO62QM', '20240501'),
+        qso('DL2Y', 'JO31AB', '20240501')
+    ])
+    grouped_qsos = group_qsos(iter_adif_file(path))
+    key_map = cluster_location_groups(grouped_qsos, 20)
+
+    assert key_map == {'DL1X|JO31AB': 'DL1X|JO31AC'}
+    assert sorted(grouped_qsos) == ['DL1X|JO31AC', 'DL1X|JO62QM', 'DL2Y|JO31AB']
+    assert grouped_qsos['DL1X|JO31AC']['count'] == 3
+    assert grouped_qsos['DL1X|JO31AC']['grids'] == {'JO31AC': 2, 'JO31AB': 1}
+
+
+def test_cluster_with_zero_radius_changes_nothing(write_adif):
+    path = write_adif('log.adi', [qso('DL1X', 'JO31AB', '20240501'), qso('DL1X', 'JO31AC', '20240501')])
+    grouped_qsos = group_qsos(iter_adif_file(path))
+
+    assert cluster_location_groups(grouped_qsos, 0) == {}
+    assert sorted(grouped_qsos) == ['DL1X|JO31AB', 'DL1X|JO31AC']
+
+
+def test_truncated_locator_matches_existing_station(write_adif):
+    path = write_adif('log.adi', [qso('DL1X', 'JO44AB', '20240501'), qso('DL1X', 'JO44CD', '20240501'),
+                                  qso('DL2Y', 'JO44AB', '20240501')])
+    grouped_qsos = group_qsos(iter_adif_file(path), grid_precision=4)
+    station_index = WavelogStationIndex([station('7', 'DL1X', 'JO44AB', 'Home'), station('8', 'DL2Y', 'JO45', 'Other')])
+    location_data = build_location_data(grouped_qsos, station_index)
+
+    assert location_data['DL1X|JO44']['status'] == STATUS_FOUND
+    assert location_data['DL1X|JO44']['wavelog_id'] == '7'
+    assert location_data['DL2Y|JO44']['status'] == STATUS_NEW
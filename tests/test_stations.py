@@ -0,0 +1,138 @@
+"""Zuordnung angelegter Stationen (reconcile_created_ids) und Wiederaufnahme über das Anlege-Journal."""
+import pytest
+
+from benchmarks.mock_wavelog import MockWavelogServer
+from conftest import station
+from splitter_engine import (
+    CreationJournal, WavelogClient, WavelogStationIndex, create_stations, fetch_station_info, reconcile_created_ids
+)
+
+
+def item(call, locator, profile_name=None):
+    return {'callsign': call, 'locator': locator, 'profile_name': profile_name or f"{call}-{locator}",
+            'location_key': f"{call}|{locator}"}
+
+
+BEFORE = [station('1', 'DL1X', 'JO31AB', 'Home')]
+
+
+def test_reconcile_assigns_unique_new_station():
+    after = BEFORE + [station('2', 'DL1X', 'JO31AC', 'DL1X-JO31AC')]
+
+    found_ids, ambiguous = reconcile_created_ids([item('DL1X', 'JO31AC')], BEFORE, after)
+
+    assert found_ids == {'DL1X|JO31AC': '2'}
+    assert ambiguous == {}
+
+
+def test_reconcile_reports_all_candidates_when_ambiguous():
+    after = BEFORE + [station('2', 'DL1X', 'JO31AC', 'DL1X-JO31AC'), station('3', 'DL1X', 'JO31AC', 'DL1X-JO31AC')]
+
+    found_ids, ambiguous = reconcile_created_ids([item('DL1X', 'JO31AC')], BEFORE, after)
+
+    assert found_ids == {}
+    assert ambiguous == {'DL1X|JO31AC': {'2': 'DL1X-JO31AC', '3': 'DL1X-JO31AC'}}
+
+
+def test_reconcile_marks_both_locations_when_one_station_fits_two():
+    # Wavelog kürzt den Locator: Beide Standorte passen über die ersten 4 Zeichen zur selben Station
+    after = BEFORE + [station('2', 'DL1X', 'JO31', 'Rover')]
+    created = [item('DL1X', 'JO31AC', 'Rover'), item('DL1X', 'JO31AD', 'Rover')]
+
+    found_ids, ambiguous = reconcile_created_ids(created, BEFORE, after)
+
+    assert found_ids == {}
+    assert set(ambiguous) == {'DL1X|JO31AC', 'DL1X|JO31AD'}
+
+
+def test_reconcile_without_candidate_reports_unclear_id():
+    found_ids, ambiguous = reconcile_created_ids([item('DL1X', 'JO31AC')], BEFORE, BEFORE)
+
+    assert found_ids == {'DL1X|JO31AC': "UNKLARE ID"}
+    assert ambiguous == {}
+
+
+def test_reconcile_takes_ids_from_the_create_response():
+    # Die ID aus der Antwort gilt auch dann, wenn die Station in der neuen Liste fehlt
+    found_ids, ambiguous = reconcile_created_ids([dict(item('DL1X', 'JO31AC'), station_id='5')], BEFORE, BEFORE)
+
+    assert found_ids == {'DL1X|JO31AC': '5'}
+    assert ambiguous == {}
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / 'creation_journal.jsonl')
+
+
+def replay(journal_path, items, stations):
+    """Plant einen neuen Lauf mit frisch geladenem Journal."""
+    return CreationJournal(journal_path, 'source').plan(items, WavelogStationIndex(stations))
+
+
+def test_journal_replays_states_after_restart(journal_path):
+    created, pending, uncertain, failed = (item('DL1X', locator) for locator in ('JO31AA', 'JO31AB', 'JO31AC', 'JO31AD'))
+    journal = CreationJournal(journal_path, 'source')
+    journal.begin([created, pending, uncertain, failed])
+    journal.finish([dict(created, station_id='10')], True)
+    journal.finish([uncertain], False, uncertain=True)
+    journal.finish([failed], False)
+
+    # Die offene Anlage von JO31AB ist in Wavelog angekommen, die unklare von JO31AC nicht
+    stations = [station('10', 'DL1X', 'JO31AA', 'DL1X-JO31AA'), station('11', 'DL1X', 'JO31AB', 'DL1X-JO31AB')]
+    items = [item('DL1X', locator) for locator in ('JO31AA', 'JO31AB', 'JO31AC', 'JO31AD', 'JO31AE')]
+    to_post, already_created, unresolved = replay(journal_path, items, stations)
+
+    assert [entry['locator'] for entry in to_post] == ['JO31AC', 'JO31AD', 'JO31AE']
+    assert [(entry['locator'], entry['station_id']) for entry in already_created] == [('JO31AA', '10'), ('JO31AB', '11')]
+    assert unresolved == []
+    # Die gefundene ID wurde übernommen und gilt im nächsten Lauf direkt
+    assert CreationJournal(journal_path, 'source').state(item('DL1X', 'JO31AB')) == (CreationJournal.CREATED, '11')
+
+
+def test_journal_without_station_list_keeps_open_attempts(journal_path):
+    journal = CreationJournal(journal_path, 'source')
+    journal.begin([item('DL1X', 'JO31AB')])
+
+    to_post, already_created, unresolved = replay(journal_path, [item('DL1X', 'JO31AB')], None)
+
+    assert (to_post, already_created) == ([], [])
+    assert [entry['locator'] for entry in unresolved] == ['JO31AB']
+
+
+def test_journal_recreates_deleted_station(journal_path):
+    journal = CreationJournal(journal_path, 'source')
+    journal.finish([dict(item('DL1X', 'JO31AB'), station_id='10')], True)
+
+    to_post, already_created, _unresolved = replay(journal_path, [item('DL1X', 'JO31AB')], BEFORE)
+    assert [entry['locator'] for entry in to_post] == ['JO31AB']
+    assert already_created == []
+
+    # Ohne Stationsliste bleibt es beim Eintrag im Journal
+    to_post, already_created, _unresolved = replay(journal_path, [item('DL1X', 'JO31AB')], None)
+    assert to_post == []
+    assert [entry['locator'] for entry in already_created] == ['JO31AB']
+
+
+def test_journal_is_separate_per_source(journal_path):
+    CreationJournal(journal_path, 'other').finish([dict(item('DL1X', 'JO31AB'), station_id='10')], True)
+
+    to_post, _already_created, _unresolved = replay(journal_path, [item('DL1X', 'JO31AB')], None)
+
+    assert [entry['locator'] for entry in to_post] == ['JO31AB']
+
+
+def test_second_run_with_journal_posts_only_new_stations(journal_path):
+    def items(*locators):
+        return [dict(item('DL1X', locator), station_dxcc='230', station_cq='14', station_itu='28') for locator in locators]
+
+    with MockWavelogServer(stations=BEFORE, return_ids=True) as server:
+        client = WavelogClient(server.url, 'token', max_workers=2)
+        for locators in (('JO31AC', 'JO31AD'), ('JO31AC', 'JO31AD', 'JO31AE')):
+            journal = CreationJournal(journal_path, server.url)
+            station_index = WavelogStationIndex(fetch_station_info(client))
+            created = create_stations(client, items(*locators), batch_size=1, journal=journal, station_index=station_index)
+            assert sorted(entry['locator'] for entry in created) == list(locators)
+
+        assert server.request_counts['create_station'] == 3
+        assert sorted(entry['station_gridsquare'] for entry in server.stations) == ['JO31AB', 'JO31AC', 'JO31AD', 'JO31AE']
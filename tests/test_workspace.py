@@ -0,0 +1,74 @@
+"""Projekt-Arbeitsbereich: Sitzung speichern und fortsetzen, aufgelöste Mehrdeutigkeiten übernehmen."""
+import pytest
+
+from conftest import qso, station
+from splitter_engine import (
+    STATUS_AMBIGUOUS, ProjectWorkspace, WavelogStationIndex, apply_resolution, build_location_data, group_qsos,
+    iter_adif_spans
+)
+
+STATIONS = [station('7', 'DL1X', 'JO31AB', 'Home'), station('8', 'DL1X', 'JO31AB', 'Portabel')]
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    workspace = ProjectWorkspace(str(tmp_path / 'workspace.sqlite'))
+    yield workspace
+    workspace.close()
+
+
+def analyse(path):
+    grouped_qsos = group_qsos(iter_adif_spans(path), with_spans=True)
+    return grouped_qsos, build_location_data(grouped_qsos, WavelogStationIndex(STATIONS))
+
+
+def test_session_round_trip(write_adif, workspace):
+    path = write_adif('log.adi', [qso('DL1X', 'JO31AB', '20240501'), qso('DL2Y', 'JO62QM', '20240502')])
+    grouped_qsos, location_data = analyse(path)
+    location_data['DL2Y|JO62QM']['profile_name'] = 'Bearbeitet'
+
+    workspace.save_session(location_data, grouped_qsos, adif_file_path=path, stations=STATIONS)
+    reopened = ProjectWorkspace(workspace.path)
+    session = reopened.load_session()
+    reopened.close()
+
+    assert session['location_data'] == location_data
+    assert session['grouped_qsos'].keys() == grouped_qsos.keys()
+    assert session['grouped_qsos']['DL1X|JO31AB']['offsets'] == grouped_qsos['DL1X|JO31AB']['offsets']
+    assert session['adif_file_path'] == path
+    assert session['stations'] == STATIONS
+
+
+def test_find_locations_uses_call_locator_and_wavelog_id(write_adif, workspace):
+    path = write_adif('log.adi', [qso('DL1X', 'JO31AB', '20240501'), qso('DL1X', 'JO31AC', '20240501')])
+    grouped_qsos, location_data = analyse(path)
+    workspace.save_session(location_data, grouped_qsos)
+
+    assert workspace.find_locations(call='dl1x') == ['DL1X|JO31AB', 'DL1X|JO31AC']
+    assert workspace.find_locations(call='DL1X', locator='jo31ac') == ['DL1X|JO31AC']
+    assert workspace.find_locations(wavelog_id='NEU') == ['DL1X|JO31AC']
+
+
+def test_reanalysis_keeps_resolved_ambiguity(write_adif, workspace):
+    path = write_adif('log.adi', [qso('DL1X', 'JO31AB', '20240501')])
+    grouped_qsos, location_data = analyse(path)
+    assert location_data['DL1X|JO31AB']['status'] == STATUS_AMBIGUOUS
+    apply_resolution(location_data['DL1X|JO31AB'], '8', 'Portabel')
+    workspace.save_session(location_data, grouped_qsos)
+
+    grouped_qsos, location_data = analyse(path)
+    assert workspace.restore_resolutions(location_data) == ['DL1X|JO31AB']
+    assert location_data['DL1X|JO31AB']['wavelog_id'] == '8'
+    assert location_data['DL1X|JO31AB']['profile_name'] == 'Portabel'
+    assert not location_data['DL1X|JO31AB']['selected']
+
+
+def test_resolution_is_dropped_when_station_is_no_candidate(write_adif, workspace):
+    path = write_adif('log.adi', [qso('DL1X', 'JO31AB', '20240501')])
+    grouped_qsos, location_data = analyse(path)
+    apply_resolution(location_data['DL1X|JO31AB'], '9', 'Gelöscht')
+    workspace.save_session(location_data, grouped_qsos)
+
+    grouped_qsos, location_data = analyse(path)
+    assert workspace.restore_resolutions(location_data) == []
+    assert location_data['DL1X|JO31AB']['status'] == STATUS_AMBIGUOUS